@@ -0,0 +1 @@
+"""Benchmarks for OpenFAN Micro; run from the repo root with `python -m benchmarks.<name>`."""
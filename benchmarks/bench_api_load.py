@@ -0,0 +1,149 @@
+"""End-to-end load benchmark for `OpenFanApi` against the local simulator.
+
+For each fleet size it measures:
+- poll throughput: full coordinator-equivalent polls (fan status +
+  openfan status) per second across all devices, issued concurrently
+- write latency: `set_pwm` p50/p95/p99 under concurrent writes
+- event-loop impact: scheduling lag of a 10 ms ticker on the client loop
+  while the load runs (simulator runs on its own thread/loop)
+
+Usage (from the repo root, needs aiohttp):
+    python -m benchmarks.bench_api_load --sizes 1,10,100,500 --rounds 5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Any
+
+import aiohttp
+
+from tools._loader import load_integration_module
+from tools.simulator import VARIANTS, SimulatorFleet
+
+api_mod = load_integration_module("api")
+metrics_mod = load_integration_module("metrics")
+
+
+class LoopLagProbe:
+    """Measure how late a periodic 10 ms callback fires on the running loop."""
+
+    def __init__(self, period: float = 0.01) -> None:
+        self.period = period
+        self.hist = metrics_mod.LatencyHistogram()
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.period)
+            self.hist.record(max(0.0, time.perf_counter() - start - self.period))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+async def _poll_once(api: Any) -> None:
+    await api.get_status()
+    try:
+        await api.get_openfan_status()
+    except Exception:
+        pass  # legacy firmware has no /openfan/status (coordinator tolerates it)
+
+
+async def bench_size(size: int, rounds: int, variant: str, latency: float) -> dict[str, Any]:
+    fleet = SimulatorFleet.build(size, variant=variant, latency=latency)
+    hosts = fleet.start_in_thread()
+    connector = aiohttp.TCPConnector(limit=0)
+    try:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            apis = [api_mod.OpenFanApi(host, session) for host in hosts]
+            await asyncio.gather(*(_poll_once(api) for api in apis))  # warm-up
+
+            probe = LoopLagProbe()
+            probe.start()
+            t0 = time.perf_counter()
+            for _ in range(rounds):
+                await asyncio.gather(*(_poll_once(api) for api in apis))
+            poll_elapsed = time.perf_counter() - t0
+
+            write_hist = metrics_mod.LatencyHistogram()
+
+            async def _timed_write(api: Any, value: int) -> None:
+                start = time.perf_counter()
+                await api.set_pwm(value)
+                write_hist.record(time.perf_counter() - start)
+
+            t1 = time.perf_counter()
+            for r in range(rounds):
+                await asyncio.gather(*(_timed_write(api, 20 + r) for api in apis))
+            write_elapsed = time.perf_counter() - t1
+            await probe.stop()
+
+            requests = sum(api.stats.requests for api in apis)
+            fallbacks = sum(api.stats.legacy_fallbacks for api in apis)
+    finally:
+        fleet.stop_thread()
+
+    lat = write_hist.as_dict()
+    lag = probe.hist.as_dict()
+    return {
+        "devices": size,
+        "variant": variant,
+        "polls_per_s": round(size * rounds / poll_elapsed, 1),
+        "writes_per_s": round(size * rounds / write_elapsed, 1),
+        "write_p50_ms": lat["p50_ms"],
+        "write_p95_ms": lat["p95_ms"],
+        "write_p99_ms": lat["p99_ms"],
+        "loop_lag_p95_ms": lag["p95_ms"],
+        "loop_lag_max_ms": lag["max_ms"],
+        "requests": requests,
+        "legacy_fallbacks": fallbacks,
+    }
+
+
+async def _main(args: argparse.Namespace) -> list[dict[str, Any]]:
+    results = []
+    for size in args.sizes:
+        results.append(await bench_size(size, args.rounds, args.variant, args.latency))
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=lambda s: [int(x) for x in s.split(",")], default=[1, 10, 50, 100, 250, 500]
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--variant", choices=VARIANTS, default="new")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated device latency (s)")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    parser.add_argument("--verbose", action="store_true", help="show API client log output")
+    args = parser.parse_args(argv)
+    if not args.verbose:
+        # legacy-variant 404s are expected and logged at ERROR by the client
+        logging.getLogger(api_mod.__name__).setLevel(logging.CRITICAL)
+
+    results = asyncio.run(_main(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    cols = list(results[0].keys()) if results else []
+    print("  ".join(f"{c:>16}" for c in cols))
+    for row in results:
+        print("  ".join(f"{str(row[c]):>16}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Replay a temperature trace through the controller's output stage on a simulated clock.
+
+The trace (synthetic by default, or a CSV of `seconds,temperature`) is fed
+through the same pipeline as `TempController`: moving average over the
+integration window (or its trend line `temp_predict_seconds` ahead) →
+curve → min-PWM clamp → `OutputStage`. Evaluations
+run on every sample and on the periodic tick; no device, no wall clock.
+
+For each output-stage configuration it reports:
+- device writes (total, and per hour in the steady part of the trace)
+- spike response: seconds from the start of each hot spike until the
+  written PWM reaches 90 % of the spike's curve target
+- decision outcomes (applied / deadband / min_interval / budget)
+
+Usage (from the repo root, needs homeassistant for the curve module):
+    python -m benchmarks.bench_output_stage --hours 6
+    python -m benchmarks.bench_output_stage --csv history.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import math
+import random
+from collections import Counter
+from typing import Any, Iterable
+
+from tools._loader import load_integration_module
+
+controller_mod = load_integration_module("controller")
+curve_mod = load_integration_module("curve")
+output_mod = load_integration_module("output")
+
+CURVE = "35=20, 45=35, 60=70, 70=100"
+MIN_PWM = 20
+SAMPLE_S = 5  # sensor update period of the synthetic trace
+SPIKE_EVERY_S = 3600
+SPIKE_LEN_S = 300
+
+CONFIGS: dict[str, dict[str, Any]] = {
+    # no options set: the up_* values fall back to the symmetric ones
+    "defaults": {},
+    # one symmetric deadband / interval (the options before the output stage)
+    "symmetric_default": {
+        "temp_deadband_pct": 3,
+        "temp_update_min_interval": 10,
+        "temp_up_deadband_pct": 3,
+        "temp_up_min_interval": 10,
+    },
+    # symmetric, tuned for fewer writes: slows the spike response too
+    "symmetric_quiet": {
+        "temp_deadband_pct": 5,
+        "temp_update_min_interval": 60,
+        "temp_up_deadband_pct": 5,
+        "temp_up_min_interval": 60,
+    },
+    "fast_up_slow_down": {
+        "temp_deadband_pct": 5,
+        "temp_update_min_interval": 60,
+        "temp_up_deadband_pct": 2,
+        "temp_up_min_interval": 2,
+    },
+    "shaped": {
+        "temp_deadband_pct": 5,
+        "temp_update_min_interval": 60,
+        "temp_up_deadband_pct": 2,
+        "temp_up_min_interval": 2,
+        "temp_max_slew_pct_s": 2,
+        "temp_write_budget_per_min": 2,
+    },
+    # long smoothing window: steady, but spikes are seen late...
+    "shaped_90s": {
+        "temp_integrate_seconds": 90,
+        "temp_deadband_pct": 5,
+        "temp_update_min_interval": 60,
+        "temp_up_deadband_pct": 2,
+        "temp_up_min_interval": 2,
+        "temp_max_slew_pct_s": 2,
+        "temp_write_budget_per_min": 2,
+    },
+    # ...unless the curve is evaluated on the window's trend line 30 s ahead
+    "shaped_90s_predictive": {
+        "temp_integrate_seconds": 90,
+        "temp_deadband_pct": 5,
+        "temp_update_min_interval": 60,
+        "temp_up_deadband_pct": 2,
+        "temp_up_min_interval": 2,
+        "temp_max_slew_pct_s": 2,
+        "temp_write_budget_per_min": 2,
+        "temp_predict_seconds": 30,
+    },
+}
+
+
+def synthetic_trace(hours: float, seed: int = 1) -> list[tuple[float, float]]:
+    """Slow drift + sensor noise, with a short hot spike once per hour."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(int(hours * 3600 / SAMPLE_S)):
+        t = i * SAMPLE_S
+        temp = 42.0 + 3.0 * math.sin(2 * math.pi * t / 7200.0) + rng.gauss(0.0, 0.4)
+        if t % SPIKE_EVERY_S >= SPIKE_EVERY_S - SPIKE_LEN_S:
+            temp += 20.0
+        out.append((float(t), round(temp, 2)))
+    return out
+
+
+def csv_trace(path: str) -> list[tuple[float, float]]:
+    with open(path, newline="", encoding="utf-8") as fh:
+        rows = [(float(r[0]), float(r[1])) for r in csv.reader(fh) if r and not r[0].startswith("#")]
+    t0 = rows[0][0] if rows else 0.0
+    return [(t - t0, v) for t, v in rows]
+
+
+def _events(trace: list[tuple[float, float]], tick_s: int) -> Iterable[tuple[float, float | None]]:
+    """Merge sensor samples and periodic ticks in time order (tick = no new sample)."""
+    end = trace[-1][0] if trace else 0.0
+    tick = float(tick_s)
+    for t, v in trace:
+        while tick < t:
+            yield tick, None
+            tick += tick_s
+        yield t, v
+    while tick <= end:
+        yield tick, None
+        tick += tick_s
+
+
+def replay(trace: list[tuple[float, float]], opts: dict[str, Any]) -> dict[str, Any]:
+    curve = curve_mod.CompiledCurve(CURVE)
+    stage = output_mod.OutputStage.from_options(opts)
+    tick_s = max(5, int(opts.get("temp_update_min_interval", 10)))
+    integrate_s = max(5, int(opts.get("temp_integrate_seconds", 30)))
+    predict_s = int(opts.get("temp_predict_seconds", 0))
+    window = controller_mod.SampleWindow()
+    outcomes: Counter[str] = Counter()
+    writes: list[tuple[float, int]] = []
+
+    for now, sample in _events(trace, tick_s):
+        if sample is not None:
+            window.append(now, sample)
+        window.prune(now - integrate_s)
+        temp = window.mean()
+        if temp is None:
+            continue
+        if predict_s > 0:
+            projected = window.project(now + predict_s, integrate_s / 2)
+            if projected is not None:
+                temp = projected
+        target = curve(temp)
+        target = 0 if target == 0 else max(MIN_PWM, target)
+        value, outcome = stage.step(target, now, MIN_PWM)
+        outcomes[outcome] += 1
+        if value is not None:
+            stage.commit(value, now)
+            writes.append((now, value))
+
+    return {"writes": writes, "outcomes": dict(outcomes)}
+
+
+def spike_response(trace: list[tuple[float, float]], writes: list[tuple[float, int]]) -> list[float]:
+    """Seconds from each spike start until the written PWM reaches 90 % of the spike target."""
+    curve = curve_mod.CompiledCurve(CURVE)
+    out = []
+    start = SPIKE_EVERY_S - SPIKE_LEN_S
+    end = trace[-1][0] if trace else 0.0
+    while start < end:
+        peak = max((v for t, v in trace if start <= t < start + SPIKE_LEN_S), default=None)
+        if peak is None:
+            break
+        goal = 0.9 * curve(peak)
+        hit = next((t for t, pwm in writes if t >= start and pwm >= goal), None)
+        out.append(round(hit - start, 1) if hit is not None else float("inf"))
+        start += SPIKE_EVERY_S
+    return out
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=6.0, help="length of the synthetic trace")
+    parser.add_argument("--csv", help="replay a CSV of seconds,temperature instead")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    trace = csv_trace(args.csv) if args.csv else synthetic_trace(args.hours)
+    hours = max(1e-9, (trace[-1][0] - trace[0][0]) / 3600.0) if trace else 1e-9
+    results = {}
+    for name, opts in CONFIGS.items():
+        res = replay(trace, opts)
+        writes = res["writes"]
+        steady = [
+            w for w in writes if w[0] % SPIKE_EVERY_S < SPIKE_EVERY_S - SPIKE_LEN_S - 600
+        ]
+        results[name] = {
+            "writes": len(writes),
+            "writes_per_h": round(len(writes) / hours, 1),
+            "steady_writes_per_h": round(len(steady) / hours, 1),
+            "spike_response_s": [] if args.csv else spike_response(trace, writes),
+            "outcomes": res["outcomes"],
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{len(trace)} samples, {hours:.1f} h")
+    print(f"{'config':22}{'writes':>8}{'/h':>8}{'steady/h':>10}  spike response (s)")
+    for name, r in results.items():
+        print(
+            f"{name:22}{r['writes']:>8}{r['writes_per_h']:>8}{r['steady_writes_per_h']:>10}  "
+            f"{r['spike_response_s']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
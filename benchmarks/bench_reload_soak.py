@@ -0,0 +1,189 @@
+"""Reload soak test: set up / reload one entry many times and check for leaks.
+
+Runs a real (test) Home Assistant core with the integration loaded from this
+repo, pointed at one simulated device with temperature control enabled, and
+reloads the entry `--cycles` times (a temperature change is fired in every
+cycle so the controller's state tracker and evaluation tasks are exercised).
+
+After a warm-up it samples and compares against the end of the run:
+- event bus listener counts (state-change trackers, coordinator listeners)
+- registered domain services, pending asyncio tasks
+- live integration objects (devices, APIs, coordinators, controllers, fans)
+- Python memory allocated by the integration's own code (tracemalloc,
+  filtered to custom_components/openfan_micro); the process-wide total is
+  reported for information only, because Home Assistant core itself keeps
+  one `EntityPlatform` per platform and reload in `hass.data` (not caused
+  by, and not fixable from, an integration)
+
+Finally the entry is unloaded and the services must be gone. Any growth
+beyond the tolerances fails the run (exit code 1).
+
+Usage (from the repo root, needs homeassistant + pytest-homeassistant-custom-component):
+    python -m benchmarks.bench_reload_soak --cycles 1000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+from homeassistant import loader
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from tools.simulator import SimulatorFleet
+
+DOMAIN = "openfan_micro"
+TEMP_ENTITY = "sensor.soak_temperature"
+REPO_ROOT = Path(__file__).resolve().parent.parent
+INTEGRATION_FILES = str(REPO_ROOT / "custom_components" / DOMAIN / "*")
+LIVE_TYPES = ("OpenFanDevice", "OpenFanApi", "OpenFanCoordinator", "TempController", "RpmController", "OpenFan")
+
+# Integration memory growth allowed between the warm-up sample and the end of the run
+MEM_TOLERANCE_BYTES = 16 * 1024
+
+
+def _count_live() -> int:
+    return sum(1 for obj in gc.get_objects() if type(obj).__name__ in LIVE_TYPES)
+
+
+def _integration_bytes() -> int:
+    if not tracemalloc.is_tracing():
+        return 0
+    snap = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(True, INTEGRATION_FILES)]
+    )
+    return sum(stat.size for stat in snap.statistics("filename"))
+
+
+def _sample(hass: Any) -> dict[str, Any]:
+    gc.collect()
+    listeners = hass.bus.async_listeners()
+    return {
+        "bus_listeners": sum(listeners.values()),
+        "state_listeners": listeners.get("state_changed", 0),
+        "services": len(hass.services.async_services().get(DOMAIN, {})),
+        "tasks": len(asyncio.all_tasks()),
+        "live_objects": _count_live(),
+        "integration_bytes": _integration_bytes(),
+        "traced_bytes": tracemalloc.get_traced_memory()[0],
+    }
+
+
+async def soak(cycles: int, warmup: int) -> dict[str, Any]:
+    fleet = SimulatorFleet.build(1)
+    (host,) = fleet.start_in_thread()
+    try:
+        async with async_test_home_assistant(config_dir=str(REPO_ROOT)) as hass:
+            # Load custom_components/ from the repo; the metrics view is off, so
+            # no HTTP server is needed (http/websocket_api are marked as loaded).
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+            hass.config.components.update(("http", "websocket_api"))
+            # the shared aiohttp session needs the network integration
+            assert await async_setup_component(hass, "network", {})
+            hass.states.async_set(TEMP_ENTITY, "40.0")
+
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                unique_id=host,
+                title=f"Soak {host}",
+                data={"host": host, "name": f"Soak {host}"},
+                options={
+                    "poll_interval": 1,
+                    "min_pwm": 20,
+                    "min_pwm_calibrated": True,
+                    "temp_entity": TEMP_ENTITY,
+                    "temp_curve": "30=20, 50=60, 70=100",
+                    "temp_update_min_interval": 2,
+                    "temp_deadband_pct": 0,
+                },
+            )
+            entry.add_to_hass(hass)
+            baseline = _sample(hass)
+
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            warm: dict[str, Any] = {}
+            for cycle in range(1, cycles + 1):
+                assert await hass.config_entries.async_reload(entry.entry_id)
+                hass.states.async_set(TEMP_ENTITY, f"{40 + cycle % 20:.1f}")
+                await hass.async_block_till_done()
+                if cycle == warmup:
+                    warm = _sample(hass)
+            elapsed = time.perf_counter() - started
+            end = _sample(hass)
+
+            assert entry.state is ConfigEntryState.LOADED
+            assert await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_block_till_done()
+            unloaded = _sample(hass)
+            tracemalloc.stop()
+    finally:
+        fleet.stop_thread()
+
+    failures = []
+    for key in ("bus_listeners", "state_listeners", "services", "tasks", "live_objects"):
+        if end[key] > warm[key]:
+            failures.append(f"{key} grew {warm[key]} -> {end[key]}")
+    growth = end["integration_bytes"] - warm["integration_bytes"]
+    if growth > MEM_TOLERANCE_BYTES:
+        failures.append(f"integration memory grew by {growth} bytes")
+    if unloaded["services"]:
+        failures.append(f"{unloaded['services']} services left after last unload")
+    if unloaded["state_listeners"] > baseline["state_listeners"]:
+        failures.append("state listeners left after unload")
+    if unloaded["live_objects"]:
+        failures.append(f"{unloaded['live_objects']} integration objects alive after unload")
+
+    return {
+        "cycles": cycles,
+        "reloads_per_s": round(cycles / elapsed, 1) if elapsed > 0 else None,
+        "baseline": baseline,
+        "after_warmup": warm,
+        "end": end,
+        "after_unload": unloaded,
+        "memory_growth_bytes": growth,
+        "failures": failures,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=1000, help="number of entry reloads")
+    parser.add_argument("--warmup", type=int, default=50, help="reloads before the reference sample")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a summary")
+    parser.add_argument("--verbose", action="store_true", help="show integration log output")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.CRITICAL)
+
+    result = asyncio.run(soak(max(args.cycles, args.warmup + 1), args.warmup))
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['cycles']} reloads, {result['reloads_per_s']} reloads/s")
+        print(f"{'':18}{'warm-up':>12}{'end':>12}{'unloaded':>12}")
+        for key in result["end"]:
+            print(
+                f"{key:18}{result['after_warmup'][key]:>12}{result['end'][key]:>12}"
+                f"{result['after_unload'][key]:>12}"
+            )
+        print("OK" if not result["failures"] else "FAIL: " + "; ".join(result["failures"]))
+    return 0 if not result["failures"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
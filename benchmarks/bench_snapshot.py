@@ -0,0 +1,217 @@
+"""Coordinator data at fleet scale: dict-per-poll layout vs. `DeviceStatus` snapshots.
+
+Replays polls of a simulated fleet (no HTTP, no Home Assistant) through
+both data layouts and reports, per fleet-wide update:
+- build time of the coordinator data for every device
+- allocations: tracemalloc peak bytes, and memory blocks the new data
+  holds on to (`sys.getallocatedblocks()` delta, previous data still alive)
+- entity state writes: every entity on every poll (dict layout) vs. only
+  entities whose watched fields changed (snapshot change bitmask)
+and the time of one state render of every entity (RPM sensor, stall
+sensor, fan percentage, LED and 12V switches).
+
+Two traces: `jitter` (RPM wobbles a few RPM every poll, the usual case)
+and `steady` (nothing changes, e.g. with the RPM median filter on).
+
+Usage (from the repo root):
+    python -m benchmarks.bench_snapshot --devices 10,100,500 --channels 1
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from tools._loader import load_integration_module
+
+snap = load_integration_module("snapshot")
+
+ROUNDS = 50
+
+
+# ---- the two layouts ----
+
+
+def build_dicts(prev: Any, status: dict[int, tuple[int, int]], led: bool, is_12v: bool) -> dict:
+    """Dict layout as built per poll before snapshots (one fresh dict tree)."""
+    channels = {
+        ch: {"rpm": int(max(0, rpm)), "pwm": int(max(0, min(100, pwm))), "stalled": False}
+        for ch, (rpm, pwm) in sorted(status.items())
+    }
+    first = channels.get(0) or {"rpm": 0, "pwm": 0, "stalled": False}
+    return {
+        "rpm": first["rpm"],
+        "pwm": first["pwm"],
+        "led": bool(led),
+        "is_12v": bool(is_12v),
+        "stalled": first["stalled"],
+        "channels": channels,
+    }
+
+
+def build_snapshot(prev: Any, status: dict[int, tuple[int, int]], led: bool, is_12v: bool) -> Any:
+    channels = {
+        ch: (int(max(0, rpm)), int(max(0, min(100, pwm))), False, None)
+        for ch, (rpm, pwm) in status.items()
+    }
+    return snap.build_status(prev, channels, bool(led), bool(is_12v))
+
+
+def render_dicts(data: dict, channels: int) -> int:
+    """State render of every entity of one device, dict layout (`.get()` chains + casts)."""
+    acc = 0
+    for ch in range(channels):
+        chd = ((data or {}).get("channels") or {}).get(ch) or {}
+        acc += int(chd.get("rpm") or 0)  # RPM sensor
+        acc += bool(chd.get("stalled", False))  # stall sensor
+        acc += int(chd.get("pwm")) if "pwm" in chd else 0  # fan percentage
+    acc += bool((data or {}).get("led")) + bool((data or {}).get("is_12v"))  # switches
+    return acc
+
+
+def render_snapshot(data: Any, channels: int) -> int:
+    acc = 0
+    for ch in range(channels):
+        st = data.channel(ch) if data is not None else None
+        acc += st.rpm if st is not None else 0
+        acc += st.stalled if st is not None else False
+        acc += st.pwm if st is not None else 0
+    acc += data.led + data.is_12v
+    return acc
+
+
+def writes_dicts(prev: Any, data: Any, channels: int) -> int:
+    """Every coordinator entity writes its state on every poll."""
+    return 2 * channels + 2
+
+
+def writes_snapshot(prev: Any, data: Any, channels: int) -> int:
+    """RPM / stall sensors and switches write only when their watched bits changed."""
+    n = 0
+    for ch in range(channels):
+        st = data.channel(ch)
+        n += bool(st.changed & snap.RPM) + bool(st.changed & snap.STALLED)
+    n += bool(data.changed & snap.LED) + bool(data.changed & snap.IS_12V)
+    return n
+
+
+LAYOUTS: dict[str, tuple[Callable, Callable, Callable]] = {
+    "dict": (build_dicts, render_dicts, writes_dicts),
+    "snapshot": (build_snapshot, render_snapshot, writes_snapshot),
+}
+
+
+# ---- traces ----
+
+
+def make_polls(devices: int, channels: int, rounds: int, jitter: bool, seed: int = 1) -> list:
+    """polls[r][d] = ({channel: (rpm, pwm)}, led, is_12v)."""
+    rng = random.Random(seed)
+    base = [[rng.randrange(600, 1800) for _ in range(channels)] for _ in range(devices)]
+    out = []
+    for _ in range(rounds):
+        row = []
+        for d in range(devices):
+            status = {
+                ch: (base[d][ch] + (rng.randint(-6, 6) if jitter else 0), 60) for ch in range(channels)
+            }
+            row.append((status, True, True))
+        out.append(row)
+    return out
+
+
+def run(layout: str, polls: list, channels: int) -> dict[str, Any]:
+    build, render, writes = LAYOUTS[layout]
+    devices = len(polls[0])
+    data: list[Any] = [None] * devices
+
+    # warm-up poll (first snapshot marks everything changed)
+    for d, (status, led, v12) in enumerate(polls[0]):
+        data[d] = build(data[d], status, led, v12)
+
+    build_s = 0.0
+    peak = 0
+    blocks = 0
+    n_writes = 0
+    for row in polls[1:]:
+        prev = list(data)
+        t0 = time.perf_counter()
+        for d, (status, led, v12) in enumerate(row):
+            data[d] = build(data[d], status, led, v12)
+        build_s += time.perf_counter() - t0
+        n_writes += sum(writes(prev[d], data[d], channels) for d in range(devices))
+
+    # allocation pass over the same polls (tracemalloc would distort the timing above)
+    data = [None] * devices
+    for d, (status, led, v12) in enumerate(polls[0]):
+        data[d] = build(data[d], status, led, v12)
+    gc.disable()
+    try:
+        for row in polls[1:]:
+            prev = list(data)  # keep the previous data alive: count what the update adds
+            before = sys.getallocatedblocks()
+            tracemalloc.start()
+            for d, (status, led, v12) in enumerate(row):
+                data[d] = build(data[d], status, led, v12)
+            peak += tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            blocks += sys.getallocatedblocks() - before
+            del prev
+    finally:
+        gc.enable()
+    updates = len(polls) - 1
+
+    t0 = time.perf_counter()
+    reps = 20
+    for _ in range(reps):
+        for d in range(devices):
+            render(data[d], channels)
+    render_s = (time.perf_counter() - t0) / reps
+
+    return {
+        "build_us": round(build_s / updates * 1e6, 1),
+        "alloc_peak_kib": round(peak / updates / 1024, 1),
+        "new_blocks": round(blocks / updates, 1),
+        "state_writes": round(n_writes / updates, 1),
+        "render_us": round(render_s * 1e6, 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", default="10,100,500", help="comma-separated fleet sizes")
+    parser.add_argument("--channels", type=int, default=1, help="fan channels per device")
+    parser.add_argument("--rounds", type=int, default=ROUNDS, help="polls per fleet size")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    results: dict[str, Any] = {}
+    for size in [int(s) for s in args.devices.split(",") if s.strip()]:
+        for trace in ("jitter", "steady"):
+            polls = make_polls(size, args.channels, args.rounds, jitter=trace == "jitter")
+            for layout in LAYOUTS:
+                results[f"{size}/{trace}/{layout}"] = run(layout, polls, args.channels)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print("per fleet-wide update (build, allocations, state writes) and per full render:")
+    print(
+        f"{'devices/trace/layout':28}{'build µs':>10}{'peak KiB':>10}"
+        f"{'+blocks':>10}{'writes':>8}{'render µs':>11}"
+    )
+    for key, r in results.items():
+        print(
+            f"{key:28}{r['build_us']:>10}{r['alloc_peak_kib']:>10}"
+            f"{r['new_blocks']:>10}{r['state_writes']:>8}{r['render_us']:>11}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,6 +4,7 @@ Exposes:
 - `api`: low-level HTTP client
 - `coordinator`: DataUpdateCoordinator for polling status
 - `device_info()`: HA device registry metadata
+- channel helpers for multi-channel controllers (`channels`, `channel_status()`)
 - optional MAC handling (if device/API does not provide one)
 """
 from __future__ import annotations
@@ -16,6 +17,7 @@ from homeassistant.helpers.device_registry import format_mac
 
 from .api import OpenFanApi
 from .coordinator import OpenFanCoordinator
+from .snapshot import ChannelStatus, DeviceStatus
 
 try:
     from .const import DOMAIN  # type: ignore
@@ -31,6 +33,7 @@ class OpenFanDevice:
         name: Optional[str] = None,
         *,
         mac: Optional[str] = None,
+        firmware: Optional[str] = None,
         session=None,
     ) -> None:
         self.hass = hass
@@ -49,6 +52,7 @@ class OpenFanDevice:
             "host": host,
             "name": self.name,
             "mac": mac,
+            "firmware": firmware,
             "model": "OpenFAN Micro",
             "manufacturer": "Karanovic Research",
         }
@@ -81,6 +85,8 @@ class OpenFanDevice:
             "model": self._fixed_data.get("model", "OpenFAN Micro"),
             "name": self._fixed_data.get("name", self.name),
         }
+        if self._fixed_data.get("firmware"):
+            info["sw_version"] = self._fixed_data["firmware"]
         m = self.mac
         if m:
             try:
@@ -91,8 +97,42 @@ class OpenFanDevice:
         return info
 
     @property
-    def coordinator_data(self) -> dict[str, Any]:
-        return dict(self.coordinator.data or {})
+    def channels(self) -> int:
+        """Number of fan channels on this host (1 for the OpenFAN Micro)."""
+        return max(1, int(getattr(self.api, "channels", 1) or 1))
+
+    def channel_status(self, channel: int) -> Optional[ChannelStatus]:
+        """Latest status of one channel (None before the first poll); not a copy."""
+        data = self.coordinator.data
+        return data.channel(channel) if data is not None else None
+
+    def channel_name(self, channel: int) -> str:
+        return self.name if self.channels == 1 else f"{self.name} Fan {channel}"
+
+    @staticmethod
+    def channel_suffix(channel: int) -> str:
+        """Unique-id suffix; channel 0 keeps the single-fan ids."""
+        return "" if channel == 0 else f"_ch{channel}"
+
+    def fan_unique_id(self, channel: int) -> str:
+        """Unique id of the fan entity of `channel`."""
+        return f"openfan_micro_fan_{self.host}{self.channel_suffix(channel)}"
+
+    def channel_of(self, unique_id: Optional[str]) -> Optional[int]:
+        """Channel of this device's fan entity `unique_id`, None if it is not one of them.
+
+        Compared with the ids the device builds rather than parsed, so a
+        host that itself ends in `_ch<n>` is not read as a channel suffix.
+        """
+        for channel in range(self.channels):
+            if unique_id == self.fan_unique_id(channel):
+                return channel
+        return None
+
+    @property
+    def coordinator_data(self) -> Optional[DeviceStatus]:
+        """Latest immutable snapshot (shared, not copied)."""
+        return self.coordinator.data
 
     def __repr__(self) -> str:  # pragma: no cover
         return f"<OpenFanDevice host={self.host} name={self.name!r} mac={self.mac!r}>"
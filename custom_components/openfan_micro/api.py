@@ -3,20 +3,55 @@
 Features:
 - Robust GET handling (JSON or plain text)
 - Firmware compatibility (new/legacy fan status/set endpoints)
+- Multi-channel controllers: all channels read from one batched status
+  request, batched writes (one `all/set` when every channel gets the same
+  value, otherwise concurrent per-channel sets)
 - Status payload normalization (top-level vs "data" container)
 - LED control and 5V/12V supply switching per documented endpoints
+- Per-endpoint request counters and latency histograms (see `metrics.py`)
+- Lightweight `probe()` returning identity + a capability fingerprint; the
+  fingerprint (and endpoints learned at runtime) order requests so the
+  working endpoint is tried first
+- Single-flight reads: concurrent status reads share one request and its
+  result; with `_read_ttl` > 0 a reply that young is served from cache.
+  Every write starts a new generation, so reads issued after a write never
+  get a reply that was requested before it
 """
 from __future__ import annotations
 
-from typing import Any, Tuple, Optional
+from typing import Any, Awaitable, Callable, Tuple, Optional
+import asyncio
 import logging
-import json
+import time
 
 import aiohttp
 import async_timeout
 
+from .metrics import ApiStats
+
 _LOGGER = logging.getLogger(__name__)
 
+STATUS_PATHS: tuple[str, ...] = ("/api/v0/fan/status", "/api/v0/fan/0/status")
+SET_PATHS: tuple[str, ...] = ("/api/v0/fan/0/set?value={value}", "/api/v0/fan/set?value={value}")
+CHANNEL_STATUS_PATH = "/api/v0/fan/{channel}/status"
+CHANNEL_SET_PATH = "/api/v0/fan/{channel}/set?value={value}"
+ALL_SET_PATH = "/api/v0/fan/all/set?value={value}"
+MAX_CHANNELS = 16
+PROBE_TIMEOUT = 2.0
+
+# Keys some firmwares use for identity data in /api/v0/openfan/status
+_MAC_KEYS = ("mac", "mac_address", "macAddress", "wifi_mac")
+_FW_KEYS = ("version", "fw_version", "firmware", "firmware_version")
+_HOSTNAME_KEYS = ("hostname", "host_name", "name")
+
+
+def _first(container: dict, keys: tuple[str, ...]) -> Optional[str]:
+    for key in keys:
+        val = container.get(key)
+        if val not in (None, ""):
+            return str(val)
+    return None
+
 
 class OpenFanApi:
     def __init__(self, host: str, session: aiohttp.ClientSession) -> None:
@@ -27,31 +62,74 @@ class OpenFanApi:
         self._min_pwm: int = 0
         self._failure_threshold: int = 3
         self._stall_consecutive: int = 3
+        # Request counters / latency histograms (fixed size)
+        self.stats = ApiStats()
+        # Endpoint preference; reordered when a fallback succeeds
+        self._status_paths: tuple[str, ...] = STATUS_PATHS
+        self._set_paths: tuple[str, ...] = SET_PATHS
+        # None = unknown, False = firmware has no /api/v0/openfan/status
+        self.has_openfan_status: Optional[bool] = None
+        # Fan channels on this host; auto-detected from the batched status
+        # reply unless fixed via set_channels()
+        self.channels: int = 1
+        self._channels_auto = True
+        # None = unknown, False = firmware rejected /api/v0/fan/all/set
+        self._has_all_set: Optional[bool] = None
+        # Last PWM sent per channel (used when status replies carry RPM only)
+        self._commanded: dict[int, int] = {}
+        # False once a status reply carried RPM only (PWM is then `_commanded`)
+        self.pwm_readback = True
+        # Last LED / supply state sent (None = never set from here) and the
+        # uptime (s) from openfan/status, if the firmware reports one
+        self._commanded_led: Optional[bool] = None
+        self._commanded_12v: Optional[bool] = None
+        self.uptime: Optional[float] = None
+        # Single-flight reads: key -> (generation, task); replies cached for
+        # `_read_ttl` seconds (0 = no cache) as key -> (generation, ts, result)
+        self._read_ttl: float = 0.0
+        self._generation = 0
+        self._inflight: dict[str, tuple[int, asyncio.Task]] = {}
+        self._read_cache: dict[str, tuple[int, float, Any]] = {}
 
     # -------------------- HTTP helpers --------------------
 
-    async def _get_any(self, path: str) -> tuple[int, str, Optional[dict]]:
+    async def _get_any(self, path: str, timeout: float = 6) -> tuple[int, str, Optional[dict]]:
         """HTTP GET that returns (status_code, text, json_or_none).
 
         We *do not* fail if body is not JSON (some firmwares reply plain 'OK').
         """
         url = f"http://{self._host}{path}"
-        async with async_timeout.timeout(6):
-            async with self._session.get(url) as resp:
-                status = resp.status
-                text = await resp.text()
-                data = None
-                try:
-                    data = await resp.json(content_type=None)
-                except Exception:
-                    # not JSON (acceptable for 'set' endpoints)
-                    pass
+        ep = self.stats.endpoint(path)
+        ep.requests += 1
+        started = time.monotonic()
+        try:
+            async with async_timeout.timeout(timeout):
+                async with self._session.get(url) as resp:
+                    status = resp.status
+                    text = await resp.text()
+                    # body is cached by aiohttp; read() does no extra I/O
+                    ep.bytes_received += len(await resp.read())
+                    data = None
+                    try:
+                        data = await resp.json(content_type=None)
+                    except Exception:
+                        # not JSON (acceptable for 'set' endpoints)
+                        pass
+        except asyncio.TimeoutError:
+            ep.timeouts += 1
+            ep.errors += 1
+            raise
+        except Exception:
+            ep.errors += 1
+            raise
+        finally:
+            ep.latency.record(time.monotonic() - started)
         _LOGGER.debug("OpenFAN %s GET %s -> %s %s", self._host, path, status, data or text)
         return status, text, data
 
-    async def _get_json(self, path: str) -> dict:
+    async def _get_json(self, path: str, timeout: float = 6) -> dict:
         """HTTP GET that *requires* JSON. Raises on HTTP error or non-JSON."""
-        status, text, data = await self._get_any(path)
+        status, text, data = await self._get_any(path, timeout)
         if status >= 400:
             _LOGGER.error("OpenFAN %s HTTP %s on %s: %s", self._host, status, path, text)
             raise RuntimeError(f"HTTP {status} for {path}")
@@ -60,6 +138,44 @@ class OpenFanApi:
             raise RuntimeError(f"Non-JSON response for {path}")
         return data
 
+    async def _shared_read(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `fetch()` once for all concurrent callers of `key` (same generation).
+
+        The request runs as its own task, so a cancelled caller does not
+        cancel it for the others. Failures are shared but never cached.
+        """
+        gen = self._generation
+        if self._read_ttl > 0:
+            hit = self._read_cache.get(key)
+            if hit is not None and hit[0] == gen and time.monotonic() - hit[1] <= self._read_ttl:
+                self.stats.cached_reads += 1
+                return hit[2]
+        pending = self._inflight.get(key)
+        if pending is not None and pending[0] == gen:
+            self.stats.shared_reads += 1
+            return await asyncio.shield(pending[1])
+
+        async def _run() -> Any:
+            try:
+                result = await fetch()
+            finally:
+                if self._inflight.get(key, (None, None))[1] is task:
+                    del self._inflight[key]
+            if self._read_ttl > 0 and gen == self._generation:
+                self._read_cache[key] = (gen, time.monotonic(), result)
+            return result
+
+        task = asyncio.get_running_loop().create_task(_run())
+        # retrieve the exception even if every caller was cancelled
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[key] = (gen, task)
+        return await asyncio.shield(task)
+
+    def _wrote(self) -> None:
+        """A write was sent: later reads must not reuse earlier replies."""
+        self._generation += 1
+        self._read_cache.clear()
+
     def _is_ok_payload(self, payload: Optional[dict], text: str = "") -> bool:
         """Return True if payload/text indicates success."""
         if isinstance(payload, dict):
@@ -93,33 +209,147 @@ class OpenFanApi:
 
         return max(0, rpm), max(0, min(100, pwm))
 
+    @staticmethod
+    def _promote(paths: tuple[str, ...], path: str) -> tuple[str, ...]:
+        return (path,) + tuple(p for p in paths if p != path)
+
+    def _parse_channels(self, data: dict) -> dict[int, Tuple[int, Optional[int]]]:
+        """Normalize a (possibly batched) status reply to {channel: (rpm, pwm%)}.
+
+        Accepted layouts: single-fan object (Micro, channel 0), a `fans` list,
+        or a mapping keyed by channel number whose values are either status
+        objects or bare RPM numbers (PWM then is the last commanded value, or
+        None if nothing was commanded on that channel yet).
+        """
+        container: Any = data
+        if isinstance(data.get("data"), (dict, list)):
+            container = data["data"]
+        if isinstance(container, dict) and isinstance(container.get("fans"), list):
+            container = container["fans"]
+        if isinstance(container, list):
+            items = list(enumerate(container))
+        elif container and all(str(k).isdigit() for k in container):
+            items = [(int(k), v) for k, v in container.items()]
+        else:
+            return {0: self._parse_status_payload(container)}
+
+        result: dict[int, Tuple[int, Optional[int]]] = {}
+        for ch, item in items:
+            if ch >= MAX_CHANNELS:
+                continue
+            if isinstance(item, dict):
+                result[ch] = self._parse_status_payload(item)
+                continue
+            try:
+                rpm = max(0, int(float(item)))
+            except Exception:
+                rpm = 0
+            self.pwm_readback = False
+            result[ch] = (rpm, self._commanded.get(ch))
+        return result
+
+    def set_channels(self, count: int) -> None:
+        """Fix the channel count (1..MAX_CHANNELS); 0 = auto-detect from status replies."""
+        count = max(0, min(MAX_CHANNELS, int(count)))
+        self._channels_auto = count == 0
+        if count:
+            self.channels = count
+
     async def get_status(self) -> Tuple[int, int]:
-        """Return (rpm, pwm_percent). Tries both new and legacy endpoints."""
+        """Return (rpm, pwm_percent) of channel 0. Tries both new and legacy endpoints."""
+        status = await self.get_status_all()
+        if 0 not in status:
+            raise RuntimeError(f"No status for channel 0 of {self._host}")
+        return status[0]
+
+    async def get_status_all(self) -> dict[int, Tuple[int, int]]:
+        """Return {channel: (rpm, pwm_percent)} for every channel of the host.
+
+        One request on firmware with a batched status endpoint; the endpoint
+        that answered last is tried first on the next call. Channels missing
+        from the reply (single-fan endpoints), or reported without a PWM that
+        was never commanded, are read per channel, concurrently. A channel
+        whose read fails is left out of the result; the others still count.
+        Concurrent callers share one read (see `_shared_read`).
+        """
+        return dict(await self._shared_read("status", self._fetch_status_all))
+
+    async def read_status_all(self) -> dict[int, Tuple[int, int]]:
+        """`get_status_all()` as its own request: never shared with or served from other reads.
+
+        For measuring the device itself (load tests); the integration reads
+        through `get_status_all()`.
+        """
+        return await self._fetch_status_all()
+
+    async def _fetch_status_all(self) -> dict[int, Tuple[int, int]]:
         last_exc: Optional[Exception] = None
-        for path in ("/api/v0/fan/status", "/api/v0/fan/0/status"):
+        paths = self._status_paths
+        for idx, path in enumerate(paths):
+            if idx:
+                self.stats.legacy_fallbacks += 1
             try:
-                data = await self._get_json(path)
-                # Some firmwares wrap in {"status":"ok","data":{...}}
-                if isinstance(data, dict) and "data" in data and isinstance(data["data"], dict):
-                    data = data["data"]
-                return self._parse_status_payload(data)
+                result = self._parse_channels(await self._get_json(path))
+                if idx:
+                    self._status_paths = self._promote(paths, path)
+                break
             except Exception as exc:
                 last_exc = exc
                 _LOGGER.debug("OpenFAN %s: get_status via %s failed: %r", self._host, path, exc)
-        assert last_exc is not None
-        raise last_exc
+        else:
+            assert last_exc is not None
+            raise last_exc
+
+        if self._channels_auto and len(result) > self.channels:
+            self.channels = len(result)
+        missing = [
+            ch for ch in range(self.channels) if ch not in result or result[ch][1] is None
+        ]
+        if missing:
+            replies = await asyncio.gather(
+                *(self._get_json(CHANNEL_STATUS_PATH.format(channel=ch)) for ch in missing),
+                return_exceptions=True,
+            )
+            for ch, data in zip(missing, replies):
+                if isinstance(data, Exception):
+                    last_exc = data
+                    result.pop(ch, None)
+                    _LOGGER.debug("OpenFAN %s: status of channel %d failed: %r", self._host, ch, data)
+                    continue
+                result[ch] = self._parse_channels(data).get(0, (0, 0))
+            if not result:
+                raise last_exc
+        return result
 
-    async def set_pwm(self, value: int) -> dict[str, Any]:
-        """Set PWM 0..100; supports both new and legacy endpoints.
+    async def set_pwm(self, value: int, channel: int = 0) -> dict[str, Any]:
+        """Set PWM 0..100 on one channel; supports both new and legacy endpoints.
 
         Treats non-JSON 'OK' responses as success.
         """
         value = max(0, min(100, int(value)))
+        channel = int(channel)
+        self._wrote()
+        if channel:
+            # only channel 0 has legacy endpoint variants
+            path = CHANNEL_SET_PATH.format(channel=channel, value=value)
+            status, text, data = await self._get_any(path)
+            if status >= 400 or not self._is_ok_payload(data, text):
+                raise RuntimeError(f"Bad response on {path}: {status} {text!r}")
+            self._commanded[channel] = value
+            return data or {"status": "ok"}
+
         last_exc: Optional[Exception] = None
-        for path in (f"/api/v0/fan/0/set?value={value}", f"/api/v0/fan/set?value={value}"):
+        templates = self._set_paths
+        for idx, tmpl in enumerate(templates):
+            if idx:
+                self.stats.legacy_fallbacks += 1
+            path = tmpl.format(value=value)
             try:
                 status, text, data = await self._get_any(path)
                 if status < 400 and self._is_ok_payload(data, text):
+                    if idx:
+                        self._set_paths = self._promote(templates, tmpl)
+                    self._commanded[0] = value
                     return data or {"status": "ok"}
                 raise RuntimeError(f"Bad response on {path}: {status} {text!r}")
             except Exception as exc:
@@ -128,25 +358,76 @@ class OpenFanApi:
         assert last_exc is not None
         raise last_exc
 
+    async def set_pwm_many(self, values: dict[int, int]) -> None:
+        """Set PWM on several channels in one pass.
+
+        The same value for every channel of a multi-channel host is one
+        `all/set` request (if the firmware has it); otherwise the per-channel
+        writes are sent concurrently.
+        """
+        values = {int(ch): max(0, min(100, int(v))) for ch, v in values.items()}
+        if not values:
+            return
+        if (
+            len(values) > 1
+            and self._has_all_set is not False
+            and len(set(values.values())) == 1
+            and set(values) == set(range(self.channels))
+        ):
+            value = next(iter(values.values()))
+            path = ALL_SET_PATH.format(value=value)
+            self._wrote()
+            try:
+                status, text, data = await self._get_any(path)
+                if status < 400 and self._is_ok_payload(data, text):
+                    self._has_all_set = True
+                    self._commanded.update(values)
+                    return
+                if status in (404, 405, 501):
+                    self._has_all_set = False
+            except Exception as exc:
+                _LOGGER.debug("OpenFAN %s: set via %s failed: %r", self._host, path, exc)
+        await asyncio.gather(*(self.set_pwm(v, ch) for ch, v in values.items()))
+
     # -------------------- LED & SUPPLY VOLTAGE --------------------
 
     async def get_openfan_status(self) -> Tuple[bool, bool]:
-        """Return (led_enabled, is_12v) from /api/v0/openfan/status."""
-        data = await self._get_json("/api/v0/openfan/status")
+        """Return (led_enabled, is_12v) from /api/v0/openfan/status (single-flight)."""
+        data = await self._shared_read(
+            "openfan_status", lambda: self._get_json("/api/v0/openfan/status")
+        )
         # expected: {"status":"ok","data":{"act_led_enabled":"true","fan_is_12v":"true"}}
         container = data.get("data", data)
+        self.uptime = self._parse_uptime(container)
+        return self._parse_openfan_status(container)
+
+    @staticmethod
+    def _parse_openfan_status(container: dict) -> Tuple[bool, bool]:
         led_raw = str(container.get("act_led_enabled", "false")).strip().lower()
         v12_raw = str(container.get("fan_is_12v", "false")).strip().lower()
         led = led_raw in ("true", "1", "yes", "on")
         is_12v = v12_raw in ("true", "1", "yes", "on")
         return led, is_12v
 
+    @staticmethod
+    def _parse_uptime(container: dict) -> Optional[float]:
+        """Uptime in seconds (`uptime` / `uptime_s` or `uptime_ms`), None if not reported."""
+        for key, scale in (("uptime", 1.0), ("uptime_s", 1.0), ("uptime_ms", 0.001)):
+            if key in container:
+                try:
+                    return float(container[key]) * scale
+                except (TypeError, ValueError):
+                    return None
+        return None
+
     async def led_set(self, enabled: bool) -> dict:
         """Enable/disable activity LED (supported firmwares)."""
         path = "/api/v0/led/enable" if enabled else "/api/v0/led/disable"
+        self._wrote()
         status, text, data = await self._get_any(path)
         if status >= 400:
             raise RuntimeError(f"LED set failed: {status} {text}")
+        self._commanded_led = bool(enabled)
         if not self._is_ok_payload(data, text):
             _LOGGER.debug("OpenFAN %s: LED set non-OK body: %s", self._host, data or text)
         return data or {"status": "ok"}
@@ -154,9 +435,90 @@ class OpenFanApi:
     async def set_voltage_12v(self, enabled: bool) -> dict:
         """Switch fan supply to 12V (True) or 5V (False). Requires confirm=true."""
         path = "/api/v0/fan/voltage/high?confirm=true" if enabled else "/api/v0/fan/voltage/low?confirm=true"
+        self._wrote()
         status, text, data = await self._get_any(path)
         if status >= 400:
             raise RuntimeError(f"Voltage set failed: {status} {text}")
+        self._commanded_12v = bool(enabled)
         if not self._is_ok_payload(data, text):
             _LOGGER.debug("OpenFAN %s: voltage set non-OK body: %s", self._host, data or text)
         return data or {"status": "ok"}
+
+    # -------------------- PROBE / FINGERPRINT --------------------
+
+    async def probe(self, timeout: float = PROBE_TIMEOUT) -> dict[str, Any]:
+        """Cheap connectivity check for config flow / discovery.
+
+        One GET of /api/v0/openfan/status with a short timeout. Only firmware
+        without that endpoint costs a second request (legacy fan status).
+        Returns {"mac", "firmware", "hostname", "led", "is_12v", "fingerprint"};
+        raises on network errors or if the host does not look like an OpenFAN.
+        """
+        status, text, data = await self._get_any("/api/v0/openfan/status", timeout)
+        if status < 400 and isinstance(data, dict):
+            container = data.get("data", data)
+            if isinstance(container, dict) and (
+                "act_led_enabled" in container or "fan_is_12v" in container
+            ):
+                led, is_12v = self._parse_openfan_status(container)
+                self.has_openfan_status = True
+                return {
+                    "mac": _first(container, _MAC_KEYS),
+                    "firmware": _first(container, _FW_KEYS),
+                    "hostname": _first(container, _HOSTNAME_KEYS),
+                    "led": led,
+                    "is_12v": is_12v,
+                    "fingerprint": {
+                        "openfan_status": True,
+                        "wrapped": "data" in data,
+                        "status_path": None,
+                    },
+                }
+        if status < 400:
+            raise RuntimeError(f"Unexpected reply on /api/v0/openfan/status: {text[:80]!r}")
+
+        # Older firmware: no device-status endpoint; fan/0/status exists on all variants
+        legacy = STATUS_PATHS[1]
+        # (checked quietly: during a subnet scan most HTTP hosts are not fans)
+        status, text, data = await self._get_any(legacy, timeout)
+        if isinstance(data, dict) and isinstance(data.get("data"), dict):
+            data = data["data"]
+        if status >= 400 or not isinstance(data, dict) or not any(
+            k in data for k in ("rpm", "pwm", "pwm_percent", "pwm_value")
+        ):
+            raise RuntimeError(f"Host does not look like an OpenFAN Micro: {status} {text[:80]!r}")
+        self.has_openfan_status = False
+        self._status_paths = self._promote(self._status_paths, legacy)
+        return {
+            "mac": None,
+            "firmware": None,
+            "hostname": None,
+            "led": None,
+            "is_12v": None,
+            "fingerprint": {"openfan_status": False, "wrapped": False, "status_path": legacy},
+        }
+
+    @property
+    def fingerprint(self) -> dict[str, Any]:
+        """Capabilities known so far (probe result + endpoints learned at runtime)."""
+        return {
+            "openfan_status": self.has_openfan_status,
+            "status_path": self._status_paths[0] if self._status_paths != STATUS_PATHS else None,
+            "set_path": self._set_paths[0] if self._set_paths != SET_PATHS else None,
+            "channels": self.channels,
+        }
+
+    def apply_fingerprint(self, fingerprint: Optional[dict[str, Any]]) -> None:
+        """Seed endpoint preferences from a stored fingerprint (no I/O)."""
+        if not fingerprint:
+            return
+        if fingerprint.get("openfan_status") is not None:
+            self.has_openfan_status = bool(fingerprint["openfan_status"])
+        status_path = fingerprint.get("status_path")
+        if status_path in STATUS_PATHS:
+            self._status_paths = self._promote(STATUS_PATHS, status_path)
+        set_path = fingerprint.get("set_path")
+        if set_path in SET_PATHS:
+            self._set_paths = self._promote(SET_PATHS, set_path)
+        if self._channels_auto and fingerprint.get("channels"):
+            self.channels = max(1, min(MAX_CHANNELS, int(fingerprint["channels"])))
@@ -1,12 +1,14 @@
 """Stall detector binary sensor."""
 from __future__ import annotations
 from homeassistant.components.binary_sensor import BinarySensorEntity
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 import logging
 
+from .entity import OpenFanSnapshotEntity
+from .snapshot import STALLED
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -15,29 +17,31 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add:
     if dev is None:
         _LOGGER.error("OpenFAN Micro: runtime_data is None (binary_sensor)")
         return
-    async_add([OpenFanStallBinarySensor(dev)])
+    async_add([OpenFanStallBinarySensor(dev, ch) for ch in range(dev.channels)])
 
 
-class OpenFanStallBinarySensor(CoordinatorEntity, BinarySensorEntity):
+class OpenFanStallBinarySensor(OpenFanSnapshotEntity, BinarySensorEntity):
     _attr_icon = "mdi:alert"
+    _watch = STALLED
 
-    def __init__(self, device) -> None:
+    def __init__(self, device, channel: int = 0) -> None:
         super().__init__(device.coordinator)
         self._device = device
+        self._channel = channel
         self._host = getattr(device, "host", "unknown")
-        self._attr_unique_id = f"openfan_micro_stall_{self._host}"
-        self._attr_name = f"{getattr(device, 'name', 'OpenFAN Micro')} Stall"
+        self._attr_unique_id = f"openfan_micro_stall_{self._host}{device.channel_suffix(channel)}"
+        self._attr_name = f"{device.channel_name(channel)} Stall"
 
     @property
     def is_on(self) -> bool | None:
-        data = self.coordinator.data or {}
-        return bool(data.get("stalled", False))
+        st = self._device.channel_status(self._channel)
+        return st.stalled if st is not None else False
 
     @property
     def available(self) -> bool:
         base = super().available
         forced = getattr(self.coordinator, "_forced_unavailable", False)
-        return base and not forced
+        return base and not forced and self._device.channel_status(self._channel) is not None
 
     @property
     def device_info(self):
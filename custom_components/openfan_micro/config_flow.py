@@ -1,7 +1,9 @@
 """Config Flow for OpenFAN Micro.
 
-Minimal UI flow: just ask for Host and optional Name.
-We probe the device once to validate connectivity.
+UI flow: either type a Host (and optional Name), scan a subnet and add
+every discovered device at once, or create a fan group from existing fans. Validation is a single short `probe()`
+request (no coordinator/full poll); its identity data and capability
+fingerprint are stored in the entry so setup does not need to probe again.
 """
 from __future__ import annotations
 
@@ -10,9 +12,14 @@ from typing import Any
 
 from homeassistant import config_entries, exceptions
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.selector import EntitySelector, EntitySelectorConfig
 
 from .const import DOMAIN
-from ._device import OpenFanDevice
+from .api import OpenFanApi
+from .discovery import InvalidSubnet, SubnetTooLarge, async_scan_subnet
+from .group import CONF_MEMBERS
 
 
 class CannotConnect(exceptions.HomeAssistantError):
@@ -20,34 +27,62 @@ class CannotConnect(exceptions.HomeAssistantError):
 
 
 DATA_SCHEMA = vol.Schema({vol.Required("host"): str, vol.Optional("name"): str})
+SCAN_SCHEMA = vol.Schema({vol.Required("subnet"): str})
+MEMBERS_SELECTOR = EntitySelector(
+    EntitySelectorConfig(integration=DOMAIN, domain="fan", multiple=True)
+)
+GROUP_SCHEMA = vol.Schema(
+    {vol.Required("name"): str, vol.Required(CONF_MEMBERS): MEMBERS_SELECTOR}
+)
 
 
 async def _validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     host = data["host"].strip()
     name = (data.get("name") or f"OpenFAN Micro {host}").strip()
 
-    dev = OpenFanDevice(hass, host, name)
-    # First refresh will fetch status once (raises on network error).
-    await dev.async_first_refresh()
-    rpm = dev.coordinator_data.get("rpm", 0)
+    try:
+        info = await OpenFanApi(host, async_get_clientsession(hass)).probe()
+    except Exception as err:
+        raise CannotConnect(str(err)) from err
 
-    return {"title": name, "host": host, "name": name, "rpm": rpm}
+    return {"title": name, "host": host, "name": name, **info}
+
+
+def _entry_data(host: str, name: str, info: dict[str, Any]) -> dict[str, Any]:
+    """Config entry data: connection + identity + capability fingerprint."""
+    return {
+        "host": host,
+        "name": name,
+        "mac": info.get("mac"),
+        "firmware": info.get("firmware"),
+        "fingerprint": info.get("fingerprint"),
+    }
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for OpenFAN Micro."""
     VERSION = 1
 
+    def __init__(self) -> None:
+        self._found: dict[str, dict[str, Any]] = {}
+
     async def async_step_user(self, user_input: dict[str, Any] | None = None):
+        return self.async_show_menu(step_id="user", menu_options=["manual", "scan", "group"])
+
+    async def async_step_manual(self, user_input: dict[str, Any] | None = None):
         if user_input is None:
-            return self.async_show_form(step_id="user", data_schema=DATA_SCHEMA)
+            return self.async_show_form(step_id="manual", data_schema=DATA_SCHEMA)
 
         try:
             info = await _validate_input(self.hass, user_input)
+        except CannotConnect:
+            return self.async_show_form(
+                step_id="manual", data_schema=DATA_SCHEMA, errors={"base": "cannot_connect"}
+            )
         except Exception:
             # Unknown error; show generic error code.
             return self.async_show_form(
-                step_id="user", data_schema=DATA_SCHEMA, errors={"base": "unknown"}
+                step_id="manual", data_schema=DATA_SCHEMA, errors={"base": "unknown"}
             )
 
         # Use host as unique_id (1 host = 1 device)
@@ -56,5 +91,90 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         return self.async_create_entry(
             title=info["title"],
-            data={"host": info["host"], "name": info["name"]},
+            data=_entry_data(info["host"], info["name"], info),
+        )
+
+    async def async_step_scan(self, user_input: dict[str, Any] | None = None):
+        """Ask for a CIDR range and probe it concurrently."""
+        if user_input is None:
+            return self.async_show_form(step_id="scan", data_schema=SCAN_SCHEMA)
+
+        errors: dict[str, str] = {}
+        try:
+            found = await async_scan_subnet(
+                async_get_clientsession(self.hass),
+                user_input["subnet"],
+                exclude=self._async_current_ids(),
+            )
+        except InvalidSubnet:
+            errors["subnet"] = "invalid_subnet"
+        except SubnetTooLarge:
+            errors["subnet"] = "subnet_too_large"
+        else:
+            if not found:
+                errors["base"] = "no_devices_found"
+        if errors:
+            return self.async_show_form(step_id="scan", data_schema=SCAN_SCHEMA, errors=errors)
+
+        self._found = {dev["host"]: dev for dev in found}
+        return await self.async_step_pick()
+
+    async def async_step_pick(self, user_input: dict[str, Any] | None = None):
+        """Let the user choose which discovered devices to add."""
+        hosts = sorted(self._found, key=lambda h: tuple(int(p) for p in h.split(".")))
+        schema = vol.Schema(
+            {vol.Required("hosts", default=hosts): cv.multi_select({h: h for h in hosts})}
+        )
+        if user_input is None:
+            return self.async_show_form(
+                step_id="pick",
+                data_schema=schema,
+                description_placeholders={"count": str(len(hosts))},
+            )
+
+        chosen = [h for h in hosts if h in set(user_input.get("hosts") or [])]
+        if not chosen:
+            return self.async_show_form(
+                step_id="pick", data_schema=schema, errors={"base": "none_selected"}
+            )
+
+        # One flow creates one entry: spawn import flows for the rest.
+        first, rest = chosen[0], chosen[1:]
+        for host in rest:
+            self.hass.async_create_task(
+                self.hass.config_entries.flow.async_init(
+                    DOMAIN,
+                    context={"source": config_entries.SOURCE_IMPORT},
+                    data=_entry_data(host, f"OpenFAN Micro {host}", self._found[host]),
+                )
+            )
+
+        await self.async_set_unique_id(first)
+        self._abort_if_unique_id_configured()
+        name = f"OpenFAN Micro {first}"
+        return self.async_create_entry(
+            title=name, data=_entry_data(first, name, self._found[first])
         )
+
+    async def async_step_group(self, user_input: dict[str, Any] | None = None):
+        """Create a virtual fan driving several OpenFAN fans together."""
+        if user_input is None:
+            return self.async_show_form(step_id="group", data_schema=GROUP_SCHEMA)
+
+        name = user_input["name"].strip()
+        members = list(dict.fromkeys(user_input.get(CONF_MEMBERS) or []))
+        if not name or not members:
+            return self.async_show_form(
+                step_id="group", data_schema=GROUP_SCHEMA, errors={"base": "no_members"}
+            )
+        await self.async_set_unique_id(f"group_{name.lower()}")
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=name, data={"name": name, CONF_MEMBERS: members})
+
+    async def async_step_import(self, import_data: dict[str, Any]):
+        """Create an entry for a host already validated by a scan."""
+        host = import_data["host"].strip()
+        name = (import_data.get("name") or f"OpenFAN Micro {host}").strip()
+        await self.async_set_unique_id(host)
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=name, data=_entry_data(host, name, import_data))
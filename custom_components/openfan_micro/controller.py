@@ -0,0 +1,612 @@
+"""Temperature → PWM controller (piecewise-linear curve + moving-average smoothing).
+
+One `TempController` per device entry. Options are applied in place via
+`apply_options()` (called at setup and from the entry's options update
+listener): the curve is recompiled once, the temperature subscription and
+the periodic tick are only rebound when their settings actually change.
+The tick is only armed with a temperature entity or a profile schedule,
+and not for devices whose fans a zone drives.
+Curve targets pass through an `OutputStage` (asymmetric hysteresis, slew
+limit, write budget) before anything is written.
+
+Optional predictive mode: the sample window keeps running least-squares
+sums (O(1) per sample), and the curve is evaluated at the trend line's
+value `temp_predict_seconds` ahead instead of at the lagging average.
+
+With a °C→RPM curve (`temp_rpm_curve`) the device controller hands RPM
+setpoints to the closed-loop `RpmController` instead of writing PWM.
+
+`ZoneController` is the same input side (one subscription, one averaging
+buffer, one curve, one tick) driving every member of a fan group: one
+target per evaluation, written to all members concurrently with each
+member's own min-PWM clamp and output stage.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_track_point_in_time,
+    async_track_state_change_event,
+    async_track_time_interval,
+)
+from homeassistant.util import dt as dt_util
+
+from .metrics import (
+    ControllerStats,
+    DecisionTrace,
+    OUTCOME_APPLIED,
+    OUTCOME_DEADBAND,
+    OUTCOME_GATED,
+    OUTCOME_NO_SAMPLE,
+    OUTCOME_RPM,
+)
+from .curve import CompiledCurve
+from .output import OutputStage
+from .rpm_control import RPM_CURVE_MAX
+from .schedule import ProfileSchedule, parse_profiles
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SampleWindow:
+    """Time-stamped samples with running sums: O(1) mean and least-squares slope.
+
+    Times are kept relative to `_t0`; the sums are rebuilt from the buffer
+    (relative to the oldest sample) once that drifts more than `REBASE_S`
+    away, which keeps the slope numerically stable over long uptimes.
+    """
+
+    __slots__ = ("_buf", "_t0", "_n", "_st", "_sv", "_stt", "_stv")
+
+    REBASE_S = 600.0
+
+    def __init__(self, maxlen: int = 512) -> None:
+        self._buf: deque[tuple[float, float]] = deque(maxlen=maxlen)
+        self._t0 = 0.0
+        self._zero()
+
+    def _zero(self) -> None:
+        self._n = 0
+        self._st = self._sv = self._stt = self._stv = 0.0
+
+    def _add(self, ts: float, val: float, sign: int) -> None:
+        t = ts - self._t0
+        self._n += sign
+        self._st += sign * t
+        self._sv += sign * val
+        self._stt += sign * t * t
+        self._stv += sign * t * val
+
+    def _rebase(self) -> None:
+        self._t0 = self._buf[0][0]
+        self._zero()
+        for ts, val in self._buf:
+            self._add(ts, val, 1)
+
+    def __len__(self) -> int:
+        return len(self._buf)
+
+    def __iter__(self):
+        return iter(self._buf)
+
+    def append(self, ts: float, val: float) -> None:
+        buf = self._buf
+        if not buf:
+            self._t0 = ts
+            self._zero()
+        elif len(buf) == buf.maxlen:
+            self._add(*buf.popleft(), -1)
+        buf.append((ts, val))
+        self._add(ts, val, 1)
+
+    def prune(self, cutoff: float) -> None:
+        """Drop samples older than `cutoff`."""
+        buf = self._buf
+        while buf and buf[0][0] < cutoff:
+            self._add(*buf.popleft(), -1)
+        if not buf:
+            self._zero()
+        elif buf[0][0] - self._t0 > self.REBASE_S:
+            self._rebase()
+
+    def clear(self) -> None:
+        self._buf.clear()
+        self._zero()
+
+    def mean(self) -> Optional[float]:
+        return self._sv / self._n if self._n else None
+
+    def slope(self) -> Optional[float]:
+        """Least-squares slope in units per second (None below 2 distinct times)."""
+        n = self._n
+        if n < 2:
+            return None
+        denom = n * self._stt - self._st * self._st
+        if denom <= 1e-9 * n * n:
+            return None
+        return (n * self._stv - self._st * self._sv) / denom
+
+    def span(self) -> float:
+        """Seconds between the oldest and newest sample."""
+        buf = self._buf
+        return buf[-1][0] - buf[0][0] if buf else 0.0
+
+    def project(self, at: float, min_span: float = 0.0) -> Optional[float]:
+        """Trend-line value at time `at`.
+
+        Falls back to the mean when no slope is available or the samples
+        span less than `min_span` seconds (a slope from two samples taken
+        moments apart would extrapolate wildly).
+        """
+        mean = self.mean()
+        if mean is None or self.span() < min_span:
+            return mean
+        slope = self.slope()
+        if slope is None:
+            return mean
+        return mean + slope * (at - (self._t0 + self._st / self._n))
+
+
+class TempController:
+    """Per-entry temperature controller; state is mirrored into `dev.ctrl_state`."""
+
+    def __init__(self, hass: HomeAssistant, dev: Any) -> None:
+        self.hass = hass
+        self.dev = dev
+        self.label = getattr(dev, "host", None) or getattr(dev, "name", "?")
+        # `curve` is the active °C→PWM curve: `base_curve` (temp_curve) or
+        # the profile the time-of-day schedule selects
+        self.base_curve = CompiledCurve("")
+        self.curve = self.base_curve
+        self.profiles: dict[str, CompiledCurve] = {}
+        self.schedule = ProfileSchedule("")
+        self.profile: Optional[str] = None
+        self._profiles_txt = ""
+        # °C→RPM curve: when set, targets go to the RPM loops (`dev.rpm_control`)
+        self.rpm_curve = CompiledCurve("", RPM_CURVE_MAX)
+        self.temp_entity = ""
+        self.integrate_s = 30
+        self.min_interval_s = 10
+        self.deadband = 3
+        self.predict_s = 0
+        self.min_pwm = 0
+        self.calibrated = False
+        self.output = OutputStage()
+        # Temperature samples: (monotonic_ts, value) + running regression sums
+        self.temp_buf = SampleWindow(maxlen=512)
+        self._unsub_temp: Optional[Callable[[], None]] = None
+        self._unsub_tick: Optional[Callable[[], None]] = None
+        self._tick_s: Optional[int] = None
+        self._unsub_profile: Optional[Callable[[], None]] = None
+        # In-flight evaluations started from callbacks; cancelled by stop()
+        self._tasks: set[asyncio.Task] = set()
+        # Cost counters and decision trace (the device coordinator's by default)
+        coord = getattr(dev, "coordinator", None)
+        self.stats = getattr(coord, "ctrl_stats", None) or ControllerStats()
+        self.trace = getattr(coord, "ctrl_trace", None) or DecisionTrace()
+
+        # Expose controller state for fan extra attributes and diagnostics
+        dev.ctrl_state = {
+            "active": False,
+            "temp_entity": "",
+            "temp_curve": "",
+            "temp_rpm_curve": "",
+            "temp_profile": None,
+            "temp_integrate_seconds": self.integrate_s,
+            "temp_update_min_interval": self.min_interval_s,
+            "temp_deadband_pct": self.deadband,
+            "temp_up_deadband_pct": self.output.up_deadband,
+            "temp_up_min_interval": self.output.up_interval,
+            "temp_max_slew_pct_s": self.output.slew_pct_s,
+            "temp_write_budget_per_min": self.output.writes_per_min,
+            "temp_predict_seconds": self.predict_s,
+            "temp_avg": None,
+            "temp_projected": None,
+            "last_target_pwm": None,
+            "last_applied_pwm": None,
+            "last_apply_ts": 0.0,
+            "min_pwm": 0,
+            "min_pwm_calibrated": False,
+        }
+
+    # -------------------- configuration --------------------
+
+    def apply_options(self, opts: dict[str, Any]) -> None:
+        """Apply entry options in place (no reload, no I/O)."""
+        curve_txt = (opts.get("temp_curve") or "").strip()
+        if curve_txt != self.base_curve.text:
+            self.base_curve = CompiledCurve(curve_txt)
+        profiles_txt = (opts.get("temp_profiles") or "").strip()
+        schedule_txt = (opts.get("temp_schedule") or "").strip()
+        if profiles_txt != self._profiles_txt or schedule_txt != self.schedule.text:
+            self._profiles_txt = profiles_txt
+            self.profiles = parse_profiles(profiles_txt)
+            self.schedule = ProfileSchedule(schedule_txt, self.profiles)
+        rpm_txt = (opts.get("temp_rpm_curve") or "").strip()
+        if rpm_txt != self.rpm_curve.text:
+            self.rpm_curve = CompiledCurve(rpm_txt, RPM_CURVE_MAX)
+            rpm_control = getattr(self.dev, "rpm_control", None)
+            if not self.rpm_curve and rpm_control is not None:
+                # back to the PWM curve: drop the loops this controller started
+                rpm_control.clear(source="curve")
+        self.integrate_s = int(opts.get("temp_integrate_seconds", 30))
+        self.min_interval_s = int(opts.get("temp_update_min_interval", 10))
+        self.deadband = int(opts.get("temp_deadband_pct", 3))
+        self.predict_s = int(opts.get("temp_predict_seconds", 0))
+        self.min_pwm = int(opts.get("min_pwm", 0))
+        self.calibrated = bool(opts.get("min_pwm_calibrated", False))
+        self.output.configure(opts)
+
+        self._set_temp_entity((opts.get("temp_entity") or "").strip())
+        self._activate_profile()
+        self.update_tick()
+
+        self.dev.ctrl_state.update(
+            {
+                "temp_profiles": sorted(self.profiles),
+                "temp_schedule": self.schedule.text,
+                "min_pwm": self.min_pwm,
+                "min_pwm_calibrated": self.calibrated,
+                "temp_entity": self.temp_entity,
+                "temp_curve": self.curve.text,
+                "temp_rpm_curve": self.rpm_curve.text,
+                "temp_integrate_seconds": self.integrate_s,
+                "temp_update_min_interval": self.min_interval_s,
+                "temp_deadband_pct": self.deadband,
+                "temp_predict_seconds": self.predict_s,
+                "temp_up_deadband_pct": self.output.up_deadband,
+                "temp_up_min_interval": self.output.up_interval,
+                "temp_max_slew_pct_s": self.output.slew_pct_s,
+                "temp_write_budget_per_min": self.output.writes_per_min,
+            }
+        )
+
+    def _set_temp_entity(self, entity_id: str) -> None:
+        if entity_id == self.temp_entity and (self._unsub_temp is not None or not entity_id):
+            return
+        if self._unsub_temp is not None:
+            self._unsub_temp()
+            self._unsub_temp = None
+        if entity_id != self.temp_entity:
+            # samples of the old sensor must not leak into the new average
+            self.temp_buf.clear()
+        self.temp_entity = entity_id
+        if entity_id:
+            self._unsub_temp = async_track_state_change_event(
+                self.hass, [entity_id], self._on_temp
+            )
+
+    def update_tick(self) -> None:
+        """Arm the periodic tick only while there is something to evaluate.
+
+        Needs a temperature entity or a profile schedule; fans driven by a
+        zone are evaluated by the zone's tick instead.
+        """
+        if (self.temp_entity or self.schedule) and not self._zone_driven():
+            self._set_tick(max(5, self.min_interval_s))
+        else:
+            self._clear_tick()
+
+    def _zone_driven(self) -> bool:
+        from .group import zone_driven
+
+        return zone_driven(self.hass, self.dev)
+
+    def _set_tick(self, seconds: int) -> None:
+        if seconds == self._tick_s and self._unsub_tick is not None:
+            return
+        if self._unsub_tick is not None:
+            self._unsub_tick()
+        self._tick_s = seconds
+        # Periodic re-evaluation, so we react even if the temperature entity doesn't change state
+        self._unsub_tick = async_track_time_interval(
+            self.hass, self._periodic, timedelta(seconds=seconds)
+        )
+
+    def _clear_tick(self) -> None:
+        if self._unsub_tick is not None:
+            self._unsub_tick()
+            self._unsub_tick = None
+        self._tick_s = None
+
+    def _activate_profile(self, now: Optional[datetime] = None) -> None:
+        """Select the curve for the time of day and arm one timer for the next change."""
+        if self._unsub_profile is not None:
+            self._unsub_profile()
+            self._unsub_profile = None
+        now = dt_util.as_local(now) if now is not None else dt_util.now()
+        minute = now.hour * 60 + now.minute
+        name = self.schedule.at(minute) if self.schedule else None
+        self.profile = name
+        self.curve = self.profiles[name] if name else self.base_curve
+        self.dev.ctrl_state["temp_profile"] = name
+        self.dev.ctrl_state["temp_curve"] = self.curve.text
+
+        nxt = self.schedule.next_change(minute)
+        if nxt is None:
+            return
+        day = now.date() + timedelta(days=1) if nxt <= minute else now.date()  # wraps: tomorrow
+        at = dt_util.start_of_local_day(day) + timedelta(minutes=nxt)
+        self._unsub_profile = async_track_point_in_time(self.hass, self._on_profile_change, at)
+
+    @callback
+    def _on_profile_change(self, now: datetime) -> None:
+        self._unsub_profile = None
+        previous = self.profile
+        self._activate_profile(now)
+        if self.profile != previous:
+            _LOGGER.debug("%s: curve profile %s -> %s", self.label, previous, self.profile)
+            self.schedule_apply("profile")
+
+    def stop(self) -> None:
+        """Unsubscribe the temperature listener, the periodic tick and the profile timer, cancel pending evaluations."""
+        if self._unsub_profile is not None:
+            self._unsub_profile()
+            self._unsub_profile = None
+        if self._unsub_temp is not None:
+            self._unsub_temp()
+            self._unsub_temp = None
+        self._clear_tick()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+
+    # -------------------- inputs --------------------
+
+    @callback
+    def _on_temp(self, ev) -> None:
+        new = ev.data.get("new_state")
+        if not new or new.state in (None, "", "unknown", "unavailable"):
+            return
+        try:
+            val = float(new.state)
+        except Exception:
+            return
+        self.temp_buf.append(time.monotonic(), val)
+        self.schedule_apply("state_change")
+
+    @callback
+    def schedule_apply(self, trigger: str) -> None:
+        """Run `async_apply(trigger)` as a task owned (and cancellable) by this controller."""
+        task = self.hass.async_create_task(self.async_apply(trigger))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _periodic(self, now) -> None:
+        await self.async_apply("periodic")
+
+    def averaged_temp(self, now: float) -> Optional[float]:
+        """Return avg temp over integration window; prune old samples."""
+        self.temp_buf.prune(now - max(5, self.integrate_s))
+        return self.temp_buf.mean()
+
+    # -------------------- control --------------------
+
+    async def async_apply(self, trigger: str) -> None:
+        """Evaluate the controller once and record its cost in the controller stats."""
+        stats = self.stats
+        stats.evaluations += 1
+        started = time.monotonic()
+        try:
+            if await self._apply(trigger):
+                stats.writes += 1
+        finally:
+            stats.eval_time.record(time.monotonic() - started)
+
+    def _gated(self) -> bool:
+        """Calibration + config present (device control needs a calibrated min PWM)."""
+        return (
+            self.calibrated
+            and self.min_pwm > 0
+            and bool(self.temp_entity)
+            and (bool(self.curve) or bool(self.rpm_curve))
+        )
+
+    def _current_temp(self, now: float) -> Optional[float]:
+        """Averaged temperature; seeded from the entity's current state if the buffer is empty."""
+        temp = self.averaged_temp(now)
+        if temp is None:
+            st = self.hass.states.get(self.temp_entity)
+            if st and st.state not in ("unknown", "unavailable", ""):
+                try:
+                    val = float(st.state)
+                    self.temp_buf.append(now, val)
+                    temp = self.averaged_temp(now)
+                except Exception:
+                    temp = None
+        return temp
+
+    async def _apply(self, trigger: str) -> bool:
+        """Gate, sample the averaged temperature and drive the output.
+
+        Returns True if a PWM write was sent. Every decision is appended to
+        the bounded decision trace.
+        """
+        state = self.dev.ctrl_state
+        trace = self.trace
+        if not self._gated():
+            state["active"] = False
+            _LOGGER.debug(
+                "OpenFAN %s temp-control gated (cal=%s, temp_entity=%s, pts=%d, trig=%s)",
+                self.label,
+                self.calibrated and self.min_pwm > 0,
+                bool(self.temp_entity),
+                len(self.curve) or len(self.rpm_curve),
+                trigger,
+            )
+            trace.record(time.time(), trigger, None, None, OUTCOME_GATED)
+            return False
+        state["active"] = True
+
+        now = time.monotonic()
+        temp = self._current_temp(now)
+        if temp is None:
+            _LOGGER.debug(
+                "OpenFAN %s temp-control: no temp sample yet (trigger=%s)", self.label, trigger
+            )
+            trace.record(time.time(), trigger, None, None, OUTCOME_NO_SAMPLE)
+            return False
+        state["temp_avg"] = temp
+        if self.predict_s > 0:
+            # trend line of the window, evaluated `predict_s` past now (covers the average's lag too)
+            projected = self.temp_buf.project(now + self.predict_s, max(5, self.integrate_s) / 2)
+            state["temp_projected"] = None if projected is None else round(projected, 2)
+            if projected is not None:
+                temp = projected
+        else:
+            state["temp_projected"] = None
+        return await self._drive(trigger, temp, now)
+
+    async def _drive(self, trigger: str, temp: float, now: float) -> bool:
+        """Curve target for the device (at the averaged or projected `temp`),
+        clamped by min PWM, shaped by the output stage."""
+        dev = self.dev
+        min_pwm = self.min_pwm
+        rpm_control = getattr(dev, "rpm_control", None)
+        if self.rpm_curve and rpm_control is not None:
+            return self._drive_rpm(rpm_control, trigger, temp)
+        # Piecewise-linear interpolation on averaged temp
+        target = self.curve(temp)
+
+        # Clamp by min (except allow 0 to turn off)
+        target = 0 if target == 0 else max(min_pwm, int(target))
+        target = max(0, min(100, int(target)))
+
+        # Hysteresis (fast up / slow down), slew limit, write budget
+        value, outcome = self.output.step(target, now, min_pwm)
+        if value is None:
+            dev.ctrl_state["last_target_pwm"] = target
+            self.trace.record(time.time(), trigger, temp, target, outcome)
+            return False
+
+        # all channels of the host follow the curve (one batched write)
+        await dev.api.set_pwm_many({ch: value for ch in range(dev.channels)})
+        self.output.commit(value, now)
+        await dev.coordinator.async_request_refresh()
+        dev.ctrl_state.update(
+            {
+                "last_target_pwm": target,
+                "last_applied_pwm": value,
+                "last_apply_ts": now,
+            }
+        )
+        self.trace.record(time.time(), trigger, temp, value, OUTCOME_APPLIED)
+        _LOGGER.debug(
+            "OpenFAN %s temp-control APPLY: temp=%.1f°C target=%s%% wrote=%s%% (min=%s%%, trig=%s)",
+            self.label,
+            temp,
+            target,
+            value,
+            min_pwm,
+            trigger,
+        )
+        return True
+
+    def _drive_rpm(self, rpm_control: Any, trigger: str, temp: float) -> bool:
+        """RPM curve: hand the setpoint to the per-channel PID loops (they do the writes)."""
+        target = max(0, int(self.rpm_curve(temp)))
+        for ch in range(self.dev.channels):
+            rpm_control.set_target(ch, target, source="curve")
+        self.dev.ctrl_state["last_target_rpm"] = target
+        self.trace.record(time.time(), trigger, temp, None, OUTCOME_RPM)
+        return False
+
+
+class ZoneController(TempController):
+    """One control loop for a fan group (thermal zone).
+
+    Input side as `TempController`; per evaluation one curve target is
+    computed and sent to every eligible member concurrently (per-host
+    batches). Members are eligible once their own entry has a calibrated
+    min PWM; each member has its own clamp and `OutputStage`.
+    Timers and curve evaluations scale with zones, not fans.
+    """
+
+    def __init__(self, hass: HomeAssistant, group: Any) -> None:
+        super().__init__(hass, group)
+        self._opts: dict[str, Any] = {}
+        # entity_id -> output stage of that member
+        self.member_state: dict[str, OutputStage] = {}
+        group.ctrl_state["members_driven"] = 0
+
+    def apply_options(self, opts: dict[str, Any]) -> None:
+        self._opts = dict(opts)
+        super().apply_options(opts)
+        for stage in self.member_state.values():
+            stage.configure(opts)
+
+    def _zone_driven(self) -> bool:
+        return False
+
+    def _gated(self) -> bool:
+        return bool(self.temp_entity) and bool(self.curve)
+
+    async def _drive(self, trigger: str, temp: float, now: float) -> bool:
+        group = self.dev
+        base = max(0, min(100, int(self.curve(temp))))
+        batches: dict[int, tuple[Any, dict[int, int]]] = {}
+        pending: list[tuple[OutputStage, str, int]] = []
+        outcome = OUTCOME_DEADBAND
+        eligible = 0
+        for member in group.members():
+            min_pwm = member.min_pwm
+            if not ((member.entry.options or {}).get("min_pwm_calibrated") and min_pwm > 0):
+                continue
+            eligible += 1
+            target = 0 if base == 0 else max(min_pwm, base)
+            stage = self.member_state.get(member.entity_id)
+            if stage is None:
+                stage = self.member_state[member.entity_id] = OutputStage.from_options(self._opts)
+            value, why = stage.step(target, now, min_pwm)
+            if value is None:
+                if why != OUTCOME_DEADBAND:
+                    outcome = why
+                continue
+            dev = member.device
+            batches.setdefault(id(dev), (dev, {}))[1][member.channel] = value
+            pending.append((stage, dev.host, value))
+
+        if len(self.member_state) > len(group.member_ids):
+            for entity_id in set(self.member_state) - set(group.member_ids):
+                del self.member_state[entity_id]
+        group.ctrl_state.update(
+            {"last_target_pwm": base, "members_driven": eligible}
+        )
+        if not batches:
+            self.trace.record(time.time(), trigger, temp, base, outcome)
+            return False
+
+        results = await asyncio.gather(
+            *(dev.api.set_pwm_many(values) for dev, values in batches.values()),
+            return_exceptions=True,
+        )
+        failed = set()
+        for (dev, _), res in zip(batches.values(), results):
+            if isinstance(res, Exception):
+                failed.add(dev.host)
+                _LOGGER.warning("OpenFAN zone %s: write to %s failed: %r", self.label, dev.host, res)
+        for stage, host, value in pending:
+            if host not in failed:
+                stage.commit(value, now)
+        await asyncio.gather(
+            *(dev.coordinator.async_request_refresh() for dev, _ in batches.values())
+        )
+        group.ctrl_state.update({"last_applied_pwm": base, "last_apply_ts": now})
+        self.trace.record(time.time(), trigger, temp, base, OUTCOME_APPLIED)
+        _LOGGER.debug(
+            "OpenFAN zone %s APPLY: temp=%.1f°C target=%s%% members=%d hosts=%d (trig=%s)",
+            self.label,
+            temp,
+            base,
+            len(pending),
+            len(batches),
+            trigger,
+        )
+        return True
@@ -1,17 +1,36 @@
-"""Coordinator with availability gating, LED/12V state, and stall detection."""
+"""Coordinator with availability gating, LED/12V state, and stall detection.
+
+Data is an immutable `DeviceStatus` snapshot (see `snapshot.py`): a
+`ChannelStatus` per channel plus LED/12V state, with a bitmask of the
+fields changed since the previous poll. All channels are read with one
+batched status request per poll where the firmware allows.
+
+With the optional RPM filter (`rpm_filter_window`), `rpm` is the rolling
+median of the last samples (used for stall detection and everything
+downstream) and the unfiltered reading is kept as `rpm_raw`.
+
+After each poll the readings are checked against the last commanded
+PWM / LED / voltage (`reconcile.py`); a host that reset is put back into
+the commanded state once.
+"""
 from __future__ import annotations
 import logging
+import time
 from datetime import timedelta
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .api import OpenFanApi
+from .metrics import ControllerStats, DecisionTrace, LatencyHistogram
+from .reconcile import DriftReconciler
+from .rpm_filter import RollingMedian
+from .snapshot import DeviceStatus, build_status
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class OpenFanCoordinator(DataUpdateCoordinator[dict]):
+class OpenFanCoordinator(DataUpdateCoordinator[DeviceStatus]):
     """Poll device: RPM/PWM + LED + 12V, and track failures & stall."""
 
     def __init__(self, hass: HomeAssistant, api: OpenFanApi) -> None:
@@ -25,13 +44,123 @@ class OpenFanCoordinator(DataUpdateCoordinator[dict]):
         self.api = api
         self._consecutive_failures = 0
         self._forced_unavailable = False
-        self._consecutive_stall = 0
-        self._notified_stall = False
+        # Stall tracking per channel
+        self._consecutive_stall: dict[int, int] = {}
+        self._notified_stall: set[int] = set()
         self._last_error: str | None = None
+        # Optional per-channel rolling median of the tach readings (0 = off)
+        self._rpm_filter_window = 0
+        self._rpm_filters: dict[int, RollingMedian] = {}
+        # Restores the commanded state after device resets (`reconcile_drift`)
+        self.drift = DriftReconciler()
+        self.reconcile_drift = True
+        # Performance counters: full poll cycle + temperature controller cost
+        self.poll_latency = LatencyHistogram()
+        self.ctrl_stats = ControllerStats()
+        self.ctrl_trace = DecisionTrace()
+
+    def set_poll_interval(self, seconds: int) -> None:
+        """Change the polling interval in place.
+
+        The next refresh schedules itself with the new interval; a shorter
+        interval requests that refresh now rather than after the old one.
+        """
+        interval = timedelta(seconds=max(1, int(seconds)))
+        previous = self.update_interval
+        if interval == previous:
+            return
+        self.update_interval = interval
+        if self.data is not None and (previous is None or interval < previous):
+            self.hass.async_create_task(self.async_request_refresh())
 
-    async def _async_update_data(self) -> dict:
+    def set_rpm_filter(self, window: int) -> None:
+        """Enable (odd window of samples) or disable (0) the RPM median filter."""
+        window = max(0, int(window))
+        if window != self._rpm_filter_window:
+            self._rpm_filter_window = window
+            self._rpm_filters.clear()
+
+    def _filter_rpm(self, channel: int, rpm: int) -> int:
+        filt = self._rpm_filters.get(channel)
+        if filt is None:
+            filt = self._rpm_filters[channel] = RollingMedian(self._rpm_filter_window)
+        return filt.push(rpm)
+
+    def _track_stall(self, channel: int, rpm: int, pwm: int) -> bool:
+        """Stall: PWM > min and RPM == 0 for `stall_consecutive` polls (notifies once)."""
+        min_pwm = int(getattr(self.api, "_min_pwm", 0) or 0)
+        need = int(getattr(self.api, "_stall_consecutive", 3) or 3)
+        stalled_now = (int(pwm) > max(0, min_pwm)) and int(rpm) == 0
+        count = (self._consecutive_stall.get(channel, 0) + 1) if stalled_now else 0
+        self._consecutive_stall[channel] = count
+        stalled_flag = count >= need
+
+        if stalled_flag and channel not in self._notified_stall:
+            self._notified_stall.add(channel)
+            host = getattr(self.api, "_host", "?")
+            where = host if channel == 0 else f"{host} channel {channel}"
+            suffix = "" if channel == 0 else f"_{channel}"
+            # esemény + értesítés (nem végzetes, csak jelzés)
+            try:
+                self.hass.bus.async_fire("openfan_micro_stall", {"host": host, "channel": channel})
+                self.hass.components.persistent_notification.async_create(
+                    f"Fan looks stalled on {where} (PWM={pwm}%, RPM=0)",
+                    title="OpenFAN Micro",
+                    notification_id=f"openfan_micro_stall_{host}{suffix}",
+                )
+            except Exception:  # not fatal
+                pass
+        if not stalled_flag:
+            self._notified_stall.discard(channel)
+        return stalled_flag
+
+    def _drift_inputs(self, data: DeviceStatus, openfan_ok: bool) -> tuple[dict, dict]:
+        """(commanded, readings) for the reconciler; readings only as far as the host reports them."""
+        api = self.api
+        commanded: dict = {("pwm", ch): pwm for ch, pwm in api._commanded.items()}
+        readings: dict = {}
+        if api.pwm_readback:
+            readings = {("pwm", ch): st.pwm for ch, st in enumerate(data.channels) if st is not None}
+        for key, want in (("led", api._commanded_led), ("is_12v", api._commanded_12v)):
+            if want is not None:
+                commanded[key] = want
+                if openfan_ok:
+                    readings[key] = getattr(data, key)
+        return commanded, readings
+
+    async def _reconcile(self, data: DeviceStatus, openfan_ok: bool) -> None:
+        """Re-apply commanded values the host lost (one write per divergence)."""
+        commanded, readings = self._drift_inputs(data, openfan_ok)
+        if not commanded:
+            return
+        actions = self.drift.plan(commanded, readings, self.api.uptime if openfan_ok else None)
+        if not actions:
+            return
+        host = getattr(self.api, "_host", "?")
+        last = self.drift.last or {}
+        _LOGGER.warning(
+            "OpenFAN %s: device state lost (%s), re-applying %s", host, last.get("reason"), last.get("values")
+        )
+        pwm = {key[1]: value for key, value in actions.items() if isinstance(key, tuple)}
+        try:
+            if pwm:
+                await self.api.set_pwm_many(pwm)
+            if "led" in actions:
+                await self.api.led_set(actions["led"])
+            if "is_12v" in actions:
+                await self.api.set_voltage_12v(actions["is_12v"])
+        except Exception as err:
+            self.drift.counts["failed"] += 1
+            _LOGGER.warning("OpenFAN %s: re-applying commanded state failed: %r", host, err)
+        else:
+            self.drift.counts["reapplied"] += len(actions)
+
+    async def _async_update_data(self) -> DeviceStatus:
+        started = time.monotonic()
+        # a write during this poll makes its readings stale for the drift check
+        generation = getattr(self.api, "_generation", None)
         try:
-            rpm, pwm = await self.api.get_status()
+            status = await self.api.get_status_all()
             # clear failure gating
             self._consecutive_failures = 0
             self._forced_unavailable = False
@@ -39,42 +168,24 @@ class OpenFanCoordinator(DataUpdateCoordinator[dict]):
 
             # LED / 12V (tűrjük, ha a fw még nem tudja)
             led, is_12v = False, False
-            try:
-                led, is_12v = await self.api.get_openfan_status()
-            except Exception as sub_err:
-                _LOGGER.debug("OpenFAN Micro: openfan/status fetch failed: %r", sub_err)
-
-            # Stall: ha PWM > min és RPM=0 több cikluson át
-            min_pwm = int(getattr(self.api, "_min_pwm", 0) or 0)
-            need = int(getattr(self.api, "_stall_consecutive", 3) or 3)
-            stalled_now = (int(pwm) > max(0, min_pwm)) and int(rpm) == 0
-            self._consecutive_stall = (self._consecutive_stall + 1) if stalled_now else 0
-            stalled_flag = self._consecutive_stall >= need
-
-            if stalled_flag and not self._notified_stall:
-                self._notified_stall = True
-                # esemény + értesítés (nem végzetes, csak jelzés)
+            openfan_ok = False
+            if getattr(self.api, "has_openfan_status", None) is not False:
                 try:
-                    self.hass.bus.async_fire(
-                        "openfan_micro_stall", {"host": getattr(self.api, "_host", "?")}
-                    )
-                    self.hass.components.persistent_notification.async_create(
-                        f"Fan looks stalled on {getattr(self.api, '_host', '?')} (PWM={pwm}%, RPM=0)",
-                        title="OpenFAN Micro",
-                        notification_id=f"openfan_micro_stall_{getattr(self.api,'_host','?')}",
-                    )
-                except Exception:  # not fatal
-                    pass
-            if not stalled_flag:
-                self._notified_stall = False
-
-            data = {
-                "rpm": int(max(0, rpm)),
-                "pwm": int(max(0, min(100, pwm))),
-                "led": bool(led),
-                "is_12v": bool(is_12v),
-                "stalled": stalled_flag,
-            }
+                    led, is_12v = await self.api.get_openfan_status()
+                    openfan_ok = True
+                except Exception as sub_err:
+                    _LOGGER.debug("OpenFAN Micro: openfan/status fetch failed: %r", sub_err)
+
+            filtered = self._rpm_filter_window > 1
+            channels = {}
+            for ch, (rpm, pwm) in status.items():
+                raw = int(max(0, rpm))
+                rpm = self._filter_rpm(ch, raw) if filtered else raw
+                pwm = int(max(0, min(100, pwm)))
+                channels[ch] = (rpm, pwm, self._track_stall(ch, rpm, pwm), raw if filtered else None)
+            data = build_status(self.data, channels, bool(led), bool(is_12v))
+            if self.reconcile_drift and getattr(self.api, "_generation", None) == generation:
+                await self._reconcile(data, openfan_ok)
             _LOGGER.debug("OpenFAN Micro update OK (%s): %s", getattr(self.api, "_host", "?"), data)
             return data
 
@@ -86,3 +197,5 @@ class OpenFanCoordinator(DataUpdateCoordinator[dict]):
                 self._forced_unavailable = True
             _LOGGER.error("OpenFAN Micro update failed (%s): %r", getattr(self.api, "_host", "?"), err)
             raise UpdateFailed(f"Failed to update OpenFAN Micro: {err}") from err
+        finally:
+            self.poll_latency.record(time.monotonic() - started)
@@ -0,0 +1,55 @@
+"""Temperature curves: "°C=value" point lists, evaluated piecewise-linearly.
+
+Values are PWM % (0–100) by default; RPM curves pass a higher `hi`.
+
+No Home Assistant imports, so offline tools (replay, tuner) use the same
+parser and evaluation as the controller.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+
+
+def parse_curve(txt: str, hi: int = 100) -> list[tuple[float, int]]:
+    """Parse "45=25, 65=55, 70=100" into sorted (°C, value) points; bad parts are skipped."""
+    pts = []
+    for part in [p.strip() for p in (txt or "").split(",") if p.strip()]:
+        if "=" in part:
+            t, pct = part.split("=", 1)
+            try:
+                pts.append((float(t.strip()), max(0, min(hi, int(pct.strip())))))
+            except Exception:
+                continue
+    pts.sort(key=lambda x: x[0])
+    return pts
+
+
+class CompiledCurve:
+    """Piecewise-linear curve evaluated with a bisect lookup."""
+
+    __slots__ = ("text", "temps", "values")
+
+    def __init__(self, text: str, hi: int = 100) -> None:
+        pts = parse_curve(text, hi)
+        self.text = text
+        self.temps = tuple(t for t, _ in pts)
+        self.values = tuple(p for _, p in pts)
+
+    def __bool__(self) -> bool:
+        return bool(self.temps)
+
+    def __len__(self) -> int:
+        return len(self.temps)
+
+    def __call__(self, temp: float) -> int:
+        temps, values = self.temps, self.values
+        if temp <= temps[0]:
+            return values[0]
+        if temp >= temps[-1]:
+            return values[-1]
+        i = bisect_right(temps, temp)
+        t1, t2 = temps[i - 1], temps[i]
+        p1, p2 = values[i - 1], values[i]
+        if t2 == t1:
+            return max(p1, p2)
+        return int(round(p1 + (p2 - p1) * (temp - t1) / (t2 - t1)))
@@ -4,15 +4,51 @@ from __future__ import annotations
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 
+from .group import OpenFanGroup
+
+
 async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
     dev = getattr(entry, "runtime_data", None)
-    data = getattr(dev, "coordinator", None).data if dev else None
+    if isinstance(dev, OpenFanGroup):
+        return {
+            "title": entry.title,
+            "members": dev.member_ids,
+            "resolved_members": [
+                {"entity_id": m.entity_id, "host": m.device.host, "channel": m.channel, "min_pwm": m.min_pwm}
+                for m in dev.members()
+            ],
+            "aggregate": dev.aggregate(),
+            "zone_state": dev.ctrl_state,
+            "zone_performance": dev.controller.stats.as_dict() if dev.controller else None,
+            "zone_trace": dev.controller.trace.as_list() if dev.controller else [],
+        }
+    snapshot = getattr(dev, "coordinator", None).data if dev else None
+    data = snapshot.as_dict() if snapshot is not None else None
     ctrl = getattr(dev, "ctrl_state", {}) if dev else {}
+    coord = getattr(dev, "coordinator", None) if dev else None
+    api = getattr(dev, "api", None) if dev else None
+    perf = {
+        "api": api.stats.as_dict() if api is not None else None,
+        "poll": coord.poll_latency.as_dict() if coord is not None else None,
+        "controller": coord.ctrl_stats.as_dict() if coord is not None else None,
+    }
     return {
         "title": entry.title,
         "host": entry.data.get("host"),
         "options": entry.options,
         "coordinator_data": data,
         "controller_state": ctrl,
-        "notes": "controller_state includes last target/applied PWM, temp average, and gating flags.",
+        "performance": perf,
+        "api_fingerprint": api.fingerprint if api is not None else None,
+        "controller_trace": coord.ctrl_trace.as_list() if coord is not None else [],
+        "rpm_control": dev.rpm_control.as_dict() if getattr(dev, "rpm_control", None) else None,
+        "drift_reconcile": coord.drift.as_dict() if coord is not None else None,
+        "notes": (
+            "coordinator_data rpm is median-filtered when rpm_filter_window is set (rpm_raw = last reading); "
+            "controller_state includes last target/applied PWM, temp average, and gating flags; "
+            "performance has per-endpoint request counts/latency and controller cost; "
+            "controller_trace lists recent decisions (oldest first, wall-clock ts); "
+            "rpm_control shows the target-RPM loops (target, PID output, settled); "
+            "drift_reconcile counts detected reboots/drift and re-applied commanded values."
+        ),
     }
@@ -0,0 +1,75 @@
+"""Subnet scan for OpenFAN Micro devices (used by the config flow).
+
+Runs `OpenFanApi.probe()` (one `/api/v0/openfan/status` GET) on every host
+of a CIDR range concurrently, with bounded parallelism and a short per-host
+timeout, so a /24 completes in about two timeout periods instead of minutes.
+"""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+from typing import Any, Iterable
+
+import aiohttp
+
+from .api import OpenFanApi
+
+_LOGGER = logging.getLogger(__name__)
+
+SCAN_MAX_HOSTS = 1024  # /22
+SCAN_CONCURRENCY = 128
+SCAN_TIMEOUT = 1.0
+
+
+class InvalidSubnet(ValueError):
+    """Subnet string is not a valid IPv4 CIDR."""
+
+
+class SubnetTooLarge(ValueError):
+    """Subnet has more than SCAN_MAX_HOSTS hosts."""
+
+
+def subnet_hosts(cidr: str) -> list[str]:
+    """Return host addresses of an IPv4 CIDR (raises InvalidSubnet/SubnetTooLarge)."""
+    try:
+        net = ipaddress.ip_network(cidr.strip(), strict=False)
+    except ValueError as err:
+        raise InvalidSubnet(str(err)) from err
+    if net.version != 4:
+        raise InvalidSubnet("only IPv4 subnets are supported")
+    if net.num_addresses > SCAN_MAX_HOSTS + 2:
+        raise SubnetTooLarge(f"{net} has more than {SCAN_MAX_HOSTS} hosts")
+    hosts = [str(ip) for ip in net.hosts()]
+    return hosts or [str(net.network_address)]
+
+
+async def _probe_host(session: aiohttp.ClientSession, host: str, timeout: float) -> dict | None:
+    try:
+        info = await OpenFanApi(host, session).probe(timeout)
+    except Exception:
+        return None
+    return {"host": host, **info}
+
+
+async def async_scan_subnet(
+    session: aiohttp.ClientSession,
+    cidr: str,
+    *,
+    exclude: Iterable[str] = (),
+    concurrency: int = SCAN_CONCURRENCY,
+    timeout: float = SCAN_TIMEOUT,
+) -> list[dict[str, Any]]:
+    """Return `[{"host": ..., **probe_info}, ...]` for devices answering in `cidr`."""
+    skip = set(exclude)
+    hosts = [h for h in subnet_hosts(cidr) if h not in skip]
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _bounded(host: str) -> dict | None:
+        async with sem:
+            return await _probe_host(session, host, timeout)
+
+    results = await asyncio.gather(*(_bounded(h) for h in hosts))
+    found = [r for r in results if r is not None]
+    _LOGGER.debug("OpenFAN scan %s: %d hosts probed, %d devices found", cidr, len(hosts), len(found))
+    return found
@@ -0,0 +1,34 @@
+"""Base for coordinator entities that only write state when their fields changed."""
+from __future__ import annotations
+
+from typing import Optional
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+
+class OpenFanSnapshotEntity(CoordinatorEntity):
+    """Skips state writes for polls that changed none of the entity's fields.
+
+    Subclasses set `_watch` (snapshot change bits) and, for per-channel
+    entities, `_channel`. Availability changes are always written.
+    """
+
+    _watch = 0
+    _channel: Optional[int] = None
+    _written_available: Optional[bool] = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        data = self.coordinator.data
+        available = self.available
+        if data is not None and available == self._written_available:
+            if self._channel is None:
+                changed = data.changed
+            else:
+                st = data.channel(self._channel)
+                changed = st.changed if st is not None else self._watch
+            if not changed & self._watch:
+                return
+        self._written_available = available
+        self.async_write_ha_state()
@@ -1,14 +1,18 @@
-"""Fan entity for OpenFAN Micro with min-PWM clamp and debug attributes."""
+"""Fan entities for OpenFAN Micro: per-channel fans (min-PWM clamp, debug attributes) and fan groups."""
 from __future__ import annotations
-from typing import Any
+from typing import Any, Callable
+import asyncio
 import logging
 
 from homeassistant.components.fan import FanEntity, FanEntityFeature
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .group import OpenFanGroup
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -17,19 +21,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add:
     if device is None:
         _LOGGER.error("OpenFAN Micro: runtime_data is None (fan)")
         return
-    async_add([OpenFan(device, entry)])
+    if isinstance(device, OpenFanGroup):
+        async_add([OpenFanGroupFan(device)])
+        return
+    async_add([OpenFan(device, entry, ch) for ch in range(device.channels)])
 
 
 class OpenFan(CoordinatorEntity, FanEntity):
     _attr_supported_features = FanEntityFeature.SET_SPEED | FanEntityFeature.TURN_ON | FanEntityFeature.TURN_OFF
 
-    def __init__(self, device, entry: ConfigEntry) -> None:
+    def __init__(self, device, entry: ConfigEntry, channel: int = 0) -> None:
         super().__init__(device.coordinator)
         self._device = device
         self._entry = entry
+        self._channel = channel
         self._host = getattr(device, "host", "unknown")
-        self._attr_name = getattr(device, "name", "OpenFAN Micro")
-        self._attr_unique_id = f"openfan_micro_fan_{self._host}"
+        self._attr_name = device.channel_name(channel)
+        self._attr_unique_id = device.fan_unique_id(channel)
 
     @property
     def device_info(self) -> dict[str, Any] | None:
@@ -39,14 +47,15 @@ class OpenFan(CoordinatorEntity, FanEntity):
     def available(self) -> bool:
         base = super().available
         forced = getattr(self.coordinator, "_forced_unavailable", False)
-        return base and not forced
+        # a channel missing from the last poll (its read failed) is unavailable
+        return base and not forced and self._device.channel_status(self._channel) is not None
 
     # ---- state ----
 
     @property
     def percentage(self) -> int | None:
-        data = self.coordinator.data or {}
-        return int(data.get("pwm")) if "pwm" in data else None
+        st = self._device.channel_status(self._channel)
+        return st.pwm if st is not None else None
 
     @property
     def is_on(self) -> bool | None:
@@ -55,12 +64,19 @@ class OpenFan(CoordinatorEntity, FanEntity):
 
     # ---- control ----
 
+    def _end_rpm_loop(self) -> None:
+        """A manually set speed replaces this channel's target-RPM loop."""
+        rpm_control = getattr(self._device, "rpm_control", None)
+        if rpm_control is not None:
+            rpm_control.clear(self._channel)
+
     async def async_set_percentage(self, percentage: int) -> None:
+        self._end_rpm_loop()
         opts = self._entry.options or {}
         min_pwm = int(opts.get("min_pwm", 0))
         if int(percentage) > 0:
             percentage = max(min_pwm, int(percentage))
-        await self._device.api.set_pwm(int(percentage))
+        await self._device.api.set_pwm(int(percentage), self._channel)
         await self.coordinator.async_request_refresh()
 
     async def async_turn_on(self, percentage: int | None = None, **kwargs) -> None:
@@ -69,7 +85,8 @@ class OpenFan(CoordinatorEntity, FanEntity):
         await self.async_set_percentage(int(percentage))
 
     async def async_turn_off(self, **kwargs) -> None:
-        await self._device.api.set_pwm(0)
+        self._end_rpm_loop()
+        await self._device.api.set_pwm(0, self._channel)
         await self.coordinator.async_request_refresh()
 
     # ---- attributes ----
@@ -78,15 +95,141 @@ class OpenFan(CoordinatorEntity, FanEntity):
     def extra_state_attributes(self) -> dict[str, Any]:
         opts = self._entry.options or {}
         ctrl = getattr(self._device, "ctrl_state", {}) or {}
+        rpm_control = getattr(self._device, "rpm_control", None)
         return {
+            "channel": self._channel,
             "min_pwm": int(opts.get("min_pwm", 0)),
             "min_pwm_calibrated": bool(opts.get("min_pwm_calibrated", False)),
             "temp_control_active": bool(ctrl.get("active", False)),
             "temp_entity": ctrl.get("temp_entity") or opts.get("temp_entity", ""),
             "temp_curve": ctrl.get("temp_curve") or opts.get("temp_curve", ""),
+            "temp_profile": ctrl.get("temp_profile"),
             "temp_avg": ctrl.get("temp_avg"),
+            "temp_projected": ctrl.get("temp_projected"),
             "last_target_pwm": ctrl.get("last_target_pwm"),
             "last_applied_pwm": ctrl.get("last_applied_pwm"),
             "temp_update_min_interval": int(ctrl.get("temp_update_min_interval", opts.get("temp_update_min_interval", 10))),
             "temp_deadband_pct": int(ctrl.get("temp_deadband_pct", opts.get("temp_deadband_pct", 3))),
+            "target_rpm": rpm_control.target(self._channel) if rpm_control is not None else None,
+        }
+
+
+class OpenFanGroupFan(FanEntity):
+    """Virtual fan driving all members in one pass; state aggregated from member data."""
+
+    _attr_should_poll = False
+    _attr_icon = "mdi:fan-plus"
+    _attr_supported_features = FanEntityFeature.SET_SPEED | FanEntityFeature.TURN_ON | FanEntityFeature.TURN_OFF
+
+    def __init__(self, group: OpenFanGroup) -> None:
+        self._group = group
+        self._attr_name = group.name
+        self._attr_unique_id = f"openfan_micro_group_{group.entry.entry_id}"
+        self._agg: dict[str, Any] = {}
+        self._coord_unsubs: dict[int, Callable[[], None]] = {}
+        self._unsub_members: Callable[[], None] | None = None
+        self._pending: asyncio.Handle | None = None
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(self._group.async_add_listener(self._track_members))
+        self.async_on_remove(self._unbind_all)
+        self._track_members()
+
+    # ---- member wiring ----
+
+    @callback
+    def _track_members(self) -> None:
+        """(Re)subscribe to member state changes (catches member entry reloads)."""
+        if self._unsub_members is not None:
+            self._unsub_members()
+        self._unsub_members = async_track_state_change_event(
+            self.hass, self._group.member_ids, self._on_member_state
+        )
+        self._bind_coordinators()
+        self._refresh_state()
+
+    @callback
+    def _bind_coordinators(self) -> None:
+        """Listen to each member coordinator once (adds no polling)."""
+        coords = {id(m.device.coordinator): m.device.coordinator for m in self._group.members()}
+        for key in [k for k in self._coord_unsubs if k not in coords]:
+            self._coord_unsubs.pop(key)()
+        for key, coord in coords.items():
+            if key not in self._coord_unsubs:
+                self._coord_unsubs[key] = coord.async_add_listener(self._schedule_refresh)
+
+    @callback
+    def _unbind_all(self) -> None:
+        for unsub in self._coord_unsubs.values():
+            unsub()
+        self._coord_unsubs.clear()
+        if self._unsub_members is not None:
+            self._unsub_members()
+            self._unsub_members = None
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+
+    @callback
+    def _on_member_state(self, ev) -> None:
+        self._bind_coordinators()
+        self._schedule_refresh()
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        # Members polled in the same loop iteration produce one state write
+        if self._pending is None:
+            self._pending = self.hass.loop.call_soon(self._refresh_state)
+
+    @callback
+    def _refresh_state(self) -> None:
+        self._pending = None
+        self._agg = self._group.aggregate()
+        self.async_write_ha_state()
+
+    # ---- state ----
+
+    @property
+    def available(self) -> bool:
+        return bool(self._agg.get("available_members"))
+
+    @property
+    def percentage(self) -> int | None:
+        return self._agg.get("pwm")
+
+    @property
+    def is_on(self) -> bool | None:
+        p = self.percentage
+        return None if p is None else (p > 0)
+
+    # ---- control ----
+
+    async def async_set_percentage(self, percentage: int) -> None:
+        await self._group.async_set_percentage(int(percentage))
+
+    async def async_turn_on(self, percentage: int | None = None, **kwargs) -> None:
+        await self._group.async_set_percentage(percentage)
+
+    async def async_turn_off(self, **kwargs) -> None:
+        await self._group.async_set_percentage(0)
+
+    # ---- attributes ----
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        agg = self._agg
+        return {
+            "members": list(self._group.member_ids),
+            "available_members": agg.get("available_members", 0),
+            "rpm_avg": agg.get("rpm_avg"),
+            "rpm_min": agg.get("rpm_min"),
+            "rpm_max": agg.get("rpm_max"),
+            "stalled": agg.get("stalled", False),
+            "stalled_members": agg.get("stalled_members", []),
+            "zone_active": bool(self._group.ctrl_state.get("active", False)),
+            "temp_entity": self._group.ctrl_state.get("temp_entity", ""),
+            "temp_avg": self._group.ctrl_state.get("temp_avg"),
+            "temp_projected": self._group.ctrl_state.get("temp_projected"),
+            "temp_profile": self._group.ctrl_state.get("temp_profile"),
+            "zone_target_pwm": self._group.ctrl_state.get("last_target_pwm"),
         }
@@ -0,0 +1,204 @@
+"""Fan groups: one virtual fan driving several OpenFAN fans together.
+
+A group is its own config entry holding member fan entity ids. Members are
+resolved through the entity registry at use time (owner entry → device,
+channel, `min_pwm`), so groups survive member reloads and need no polling of
+their own: state is aggregated from the members' coordinator data.
+
+Writes go to all members in one pass: members on the same host are batched
+into one `set_pwm_many()` call and hosts are written concurrently, so the
+fans change speed together.
+
+With a temperature entity in its options a group is a thermal zone: one
+`ZoneController` (one input, one curve, one timer) drives all members. The
+members' own device controllers arm no periodic tick meanwhile.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable, Optional
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN
+from .controller import ZoneController
+
+_LOGGER = logging.getLogger(__name__)
+
+CONF_MEMBERS = "members"
+
+
+def is_group_entry(entry: ConfigEntry) -> bool:
+    return CONF_MEMBERS in (entry.data or {})
+
+
+def zone_driven(hass: HomeAssistant, dev: Any) -> bool:
+    """True if a fan of device `dev` is a member of an active zone."""
+    registry = er.async_get(hass)
+    for ce in hass.config_entries.async_entries(DOMAIN):
+        group = getattr(ce, "runtime_data", None)
+        if not isinstance(group, OpenFanGroup) or group.controller is None:
+            continue
+        for entity_id in group.member_ids:
+            ent = registry.async_get(entity_id)
+            if ent is None or ent.platform != DOMAIN:
+                continue
+            if dev.channel_of(ent.unique_id) is not None:
+                return True
+    return False
+
+
+def update_device_ticks(hass: HomeAssistant) -> None:
+    """Zone membership changed: re-evaluate the device controllers' periodic ticks."""
+    for ce in hass.config_entries.async_entries(DOMAIN):
+        if is_group_entry(ce):
+            continue
+        controller = getattr(getattr(ce, "runtime_data", None), "controller", None)
+        if controller is not None:
+            controller.update_tick()
+
+
+class GroupMember:
+    """A resolved member: device runtime, fan channel and owning entry."""
+
+    __slots__ = ("entity_id", "device", "channel", "entry")
+
+    def __init__(self, entity_id: str, device: Any, channel: int, entry: ConfigEntry) -> None:
+        self.entity_id = entity_id
+        self.device = device
+        self.channel = channel
+        self.entry = entry
+
+    @property
+    def min_pwm(self) -> int:
+        return int((self.entry.options or {}).get("min_pwm", 0))
+
+    @property
+    def available(self) -> bool:
+        coord = self.device.coordinator
+        return bool(coord.last_update_success) and not getattr(coord, "_forced_unavailable", False)
+
+    def target(self, percentage: Optional[int]) -> int:
+        """Member PWM for a group percentage (None = the member's turn-on minimum)."""
+        if percentage is None:
+            return max(1, self.min_pwm)
+        percentage = max(0, min(100, int(percentage)))
+        return 0 if percentage == 0 else max(self.min_pwm, percentage)
+
+
+class OpenFanGroup:
+    """Runtime of a group entry (`entry.runtime_data`)."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        self.hass = hass
+        self.entry = entry
+        self.name: str = entry.data.get("name") or entry.title
+        self.member_ids: list[str] = []
+        self._listeners: list[Callable[[], None]] = []
+        # Zone control (only while a temperature entity is configured)
+        self.controller: Optional[ZoneController] = None
+        self.ctrl_state: dict[str, Any] = {}
+        self.apply_options(entry.options or {})
+
+    def apply_options(self, opts: dict[str, Any]) -> None:
+        """Members come from options (edited later) or the entry data (created)."""
+        members = opts.get(CONF_MEMBERS, self.entry.data.get(CONF_MEMBERS)) or []
+        zone_changed = False
+        if list(members) != self.member_ids:
+            self.member_ids = list(members)
+            zone_changed = self.controller is not None
+            for cb in list(self._listeners):
+                cb()
+        if (opts.get("temp_entity") or "").strip():
+            if self.controller is None:
+                self.controller = ZoneController(self.hass, self)
+                zone_changed = True
+            self.controller.apply_options(opts)
+            if zone_changed:
+                update_device_ticks(self.hass)
+        elif self.controller is not None:
+            self.stop()
+
+    def stop(self) -> None:
+        """Stop zone control (trackers, timer, pending evaluations)."""
+        if self.controller is not None:
+            self.controller.stop()
+            self.controller = None
+            # the members' own controllers tick again
+            update_device_ticks(self.hass)
+        self.ctrl_state = {}
+
+    @callback
+    def async_add_listener(self, cb: Callable[[], None]) -> Callable[[], None]:
+        """Call `cb` when the member list changes; returns the remover."""
+        self._listeners.append(cb)
+        return lambda: self._listeners.remove(cb)
+
+    def members(self) -> list[GroupMember]:
+        """Resolve members whose owner entry is loaded (unresolvable ones are skipped)."""
+        registry = er.async_get(self.hass)
+        out: list[GroupMember] = []
+        for entity_id in self.member_ids:
+            ent = registry.async_get(entity_id)
+            if ent is None or ent.platform != DOMAIN or not ent.config_entry_id:
+                continue
+            ce = self.hass.config_entries.async_get_entry(ent.config_entry_id)
+            dev = getattr(ce, "runtime_data", None) if ce else None
+            if dev is None or getattr(dev, "coordinator", None) is None:
+                continue  # not loaded yet, or another group
+            channel = dev.channel_of(ent.unique_id)
+            if channel is None:
+                continue  # not a fan entity of that device
+            out.append(GroupMember(entity_id, dev, channel, ce))
+        return out
+
+    async def async_set_percentage(self, percentage: Optional[int]) -> None:
+        """Write all members in one pass (per-host batches, hosts concurrently)."""
+        batches: dict[int, tuple[Any, dict[int, int]]] = {}
+        for member in self.members():
+            dev = member.device
+            rpm_control = getattr(dev, "rpm_control", None)
+            if rpm_control is not None:
+                # a manual group speed ends the member's target-RPM loop
+                rpm_control.clear(member.channel)
+            batches.setdefault(id(dev), (dev, {}))[1][member.channel] = member.target(percentage)
+        if not batches:
+            return
+        results = await asyncio.gather(
+            *(dev.api.set_pwm_many(values) for dev, values in batches.values()),
+            return_exceptions=True,
+        )
+        for (dev, _), res in zip(batches.values(), results):
+            if isinstance(res, Exception):
+                _LOGGER.warning("OpenFAN group %s: write to %s failed: %r", self.name, dev.host, res)
+        await asyncio.gather(
+            *(dev.coordinator.async_request_refresh() for dev, _ in batches.values())
+        )
+
+    def aggregate(self) -> dict[str, Any]:
+        """Aggregated state from the members' latest coordinator data (no I/O)."""
+        pwms: list[int] = []
+        rpms: list[int] = []
+        stalled: list[str] = []
+        for member in self.members():
+            if not member.available:
+                continue
+            st = member.device.channel_status(member.channel)
+            if st is None:
+                continue
+            pwms.append(st.pwm)
+            rpms.append(st.rpm)
+            if st.stalled:
+                stalled.append(member.entity_id)
+        return {
+            "available_members": len(pwms),
+            "pwm": int(round(sum(pwms) / len(pwms))) if pwms else None,
+            "rpm_avg": int(round(sum(rpms) / len(rpms))) if rpms else None,
+            "rpm_min": min(rpms) if rpms else None,
+            "rpm_max": max(rpms) if rpms else None,
+            "stalled": bool(stalled),
+            "stalled_members": stalled,
+        }
@@ -0,0 +1,223 @@
+"""Lightweight, fixed-size performance counters for OpenFAN Micro.
+
+Everything here is O(1) in memory: histograms use a fixed set of
+log-spaced buckets, so overhead does not grow with HA uptime.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Optional
+
+# Log-spaced bucket upper bounds in seconds: 0.5 ms .. ~60 s (factor 1.25),
+# plus one overflow bucket. Shared by every histogram instance.
+_BUCKET_BOUNDS: tuple[float, ...] = tuple(0.0005 * (1.25**i) for i in range(54))
+
+
+class LatencyHistogram:
+    """Fixed-size latency histogram with approximate percentiles."""
+
+    __slots__ = ("_counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self._counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self._counts[bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the bucket upper bound (seconds) covering quantile q (0..1)."""
+        if not self.count:
+            return None
+        rank = max(1, int(round(q * self.count)))
+        seen = 0
+        for idx, n in enumerate(self._counts):
+            seen += n
+            if seen >= rank:
+                if idx < len(_BUCKET_BOUNDS):
+                    return min(_BUCKET_BOUNDS[idx], self.max)
+                return self.max
+        return self.max
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add another histogram's samples into this one."""
+        for idx, n in enumerate(other._counts):
+            self._counts[idx] += n
+        self.count += other.count
+        self.total += other.total
+        if other.max > self.max:
+            self.max = other.max
+
+    def as_dict(self) -> dict[str, Any]:
+        def _ms(val: Optional[float]) -> Optional[float]:
+            return None if val is None else round(val * 1000.0, 2)
+
+        return {
+            "count": self.count,
+            "mean_ms": _ms(self.total / self.count) if self.count else None,
+            "p50_ms": _ms(self.percentile(0.50)),
+            "p95_ms": _ms(self.percentile(0.95)),
+            "p99_ms": _ms(self.percentile(0.99)),
+            "max_ms": _ms(self.max) if self.count else None,
+        }
+
+
+class EndpointStats:
+    """Counters for one HTTP endpoint (path without query string)."""
+
+    __slots__ = ("requests", "errors", "timeouts", "bytes_received", "latency")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.bytes_received = 0
+        self.latency = LatencyHistogram()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "bytes_received": self.bytes_received,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class ApiStats:
+    """Per-endpoint request statistics plus legacy-fallback and read-sharing counters."""
+
+    __slots__ = ("endpoints", "legacy_fallbacks", "shared_reads", "cached_reads")
+
+    def __init__(self) -> None:
+        self.endpoints: dict[str, EndpointStats] = {}
+        self.legacy_fallbacks = 0
+        # reads answered by another caller's in-flight request / by the TTL cache
+        self.shared_reads = 0
+        self.cached_reads = 0
+
+    def endpoint(self, path: str) -> EndpointStats:
+        key = path.split("?", 1)[0]
+        st = self.endpoints.get(key)
+        if st is None:
+            st = self.endpoints[key] = EndpointStats()
+        return st
+
+    @property
+    def requests(self) -> int:
+        return sum(st.requests for st in self.endpoints.values())
+
+    @property
+    def timeouts(self) -> int:
+        return sum(st.timeouts for st in self.endpoints.values())
+
+    @property
+    def bytes_received(self) -> int:
+        return sum(st.bytes_received for st in self.endpoints.values())
+
+    def latency(self) -> LatencyHistogram:
+        """Latency histogram merged over all endpoints."""
+        merged = LatencyHistogram()
+        for st in self.endpoints.values():
+            merged.merge(st.latency)
+        return merged
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "timeouts": self.timeouts,
+            "bytes_received": self.bytes_received,
+            "legacy_fallbacks": self.legacy_fallbacks,
+            "shared_reads": self.shared_reads,
+            "cached_reads": self.cached_reads,
+            "endpoints": {path: st.as_dict() for path, st in sorted(self.endpoints.items())},
+        }
+
+
+class ControllerStats:
+    """Temperature-controller cost: evaluations vs. applied writes, time spent."""
+
+    __slots__ = ("evaluations", "writes", "eval_time")
+
+    def __init__(self) -> None:
+        self.evaluations = 0
+        self.writes = 0
+        self.eval_time = LatencyHistogram()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "evaluations": self.evaluations,
+            "writes": self.writes,
+            "eval_time": self.eval_time.as_dict(),
+        }
+
+
+# Controller decision outcomes
+OUTCOME_APPLIED = "applied"
+OUTCOME_DEADBAND = "deadband"
+OUTCOME_MIN_INTERVAL = "min_interval"
+OUTCOME_BUDGET = "budget"
+OUTCOME_GATED = "gated"
+OUTCOME_NO_SAMPLE = "no_sample"
+OUTCOME_RPM = "rpm_target"
+
+
+class DecisionRecord:
+    """One controller decision (compact, immutable by convention)."""
+
+    __slots__ = ("ts", "trigger", "temp", "target", "outcome")
+
+    def __init__(
+        self,
+        ts: float,
+        trigger: str,
+        temp: Optional[float],
+        target: Optional[int],
+        outcome: str,
+    ) -> None:
+        self.ts = ts
+        self.trigger = trigger
+        self.temp = temp
+        self.target = target
+        self.outcome = outcome
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "ts": self.ts,
+            "trigger": self.trigger,
+            "temp": None if self.temp is None else round(self.temp, 2),
+            "target": self.target,
+            "outcome": self.outcome,
+        }
+
+
+class DecisionTrace:
+    """Bounded ring buffer of controller decisions (oldest dropped first)."""
+
+    __slots__ = ("_buf",)
+
+    def __init__(self, maxlen: int = 256) -> None:
+        self._buf: deque[DecisionRecord] = deque(maxlen=maxlen)
+
+    def record(
+        self,
+        ts: float,
+        trigger: str,
+        temp: Optional[float],
+        target: Optional[int],
+        outcome: str,
+    ) -> None:
+        self._buf.append(DecisionRecord(ts, trigger, temp, target, outcome))
+
+    def __len__(self) -> int:
+        return len(self._buf)
+
+    def as_list(self) -> list[dict[str, Any]]:
+        return [rec.as_dict() for rec in self._buf]
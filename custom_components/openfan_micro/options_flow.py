@@ -4,7 +4,10 @@ from typing import Any, Dict
 import voluptuous as vol
 from homeassistant import config_entries
 
+from homeassistant.helpers.selector import EntitySelector, EntitySelectorConfig
+
 from .const import DOMAIN
+from .group import CONF_MEMBERS, is_group_entry
 
 DEFAULTS = {
     "poll_interval": 5,
@@ -13,9 +16,28 @@ DEFAULTS = {
     "temp_curve": "45=25, 65=55, 70=100",  # C=%
     "temp_integrate_seconds": 30,
     "temp_update_min_interval": 10,
-    "temp_deadband_pct": 3,
+    "temp_predict_seconds": 0,  # 0 = react to the moving average only
+    "temp_deadband_pct": 3,  # falling targets (slow down)
+    "temp_up_deadband_pct": None,  # rising targets; None = temp_deadband_pct (symmetric)
+    "temp_up_min_interval": None,  # None = temp_update_min_interval
+    "temp_max_slew_pct_s": 0,  # 0 = unlimited
+    "temp_write_budget_per_min": 0,  # 0 = unlimited
+    "temp_rpm_curve": "",  # C=RPM; set = closed-loop target-RPM mode
+    "temp_profiles": "",  # "name: curve | name: curve"
+    "temp_schedule": "",  # "HH:MM-HH:MM=name, ..." (outside = temp_curve)
+    "rpm_kp": 0.02,  # % PWM per RPM of error
+    "rpm_ki": 0.04,  # % PWM per RPM·s
+    "rpm_kd": 0.0,
+    "rpm_tolerance_pct": 3,
+    "rpm_max_step_pct": 10,  # max PWM change per loop update
+    "rpm_settle_poll": 1,  # poll interval (s) while a loop settles
     "failure_threshold": 3,
     "stall_consecutive": 3,
+    "rpm_filter_window": 0,  # rolling median over N polls (0 = off)
+    "status_cache_ms": 0,  # serve status replies this young from cache (0 = off)
+    "reconcile_drift": True,  # re-apply commanded PWM/LED/voltage after a device reset
+    "metrics_endpoint": False,
+    "channels": 0,  # 0 = auto-detect from the batched status reply
     # "min_pwm_calibrated": false  # set by calibrate_min service
 }
 
@@ -25,21 +47,104 @@ def _schema(options: dict):
         vol.Optional("min_pwm", default=options.get("min_pwm", DEFAULTS["min_pwm"])): vol.All(int, vol.Range(min=0, max=60)),
         vol.Optional("temp_entity", default=options.get("temp_entity", DEFAULTS["temp_entity"])): str,
         vol.Optional("temp_curve", default=options.get("temp_curve", DEFAULTS["temp_curve"])): str,
+        vol.Optional("temp_profiles", default=options.get("temp_profiles", DEFAULTS["temp_profiles"])): str,
+        vol.Optional("temp_schedule", default=options.get("temp_schedule", DEFAULTS["temp_schedule"])): str,
         vol.Optional("temp_integrate_seconds", default=options.get("temp_integrate_seconds", DEFAULTS["temp_integrate_seconds"])): vol.All(int, vol.Range(min=5, max=900)),
+        vol.Optional("temp_predict_seconds", default=options.get("temp_predict_seconds", DEFAULTS["temp_predict_seconds"])): vol.All(int, vol.Range(min=0, max=600)),
         vol.Optional("temp_update_min_interval", default=options.get("temp_update_min_interval", DEFAULTS["temp_update_min_interval"])): vol.All(int, vol.Range(min=2, max=300)),
         vol.Optional("temp_deadband_pct", default=options.get("temp_deadband_pct", DEFAULTS["temp_deadband_pct"])): vol.All(int, vol.Range(min=0, max=20)),
+        vol.Optional("temp_up_deadband_pct", description={"suggested_value": options.get("temp_up_deadband_pct")}): vol.All(int, vol.Range(min=0, max=20)),
+        vol.Optional("temp_up_min_interval", description={"suggested_value": options.get("temp_up_min_interval")}): vol.All(int, vol.Range(min=1, max=300)),
+        vol.Optional("temp_max_slew_pct_s", default=options.get("temp_max_slew_pct_s", DEFAULTS["temp_max_slew_pct_s"])): vol.All(int, vol.Range(min=0, max=100)),
+        vol.Optional("temp_write_budget_per_min", default=options.get("temp_write_budget_per_min", DEFAULTS["temp_write_budget_per_min"])): vol.All(int, vol.Range(min=0, max=60)),
+        vol.Optional("temp_rpm_curve", default=options.get("temp_rpm_curve", DEFAULTS["temp_rpm_curve"])): str,
+        vol.Optional("rpm_kp", default=options.get("rpm_kp", DEFAULTS["rpm_kp"])): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+        vol.Optional("rpm_ki", default=options.get("rpm_ki", DEFAULTS["rpm_ki"])): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+        vol.Optional("rpm_kd", default=options.get("rpm_kd", DEFAULTS["rpm_kd"])): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+        vol.Optional("rpm_tolerance_pct", default=options.get("rpm_tolerance_pct", DEFAULTS["rpm_tolerance_pct"])): vol.All(int, vol.Range(min=1, max=20)),
+        vol.Optional("rpm_max_step_pct", default=options.get("rpm_max_step_pct", DEFAULTS["rpm_max_step_pct"])): vol.All(int, vol.Range(min=1, max=100)),
+        vol.Optional("rpm_settle_poll", default=options.get("rpm_settle_poll", DEFAULTS["rpm_settle_poll"])): vol.All(int, vol.Range(min=1, max=60)),
         vol.Optional("failure_threshold", default=options.get("failure_threshold", DEFAULTS["failure_threshold"])): vol.All(int, vol.Range(min=1, max=10)),
         vol.Optional("stall_consecutive", default=options.get("stall_consecutive", DEFAULTS["stall_consecutive"])): vol.All(int, vol.Range(min=1, max=10)),
+        vol.Optional("rpm_filter_window", default=options.get("rpm_filter_window", DEFAULTS["rpm_filter_window"])): vol.All(vol.Coerce(int), vol.In([0, 3, 5, 7, 9])),
+        vol.Optional("status_cache_ms", default=options.get("status_cache_ms", DEFAULTS["status_cache_ms"])): vol.All(int, vol.Range(min=0, max=2000)),
+        vol.Optional("reconcile_drift", default=options.get("reconcile_drift", DEFAULTS["reconcile_drift"])): bool,
+        vol.Optional("metrics_endpoint", default=options.get("metrics_endpoint", DEFAULTS["metrics_endpoint"])): bool,
+        vol.Optional("channels", default=options.get("channels", DEFAULTS["channels"])): vol.All(int, vol.Range(min=0, max=16)),
+    })
+
+def _group_schema(entry: config_entries.ConfigEntry):
+    options = entry.options or {}
+    members = options.get(CONF_MEMBERS, entry.data.get(CONF_MEMBERS, []))
+    return vol.Schema({
+        vol.Required(CONF_MEMBERS, default=members): EntitySelector(
+            EntitySelectorConfig(integration=DOMAIN, domain="fan", multiple=True)
+        ),
+        # Zone control: empty temperature entity = plain group
+        vol.Optional("temp_entity", default=options.get("temp_entity", DEFAULTS["temp_entity"])): str,
+        vol.Optional("temp_curve", default=options.get("temp_curve", DEFAULTS["temp_curve"])): str,
+        vol.Optional("temp_profiles", default=options.get("temp_profiles", DEFAULTS["temp_profiles"])): str,
+        vol.Optional("temp_schedule", default=options.get("temp_schedule", DEFAULTS["temp_schedule"])): str,
+        vol.Optional("temp_integrate_seconds", default=options.get("temp_integrate_seconds", DEFAULTS["temp_integrate_seconds"])): vol.All(int, vol.Range(min=5, max=900)),
+        vol.Optional("temp_predict_seconds", default=options.get("temp_predict_seconds", DEFAULTS["temp_predict_seconds"])): vol.All(int, vol.Range(min=0, max=600)),
+        vol.Optional("temp_update_min_interval", default=options.get("temp_update_min_interval", DEFAULTS["temp_update_min_interval"])): vol.All(int, vol.Range(min=2, max=300)),
+        vol.Optional("temp_deadband_pct", default=options.get("temp_deadband_pct", DEFAULTS["temp_deadband_pct"])): vol.All(int, vol.Range(min=0, max=20)),
+        vol.Optional("temp_up_deadband_pct", description={"suggested_value": options.get("temp_up_deadband_pct")}): vol.All(int, vol.Range(min=0, max=20)),
+        vol.Optional("temp_up_min_interval", description={"suggested_value": options.get("temp_up_min_interval")}): vol.All(int, vol.Range(min=1, max=300)),
+        vol.Optional("temp_max_slew_pct_s", default=options.get("temp_max_slew_pct_s", DEFAULTS["temp_max_slew_pct_s"])): vol.All(int, vol.Range(min=0, max=100)),
+        vol.Optional("temp_write_budget_per_min", default=options.get("temp_write_budget_per_min", DEFAULTS["temp_write_budget_per_min"])): vol.All(int, vol.Range(min=0, max=60)),
     })
 
+# Optional fields: left empty in the form, the option is removed (falls back)
+_UNSET_WHEN_EMPTY = ("temp_up_deadband_pct", "temp_up_min_interval")
+
+
+def _merge(entry: config_entries.ConfigEntry, user_input: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(entry.options or {})
+    merged.update(user_input)
+    for key in _UNSET_WHEN_EMPTY:
+        if key not in user_input:
+            merged.pop(key, None)
+    return merged
+
+# Options written by services rather than the forms (accepted by `validate_options`)
+_SERVICE_OPTIONS = {vol.Optional("min_pwm_calibrated"): bool}
+
+
+def validate_options(entry: config_entries.ConfigEntry, update: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate an options update against the entry's form schema; return the coerced values.
+
+    Raises `vol.Invalid` for unknown keys and invalid values.
+    """
+    current = dict(entry.options or {})
+    base = _group_schema(entry) if is_group_entry(entry) else _schema(current)
+    schema = base.extend(_SERVICE_OPTIONS, extra=vol.ALLOW_EXTRA)
+    unknown = sorted(set(update) - {str(key) for key in schema.schema})
+    if unknown:
+        raise vol.Invalid(f"unknown option(s): {', '.join(unknown)}")
+    validated = schema({**current, **update})
+    return {key: validated[key] for key in update}
+
 class OptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, entry: config_entries.ConfigEntry) -> None:
         self.entry = entry
 
     async def async_step_init(self, user_input: Dict[str, Any] | None = None):
         if user_input is not None:
-            merged = dict(self.entry.options or {})
-            merged.update(user_input)
-            return self.async_create_entry(title="", data=merged)
+            return self.async_create_entry(title="", data=_merge(self.entry, user_input))
 
+        if is_group_entry(self.entry):
+            return self.async_show_form(step_id="group", data_schema=_group_schema(self.entry))
         return self.async_show_form(step_id="init", data_schema=_schema(self.entry.options or {}))
+
+    async def async_step_group(self, user_input: Dict[str, Any] | None = None):
+        """Fan groups: member list + optional zone control."""
+        if user_input is not None and user_input.get(CONF_MEMBERS):
+            merged = _merge(self.entry, user_input)
+            merged[CONF_MEMBERS] = list(dict.fromkeys(user_input[CONF_MEMBERS]))
+            return self.async_create_entry(title="", data=merged)
+        return self.async_show_form(
+            step_id="group",
+            data_schema=_group_schema(self.entry),
+            errors={"base": "no_members"} if user_input is not None else None,
+        )
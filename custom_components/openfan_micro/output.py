@@ -0,0 +1,133 @@
+"""PWM output stage: shapes controller targets into device writes.
+
+Sits between the curve target and `set_pwm`. Pure bookkeeping with an
+injected clock (no Home Assistant, no I/O), so it can be replayed offline:
+
+- asymmetric hysteresis (opt-in): rising targets can pass a smaller
+  deadband / shorter interval than falling ones (fast up, slow down);
+  unset, both directions use the falling values
+- slew limit: each write moves at most `slew_pct_s × elapsed` percent
+  towards the target (0 = unlimited); later evaluations continue the ramp,
+  never through PWMs between 0 and the output's min PWM
+- write budget: token bucket of `writes_per_min` writes (0 = unlimited)
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from .metrics import (
+    OUTCOME_APPLIED,
+    OUTCOME_BUDGET,
+    OUTCOME_DEADBAND,
+    OUTCOME_MIN_INTERVAL,
+)
+
+
+class OutputStage:
+    """Hysteresis + slew + write budget for one output (device or zone member)."""
+
+    __slots__ = (
+        "up_deadband",
+        "down_deadband",
+        "up_interval",
+        "down_interval",
+        "slew_pct_s",
+        "writes_per_min",
+        "last",
+        "last_ts",
+        "_tokens",
+        "_tokens_ts",
+    )
+
+    def __init__(
+        self,
+        up_deadband: Optional[int] = None,
+        down_deadband: int = 3,
+        up_interval: Optional[float] = None,
+        down_interval: float = 10,
+        slew_pct_s: float = 0,
+        writes_per_min: int = 0,
+    ) -> None:
+        # rising targets default to the falling deadband / interval (symmetric)
+        self.up_deadband = down_deadband if up_deadband is None else up_deadband
+        self.down_deadband = down_deadband
+        self.up_interval = down_interval if up_interval is None else up_interval
+        self.down_interval = down_interval
+        self.slew_pct_s = slew_pct_s
+        self.writes_per_min = writes_per_min
+        self.last: Optional[int] = None
+        self.last_ts = 0.0
+        self._tokens = float(writes_per_min)
+        self._tokens_ts: Optional[float] = None
+
+    @classmethod
+    def from_options(cls, opts: dict[str, Any]) -> "OutputStage":
+        stage = cls()
+        stage.configure(opts)
+        return stage
+
+    def configure(self, opts: dict[str, Any]) -> None:
+        """Apply entry options in place (the last write and budget state are kept)."""
+        self.down_deadband = int(opts.get("temp_deadband_pct", 3))
+        self.down_interval = int(opts.get("temp_update_min_interval", 10))
+        # unset up_* options: same as the falling values (asymmetry is opt-in)
+        up_deadband = opts.get("temp_up_deadband_pct")
+        up_interval = opts.get("temp_up_min_interval")
+        self.up_deadband = self.down_deadband if up_deadband is None else int(up_deadband)
+        self.up_interval = self.down_interval if up_interval is None else int(up_interval)
+        self.slew_pct_s = float(opts.get("temp_max_slew_pct_s", 0))
+        budget = int(opts.get("temp_write_budget_per_min", 0))
+        if budget != self.writes_per_min:
+            self.writes_per_min = budget
+            self._tokens = float(budget)
+
+    def reset(self) -> None:
+        """Forget the last write (next step writes the target directly)."""
+        self.last = None
+        self.last_ts = 0.0
+
+    def _refill(self, now: float) -> None:
+        if self._tokens_ts is not None:
+            self._tokens = min(
+                float(self.writes_per_min),
+                self._tokens + (now - self._tokens_ts) * self.writes_per_min / 60.0,
+            )
+        self._tokens_ts = now
+
+    def step(self, target: int, now: float, floor: int = 0) -> tuple[Optional[int], str]:
+        """Return (value to write or None, outcome) for `target` at time `now`.
+
+        `floor` is the output's min PWM: a slewed ramp never writes a PWM
+        between 0 and `floor` (towards 0 it switches off, from 0 or below
+        `floor` it starts at `floor`). Does not record the write; call
+        `commit()` once it was sent.
+        """
+        last = self.last
+        if last is None:
+            value = target
+        else:
+            delta = target - last
+            rising = delta > 0
+            if abs(delta) < max(0, self.up_deadband if rising else self.down_deadband) or delta == 0:
+                return None, OUTCOME_DEADBAND
+            if (now - self.last_ts) < max(1, self.up_interval if rising else self.down_interval):
+                return None, OUTCOME_MIN_INTERVAL
+            value = target
+            if self.slew_pct_s > 0:
+                max_step = max(1, int(self.slew_pct_s * (now - self.last_ts)))
+                value = last + max(-max_step, min(max_step, delta))
+                if 0 < value < floor:
+                    value = floor if target else 0
+        if self.writes_per_min > 0:
+            self._refill(now)
+            if self._tokens < 1.0:
+                return None, OUTCOME_BUDGET
+        return value, OUTCOME_APPLIED
+
+    def commit(self, value: int, now: float) -> None:
+        """Record a write that was sent."""
+        self.last = value
+        self.last_ts = now
+        if self.writes_per_min > 0:
+            self._refill(now)
+            self._tokens = max(0.0, self._tokens - 1.0)
@@ -0,0 +1,172 @@
+"""OpenMetrics (Prometheus) exporter view for all OpenFAN Micro devices.
+
+The view renders straight from coordinator data, controller state and API
+stats; it never touches the HA state machine. It is registered once when any
+entry enables the `metrics_endpoint` option and answers 404 while no entry
+has it enabled (HA views cannot be unregistered).
+"""
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.http import KEY_HASS
+
+from .const import DOMAIN
+
+METRICS_URL = "/api/openfan_micro/metrics"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _num(value: Any) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def render_openmetrics(devices: Iterable[Any]) -> str:
+    """Render OpenMetrics text for the given `OpenFanDevice` objects.
+
+    Samples are grouped per metric family (required by the format), so each
+    device contributes one line per family (per channel for fan series on
+    multi-channel hosts); cost is linear in device/channel count.
+    """
+    fam: dict[str, list[str]] = {
+        "up": [],
+        "rpm": [],
+        "pwm": [],
+        "v12": [],
+        "stalled": [],
+        "temp": [],
+        "req": [],
+        "timeouts": [],
+        "fallbacks": [],
+        "latency": [],
+    }
+    for dev in devices:
+        coord = getattr(dev, "coordinator", None)
+        api = getattr(dev, "api", None)
+        if coord is None or api is None:
+            continue
+        lbl = f'host="{_escape(dev.host)}",name="{_escape(dev.name)}"'
+        up = bool(coord.last_update_success) and not getattr(coord, "_forced_unavailable", False)
+        fam["up"].append(f"openfan_up{{{lbl}}} {_num(up)}")
+
+        data = coord.data
+        if data is not None:
+            channels = data.channels
+            for ch, st in enumerate(channels):
+                if st is None:
+                    continue
+                # single-fan devices keep the unlabelled series
+                clbl = lbl if len(channels) == 1 else f'{lbl},channel="{ch}"'
+                fam["rpm"].append(f"openfan_rpm{{{clbl}}} {_num(st.rpm)}")
+                fam["pwm"].append(f"openfan_pwm_percent{{{clbl}}} {_num(st.pwm)}")
+                fam["stalled"].append(f"openfan_stalled{{{clbl}}} {_num(st.stalled)}")
+            fam["v12"].append(f"openfan_supply_12v{{{lbl}}} {_num(data.is_12v)}")
+
+        temp = (getattr(dev, "ctrl_state", None) or {}).get("temp_avg")
+        if temp is not None:
+            fam["temp"].append(f"openfan_controller_temperature_celsius{{{lbl}}} {_num(temp)}")
+
+        stats = api.stats
+        fam["req"].append(f"openfan_requests_total{{{lbl}}} {_num(stats.requests)}")
+        fam["timeouts"].append(f"openfan_request_timeouts_total{{{lbl}}} {_num(stats.timeouts)}")
+        fam["fallbacks"].append(
+            f"openfan_legacy_fallbacks_total{{{lbl}}} {_num(stats.legacy_fallbacks)}"
+        )
+        hist = stats.latency()
+        for q in _QUANTILES:
+            val = hist.percentile(q)
+            if val is not None:
+                fam["latency"].append(
+                    f'openfan_request_latency_seconds{{{lbl},quantile="{q}"}} {_num(val)}'
+                )
+        fam["latency"].append(f"openfan_request_latency_seconds_count{{{lbl}}} {hist.count}")
+        fam["latency"].append(f"openfan_request_latency_seconds_sum{{{lbl}}} {_num(hist.total)}")
+
+    out: list[str] = []
+
+    def _family(key: str, name: str, kind: str, help_: str, unit: str = "") -> None:
+        out.append(f"# TYPE {name} {kind}")
+        if unit:
+            out.append(f"# UNIT {name} {unit}")
+        out.append(f"# HELP {name} {help_}")
+        out.extend(fam[key])
+
+    _family("up", "openfan_up", "gauge", "Device reachable and not gated unavailable.")
+    _family("rpm", "openfan_rpm", "gauge", "Fan speed in RPM.")
+    _family("pwm", "openfan_pwm_percent", "gauge", "Fan PWM duty in percent.")
+    _family("v12", "openfan_supply_12v", "gauge", "1 if the fan supply is 12V, 0 for 5V.")
+    _family("stalled", "openfan_stalled", "gauge", "1 if a stall is detected.")
+    _family(
+        "temp",
+        "openfan_controller_temperature_celsius",
+        "gauge",
+        "Averaged temperature seen by the controller.",
+        "celsius",
+    )
+    _family("req", "openfan_requests", "counter", "HTTP requests sent to the device.")
+    _family("timeouts", "openfan_request_timeouts", "counter", "HTTP requests that timed out.")
+    _family("fallbacks", "openfan_legacy_fallbacks", "counter", "Fallbacks to legacy endpoints.")
+    _family(
+        "latency",
+        "openfan_request_latency_seconds",
+        "summary",
+        "HTTP request latency (fixed-bucket approximation).",
+        "seconds",
+    )
+    out.append("# EOF")
+    out.append("")
+    return "\n".join(out)
+
+
+def _enabled_devices(hass: HomeAssistant) -> list[Any] | None:
+    """Return loaded devices, or None if no entry enables the exporter."""
+    entries = hass.config_entries.async_entries(DOMAIN)
+    if not any((ce.options or {}).get("metrics_endpoint") for ce in entries):
+        return None
+    return [
+        ce.runtime_data
+        for ce in entries
+        if ce.state is ConfigEntryState.LOADED and getattr(ce, "runtime_data", None) is not None
+    ]
+
+
+class OpenFanMetricsView(HomeAssistantView):
+    """Authenticated GET endpoint returning OpenMetrics text."""
+
+    url = METRICS_URL
+    name = "api:openfan_micro:metrics"
+    requires_auth = True
+
+    async def get(self, request: web.Request) -> web.Response:
+        hass: HomeAssistant = request.app[KEY_HASS]
+        devices = _enabled_devices(hass)
+        if devices is None:
+            return web.Response(status=404, text="OpenFAN metrics endpoint disabled")
+        return web.Response(
+            body=render_openmetrics(devices).encode("utf-8"),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
+
+
+def async_register_metrics_view(hass: HomeAssistant) -> None:
+    """Register the exporter view once per HA instance."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if domain_data.get("metrics_view"):
+        return
+    hass.http.register_view(OpenFanMetricsView())
+    domain_data["metrics_view"] = True
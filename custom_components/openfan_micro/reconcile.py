@@ -0,0 +1,109 @@
+"""Drift reconciliation: restore the commanded device state after a reset.
+
+The API remembers what was last sent to a host: PWM per channel, LED and
+supply voltage. After every poll the reconciler compares that with the
+readings. A reading that differs from the commanded value, or an uptime
+that went backwards (reboot), re-applies the commanded value once. If the
+same divergence is still there after that write (changed on the device
+itself, or not supported by the firmware), it is left alone until the
+commanded value or the reading changes, so a host that disagrees never
+costs a write per poll. In steady state nothing is written.
+
+Keys are `("pwm", channel)`, `"led"` and `"is_12v"`. No Home Assistant
+imports.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Hashable, Optional
+
+# duty readback may be rounded by the firmware
+PWM_TOLERANCE = 1
+
+
+def _kind(key: Hashable) -> str:
+    return key[0] if isinstance(key, tuple) else str(key)
+
+
+def _label(key: Hashable) -> str:
+    return f"pwm_{key[1]}" if isinstance(key, tuple) else str(key)
+
+
+def _matches(key: Hashable, want: Any, have: Any) -> bool:
+    if _kind(key) == "pwm":
+        return abs(int(want) - int(have)) <= PWM_TOLERANCE
+    return bool(want) == bool(have)
+
+
+class DriftReconciler:
+    """Decides, per poll, which commanded values to re-apply; keeps the counters."""
+
+    __slots__ = ("counts", "last", "_uptime", "_attempted", "_given_up")
+
+    def __init__(self) -> None:
+        self.counts = {
+            "checks": 0,
+            "reboots": 0,
+            "pwm_drift": 0,
+            "led_drift": 0,
+            "is_12v_drift": 0,
+            "reapplied": 0,
+            "failed": 0,
+            "given_up": 0,
+        }
+        # last re-apply: {"ts", "reason", "values"}
+        self.last: Optional[dict[str, Any]] = None
+        self._uptime: Optional[float] = None
+        # key -> commanded value already re-applied for the current divergence
+        self._attempted: dict[Hashable, Any] = {}
+        self._given_up: set[Hashable] = set()
+
+    def plan(
+        self,
+        commanded: dict[Hashable, Any],
+        readings: dict[Hashable, Any],
+        uptime: Optional[float] = None,
+    ) -> dict[Hashable, Any]:
+        """Return {key: value} to re-apply after this poll (empty in steady state).
+
+        `readings` holds only what the host actually reported this poll;
+        `uptime` is None when the firmware does not report one.
+        """
+        counts = self.counts
+        counts["checks"] += 1
+        rebooted = uptime is not None and self._uptime is not None and uptime < self._uptime
+        if uptime is not None:
+            self._uptime = uptime
+        if rebooted:
+            counts["reboots"] += 1
+            self._attempted.clear()
+            self._given_up.clear()
+
+        out: dict[Hashable, Any] = {}
+        for key, want in commanded.items():
+            have = readings.get(key)
+            if have is not None and _matches(key, want, have):
+                self._attempted.pop(key, None)
+                self._given_up.discard(key)
+                continue
+            if have is None and not rebooted:
+                continue  # not reported: only a reboot says it is gone
+            if key in self._attempted and self._attempted[key] == want:
+                if key not in self._given_up:
+                    self._given_up.add(key)
+                    counts["given_up"] += 1
+                continue
+            if have is not None:
+                counts[f"{_kind(key)}_drift"] += 1
+            self._attempted[key] = want
+            out[key] = want
+        if out:
+            self.last = {
+                "ts": time.time(),
+                "reason": "reboot" if rebooted else "drift",
+                "values": {_label(k): v for k, v in out.items()},
+            }
+        return out
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**self.counts, "last": self.last, "uptime": self._uptime}
@@ -0,0 +1,290 @@
+"""Closed-loop target-RPM control: one PID loop per fan channel.
+
+Targets come from the `set_target_rpm` service or from the temperature
+controller's °C→RPM curve (`temp_rpm_curve`). The loop runs on every
+coordinator update (no timer of its own): PID on the measured RPM with
+
+- bumpless start (the integral term starts at the channel's current PWM)
+- anti-windup (while the output is clamped or rate-limited, the integral
+  tracks the value actually output instead of accumulating)
+- output clamped to [min_pwm, 100] and rate-limited per update
+- a tolerance band: inside it the output is held, so no corrective writes
+- no steps while a write is still in flight: the loop state only moves
+  for outputs the device actually received
+
+While any channel is settling the coordinator polls at `rpm_settle_poll`
+seconds; after a few settled samples it returns to the normal interval.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+# upper clamp of °C→RPM curve values
+RPM_CURVE_MAX = 20000
+# consecutive in-tolerance samples before polling slows down again
+SETTLED_SAMPLES = 3
+# tolerance floor, so low targets do not demand single-RPM precision
+MIN_TOLERANCE_RPM = 20
+
+
+class RpmPid:
+    """PID from RPM error to PWM % (clock injected, no I/O)."""
+
+    __slots__ = (
+        "kp",
+        "ki",
+        "kd",
+        "tolerance_pct",
+        "max_step",
+        "target",
+        "integral",
+        "output",
+        "last_rpm",
+        "last_ts",
+        "settled",
+    )
+
+    def __init__(
+        self,
+        target: int,
+        pwm: float,
+        now: float,
+        kp: float = 0.02,
+        ki: float = 0.04,
+        kd: float = 0.0,
+        tolerance_pct: float = 3.0,
+        max_step: float = 10.0,
+    ) -> None:
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.tolerance_pct = tolerance_pct
+        self.max_step = max_step
+        self.target = target
+        # bumpless start: the integral carries the operating point
+        self.integral = float(pwm)
+        self.output = float(pwm)
+        self.last_rpm: Optional[int] = None
+        self.last_ts = now
+        self.settled = False
+
+    @property
+    def tolerance(self) -> float:
+        return max(MIN_TOLERANCE_RPM, self.target * self.tolerance_pct / 100.0)
+
+    def hold(self, rpm: int, now: float) -> None:
+        """Take a sample without a step (output not delivered yet): no integration over it."""
+        self.last_rpm, self.last_ts = rpm, now
+
+    def update(self, rpm: int, now: float, floor: int = 0) -> Optional[int]:
+        """New PWM for a measured `rpm` at `now`, or None to hold the output."""
+        dt = max(0.0, now - self.last_ts)
+        last_rpm = self.last_rpm
+        self.last_rpm, self.last_ts = rpm, now
+        error = self.target - rpm
+        self.settled = abs(error) <= self.tolerance
+        if self.settled:
+            return None
+
+        lo, hi = float(max(0, floor)), 100.0
+        p = self.kp * error
+        # derivative on the measurement (no kick when the target changes)
+        d = 0.0 if last_rpm is None or dt <= 0 else -self.kd * (rpm - last_rpm) / dt
+        integral = min(hi, max(lo, self.integral + self.ki * error * dt))
+        out = p + integral + d
+        # output clamp and per-update rate limit
+        limited = min(hi, max(lo, out))
+        limited = min(self.output + self.max_step, max(self.output - self.max_step, limited))
+        # a ramp up from below min PWM (e.g. from off) starts at min PWM
+        limited = max(lo, limited)
+        if limited != out:
+            # anti-windup (tracking): the integral follows what was actually output
+            integral = min(hi, max(lo, limited - p - d))
+        self.integral = integral
+        out = limited
+        self.output = out
+        return int(round(out))
+
+
+class RpmController:
+    """Target-RPM loops of one device (`dev.rpm_control`)."""
+
+    def __init__(self, hass: HomeAssistant, dev: Any) -> None:
+        self.hass = hass
+        self.dev = dev
+        self.kp = 0.02
+        self.ki = 0.04
+        self.kd = 0.0
+        self.tolerance_pct = 3.0
+        self.max_step = 10.0
+        self.settle_poll_s = 1
+        # channel -> (pid, source) with source "service" or "curve"
+        self.loops: dict[int, tuple[RpmPid, str]] = {}
+        self.updates = 0
+        self.writes = 0
+        self._settled_count = 0
+        self._fast = False
+        self._unsub: Optional[Callable[[], None]] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def apply_options(self, opts: dict[str, Any]) -> None:
+        """Apply entry options in place (running loops keep their state)."""
+        self.kp = float(opts.get("rpm_kp", 0.02))
+        self.ki = float(opts.get("rpm_ki", 0.04))
+        self.kd = float(opts.get("rpm_kd", 0.0))
+        self.tolerance_pct = float(opts.get("rpm_tolerance_pct", 3))
+        self.max_step = float(opts.get("rpm_max_step_pct", 10))
+        self.settle_poll_s = int(opts.get("rpm_settle_poll", 1))
+        for pid, _ in self.loops.values():
+            pid.kp, pid.ki, pid.kd = self.kp, self.ki, self.kd
+            pid.tolerance_pct, pid.max_step = self.tolerance_pct, self.max_step
+        if self._fast:
+            # the options update reset the poll interval: settle polling again
+            self._fast = False
+            self._set_fast(True)
+
+    # -------------------- targets --------------------
+
+    def target(self, channel: int) -> Optional[int]:
+        loop = self.loops.get(channel)
+        return loop[0].target if loop else None
+
+    def set_target(self, channel: int, rpm: int, source: str = "service") -> None:
+        """Start (or retarget) the loop of `channel`; 0 RPM switches the fan off."""
+        rpm = max(0, int(rpm))
+        if rpm == 0:
+            running = channel in self.loops
+            self.clear(channel)
+            st = self.dev.channel_status(channel)
+            if running or (st is not None and st.pwm):
+                self._spawn(self.dev.api.set_pwm_many({channel: 0}))
+            return
+        loop = self.loops.get(channel)
+        if loop is not None:
+            pid = loop[0]
+            if source == "curve" and abs(rpm - pid.target) < pid.tolerance:
+                return  # setpoint jitter from the curve: keep the loop as it is
+            pid.target = rpm
+        else:
+            st = self.dev.channel_status(channel)
+            pwm = st.pwm if st is not None else 0
+            pid = RpmPid(
+                rpm,
+                pwm,
+                time.monotonic(),
+                self.kp,
+                self.ki,
+                self.kd,
+                self.tolerance_pct,
+                self.max_step,
+            )
+        self.loops[channel] = (pid, source)
+        self._settled_count = 0
+        self._bind()
+        self._set_fast(True)
+
+    def clear(self, channel: Optional[int] = None, source: Optional[str] = None) -> None:
+        """Stop the loop of `channel` (all channels if None; only `source`-set loops if given)."""
+        for ch in [channel] if channel is not None else list(self.loops):
+            loop = self.loops.get(ch)
+            if loop is not None and (source is None or loop[1] == source):
+                del self.loops[ch]
+        if not self.loops:
+            self._unbind()
+            self._set_fast(False)
+
+    # -------------------- loop --------------------
+
+    def _bind(self) -> None:
+        if self._unsub is None:
+            self._unsub = self.dev.coordinator.async_add_listener(self._on_update)
+
+    def _unbind(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    def _set_fast(self, fast: bool) -> None:
+        if fast == self._fast:
+            return
+        self._fast = fast
+        normal = int(getattr(self.dev.api, "_poll_interval", 5) or 5)
+        self.dev.coordinator.set_poll_interval(
+            min(normal, self.settle_poll_s) if fast else normal
+        )
+
+    def _spawn(self, coro) -> None:
+        task = self.hass.async_create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @callback
+    def _on_update(self) -> None:
+        """One PID step per channel on fresh coordinator data."""
+        coord = self.dev.coordinator
+        if not coord.last_update_success or not self.loops:
+            return
+        now = time.monotonic()
+        if self._tasks:
+            # previous write still in flight: stepping now would wind the loops
+            # up against an output the device has not received
+            for ch, (pid, _) in self.loops.items():
+                st = self.dev.channel_status(ch)
+                if st is not None:
+                    pid.hold(st.rpm, now)
+            return
+        self.updates += 1
+        floor = int(getattr(self.dev.api, "_min_pwm", 0) or 0)
+        writes: dict[int, int] = {}
+        settled = True
+        for ch, (pid, _) in self.loops.items():
+            st = self.dev.channel_status(ch)
+            if st is None:
+                continue
+            value = pid.update(st.rpm, now, floor)
+            settled = settled and pid.settled
+            if value is not None and value != st.pwm:
+                writes[ch] = value
+        if writes:
+            self.writes += 1
+            self._spawn(self.dev.api.set_pwm_many(writes))
+        self._settled_count = self._settled_count + 1 if settled else 0
+        self._set_fast(self._settled_count < SETTLED_SAMPLES)
+
+    def stop(self) -> None:
+        """Stop all loops and pending writes (on unload).
+
+        The coordinator is already shut down by then, so the poll interval
+        is left alone rather than rescheduling a refresh on it.
+        """
+        self._unbind()
+        self.loops.clear()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        self._fast = False
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "loops": {
+                ch: {
+                    "source": source,
+                    "target_rpm": pid.target,
+                    "output_pwm": round(pid.output, 1),
+                    "integral": round(pid.integral, 2),
+                    "last_rpm": pid.last_rpm,
+                    "settled": pid.settled,
+                }
+                for ch, (pid, source) in self.loops.items()
+            },
+            "fast_polling": self._fast,
+            "updates": self.updates,
+            "writes": self.writes,
+        }
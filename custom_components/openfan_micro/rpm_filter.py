@@ -0,0 +1,46 @@
+"""Rolling-median filter for tachometer readings.
+
+A single 0 or garbage RPM sample (tach glitch) would otherwise count
+towards a stall and publish a spike. The median of the last `window`
+samples ignores isolated outliers, while a real change (a stall, a new
+PWM) shows up after `window // 2 + 1` polls.
+
+The window is kept in arrival order (ring) and in sorted order: bisect
+finds the insert/remove positions in O(log n); for the small windows used
+here (3–15 samples) the list shifts are negligible. No Home Assistant
+imports.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections import deque
+
+
+class RollingMedian:
+    """Median of the last `window` integer samples."""
+
+    __slots__ = ("window", "_ring", "_sorted")
+
+    def __init__(self, window: int) -> None:
+        self.window = max(1, int(window))
+        self._ring: deque[int] = deque()
+        self._sorted: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def push(self, value: int) -> int:
+        """Add a sample and return the median of the window."""
+        ring, srt = self._ring, self._sorted
+        if len(ring) >= self.window:
+            del srt[bisect_left(srt, ring.popleft())]
+        ring.append(value)
+        insort(srt, value)
+        n = len(srt)
+        mid = n // 2
+        # even counts only occur while the window fills up
+        return srt[mid] if n % 2 else (srt[mid - 1] + srt[mid]) // 2
+
+    def clear(self) -> None:
+        self._ring.clear()
+        self._sorted.clear()
@@ -0,0 +1,112 @@
+"""Time-of-day curve profiles: named curves plus a daily schedule.
+
+Profiles (`temp_profiles`): "quiet: 45=25, 60=55, 75=100 | batch: 40=50, 55=80, 65=100"
+Schedule (`temp_schedule`): "22:00-07:00=quiet, 13:00-15:00=batch" (ranges may
+wrap midnight; a later range wins where ranges overlap; outside every range
+the entry's own `temp_curve` applies).
+
+Both are compiled once: the schedule becomes a sorted list of day segments
+(minute of day → profile), so the active profile is a bisect and the next
+transition is the next segment start. No Home Assistant imports.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Optional
+
+from .curve import CompiledCurve
+
+DAY_MINUTES = 24 * 60
+
+
+def parse_profiles(txt: str, hi: int = 100) -> dict[str, CompiledCurve]:
+    """Parse "name: curve | name: curve"; parts without a name or a valid curve are skipped."""
+    profiles: dict[str, CompiledCurve] = {}
+    for part in (txt or "").split("|"):
+        name, sep, curve_txt = part.partition(":")
+        name = name.strip()
+        if not sep or not name:
+            continue
+        curve = CompiledCurve(curve_txt.strip(), hi)
+        if curve:
+            profiles[name] = curve
+    return profiles
+
+
+def _minute(hhmm: str) -> Optional[int]:
+    hh, sep, mm = hhmm.strip().partition(":")
+    try:
+        h, m = int(hh), int(mm) if sep else 0
+    except ValueError:
+        return None
+    if h == 24 and m == 0:
+        return DAY_MINUTES
+    if not (0 <= h < 24 and 0 <= m < 60):
+        return None
+    return h * 60 + m
+
+
+def parse_schedule(txt: str) -> list[tuple[int, int, str]]:
+    """Parse "HH:MM-HH:MM=profile, ..." into (start, end, profile) minutes; bad parts are skipped."""
+    out = []
+    for part in [p.strip() for p in (txt or "").split(",") if p.strip()]:
+        span, sep, name = part.partition("=")
+        start_txt, dash, end_txt = span.partition("-")
+        if not sep or not dash or not name.strip():
+            continue
+        start, end = _minute(start_txt), _minute(end_txt)
+        if start is None or end is None:
+            continue
+        out.append((start % DAY_MINUTES, end % DAY_MINUTES, name.strip()))
+    return out
+
+
+def _covers(start: int, end: int, minute: int) -> bool:
+    if start == end:
+        return True  # whole day
+    if start < end:
+        return start <= minute < end
+    return minute >= start or minute < end  # wraps midnight
+
+
+class ProfileSchedule:
+    """Compiled daily schedule: day segments (start minute, profile or None for the base curve)."""
+
+    __slots__ = ("text", "starts", "names", "changes")
+
+    def __init__(self, text: str, known: Optional[set[str] | dict] = None) -> None:
+        self.text = text
+        ranges = [r for r in parse_schedule(text) if known is None or r[2] in known]
+        points = sorted({0} | {s for s, _, _ in ranges} | {e for _, e, _ in ranges})
+        starts: list[int] = []
+        names: list[Optional[str]] = []
+        for point in points:
+            name = None
+            for start, end, profile in ranges:
+                if _covers(start, end, point):
+                    name = profile
+            if not names or names[-1] != name:
+                starts.append(point)
+                names.append(name)
+        self.starts = tuple(starts)
+        self.names = tuple(names)
+        # segment starts where the profile actually changes (cyclic: 00:00 is
+        # no change if the last segment of the day has the same profile)
+        self.changes = tuple(
+            start for i, start in enumerate(starts) if len(names) > 1 and names[i] != names[i - 1]
+        )
+
+    def __bool__(self) -> bool:
+        return any(n is not None for n in self.names)
+
+    def at(self, minute: int) -> Optional[str]:
+        """Profile active at `minute` of the day (None = base curve)."""
+        return self.names[bisect_right(self.starts, minute % DAY_MINUTES) - 1]
+
+    def next_change(self, minute: int) -> Optional[int]:
+        """Minute of day of the next profile change after `minute` (None if it never changes)."""
+        changes = self.changes
+        if not changes:
+            return None
+        idx = bisect_right(changes, minute % DAY_MINUTES)
+        return changes[idx] if idx < len(changes) else changes[0]  # else: tomorrow
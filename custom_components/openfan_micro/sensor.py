@@ -1,14 +1,18 @@
-"""RPM sensor for OpenFAN Micro."""
+"""RPM sensor and (disabled-by-default) performance diagnostic sensors for OpenFAN Micro."""
 from __future__ import annotations
-from typing import Any
+from typing import Any, Callable
 import logging
 
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .entity import OpenFanSnapshotEntity
+from .snapshot import RPM
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -19,21 +23,53 @@ async def async_setup_entry(
     if device is None:
         _LOGGER.error("OpenFAN Micro: runtime_data is None (sensor)")
         return
-    async_add_entities([OpenFanRpmSensor(device)])
+    entities: list[SensorEntity] = [OpenFanRpmSensor(device, ch) for ch in range(device.channels)]
+    entities.extend(OpenFanPerfSensor(device, *desc) for desc in PERF_SENSORS)
+    async_add_entities(entities)
+
+
+def _ms(val: float | None) -> float | None:
+    return None if val is None else round(val * 1000.0, 1)
+
 
+# key, name suffix, unit, state class, value(device)
+PERF_SENSORS: tuple[tuple[str, str, str | None, SensorStateClass, Callable[[Any], Any]], ...] = (
+    ("requests", "Requests", None, SensorStateClass.TOTAL_INCREASING,
+     lambda d: d.api.stats.requests),
+    ("timeouts", "Request Timeouts", None, SensorStateClass.TOTAL_INCREASING,
+     lambda d: d.api.stats.timeouts),
+    ("legacy_fallbacks", "Legacy Fallbacks", None, SensorStateClass.TOTAL_INCREASING,
+     lambda d: d.api.stats.legacy_fallbacks),
+    ("bytes_received", "Bytes Received", UnitOfInformation.BYTES, SensorStateClass.TOTAL_INCREASING,
+     lambda d: d.api.stats.bytes_received),
+    ("latency_p50", "Request Latency p50", UnitOfTime.MILLISECONDS, SensorStateClass.MEASUREMENT,
+     lambda d: _ms(d.api.stats.latency().percentile(0.50))),
+    ("latency_p95", "Request Latency p95", UnitOfTime.MILLISECONDS, SensorStateClass.MEASUREMENT,
+     lambda d: _ms(d.api.stats.latency().percentile(0.95))),
+    ("latency_p99", "Request Latency p99", UnitOfTime.MILLISECONDS, SensorStateClass.MEASUREMENT,
+     lambda d: _ms(d.api.stats.latency().percentile(0.99))),
+    ("ctrl_evaluations", "Controller Evaluations", None, SensorStateClass.TOTAL_INCREASING,
+     lambda d: d.coordinator.ctrl_stats.evaluations),
+    ("ctrl_writes", "Controller Writes", None, SensorStateClass.TOTAL_INCREASING,
+     lambda d: d.coordinator.ctrl_stats.writes),
+    ("ctrl_time_p95", "Controller Time p95", UnitOfTime.MILLISECONDS, SensorStateClass.MEASUREMENT,
+     lambda d: _ms(d.coordinator.ctrl_stats.eval_time.percentile(0.95))),
+)
 
-class OpenFanRpmSensor(CoordinatorEntity, SensorEntity):
+
+class OpenFanRpmSensor(OpenFanSnapshotEntity, SensorEntity):
     _attr_native_unit_of_measurement = "rpm"
     _attr_icon = "mdi:fan"
     _attr_state_class = SensorStateClass.MEASUREMENT
+    _watch = RPM
 
-    def __init__(self, device) -> None:
+    def __init__(self, device, channel: int = 0) -> None:
         super().__init__(device.coordinator)
         self._device = device
+        self._channel = channel
         self._host = getattr(device, "host", "unknown")
-        name = getattr(device, "name", None) or f"OpenFAN Micro {self._host}"
-        self._attr_name = f"{name} RPM"
-        self._attr_unique_id = f"openfan_micro_rpm_{self._host}"
+        self._attr_name = f"{device.channel_name(channel)} RPM"
+        self._attr_unique_id = f"openfan_micro_rpm_{self._host}{device.channel_suffix(channel)}"
 
     @property
     def device_info(self) -> dict[str, Any] | None:
@@ -42,7 +78,54 @@ class OpenFanRpmSensor(CoordinatorEntity, SensorEntity):
         except Exception:
             return None
 
+    @property
+    def available(self) -> bool:
+        return super().available and self._device.channel_status(self._channel) is not None
+
     @property
     def native_value(self) -> int | None:
-        data = self.coordinator.data or {}
-        return int(data.get("rpm") or 0)
+        st = self._device.channel_status(self._channel)
+        return st.rpm if st is not None else 0
+
+
+class OpenFanPerfSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic counter/latency sensor; refreshed on each coordinator update."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_icon = "mdi:timer-outline"
+
+    def __init__(
+        self,
+        device,
+        key: str,
+        suffix: str,
+        unit: str | None,
+        state_class: SensorStateClass,
+        value_fn: Callable[[Any], Any],
+    ) -> None:
+        super().__init__(device.coordinator)
+        self._device = device
+        self._host = getattr(device, "host", "unknown")
+        self._value_fn = value_fn
+        name = getattr(device, "name", None) or f"OpenFAN Micro {self._host}"
+        self._attr_name = f"{name} {suffix}"
+        self._attr_unique_id = f"openfan_micro_{key}_{self._host}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+
+    @property
+    def device_info(self) -> dict[str, Any] | None:
+        try:
+            return self._device.device_info()
+        except Exception:
+            return None
+
+    @property
+    def available(self) -> bool:
+        # Counters stay meaningful while the device is unreachable
+        return True
+
+    @property
+    def native_value(self) -> Any:
+        return self._value_fn(self._device)
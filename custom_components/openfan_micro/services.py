@@ -0,0 +1,309 @@
+"""Domain services for OpenFAN Micro.
+
+Services are registered once for the domain (on the first entry setup) and
+removed again when the last entry unloads. Handlers resolve the target
+device from the fan entity's owning config entry at call time, so they hold
+no reference to any particular entry or device.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Optional, Tuple
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN
+from .group import is_group_entry
+from .options_flow import validate_options
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICES = (
+    "led_set",
+    "set_voltage",
+    "calibrate_min",
+    "set_temp_control",
+    "clear_temp_control",
+    "set_target_rpm",
+    "export_config",
+    "import_config",
+)
+
+# Services returning data (everything else returns nothing)
+_RESPONSES = {
+    "export_config": SupportsResponse.ONLY,
+    "import_config": SupportsResponse.OPTIONAL,
+}
+
+CONFIG_VERSION = 1
+
+
+def _get_entry_by_id(hass: HomeAssistant, entry_id: str) -> Optional[ConfigEntry]:
+    ce = hass.config_entries.async_get_entry(entry_id)
+    return ce if ce is not None and ce.domain == DOMAIN else None
+
+
+def _resolve_dev(hass: HomeAssistant, entity_id: str) -> Tuple[Optional[Any], Optional[str]]:
+    """Return (Device, owner_config_entry_id) for the given entity_id."""
+    ent = er.async_get(hass).async_get(entity_id)
+    owner_id = ent.config_entry_id if ent else None
+    if not owner_id:
+        _LOGGER.error("openfan_micro: entity_id %s not found in registry", entity_id)
+        return None, None
+    ce = _get_entry_by_id(hass, owner_id)
+    dev = getattr(ce, "runtime_data", None) if ce else None
+    if dev is None:
+        _LOGGER.error("openfan_micro: runtime_data not ready for entry_id=%s", owner_id)
+    elif getattr(dev, "api", None) is None:
+        _LOGGER.error("openfan_micro: %s is a fan group, not a device fan", entity_id)
+        return None, None
+    return dev, owner_id
+
+
+def _entity_channel(hass: HomeAssistant, dev: Any, entity_id: str) -> Optional[int]:
+    """Fan channel of `entity_id` on `dev` (None if it is not one of the device's fans)."""
+    ent = er.async_get(hass).async_get(entity_id)
+    channel = dev.channel_of(ent.unique_id if ent else None)
+    if channel is None:
+        _LOGGER.error("openfan_micro: %s is not a fan channel of %s", entity_id, dev.host)
+    return channel
+
+
+def _update_options(hass: HomeAssistant, entry_id: str, update: dict[str, Any]) -> None:
+    """Write options to the owner entry; its update listener applies them in place."""
+    ce = _get_entry_by_id(hass, entry_id)
+    if not ce:
+        _LOGGER.error("openfan_micro: target entry not found for options update")
+        return
+    new_opts = dict(ce.options or {})
+    new_opts.update(update)
+    hass.config_entries.async_update_entry(ce, options=new_opts)
+
+
+# ------------------- LED / voltage / calibration -------------------
+
+
+async def _svc_led_set(hass: HomeAssistant, call: ServiceCall) -> None:
+    dev, _ = _resolve_dev(hass, call.data.get("entity_id", ""))
+    if not dev:
+        return
+    await dev.api.led_set(bool(call.data["enabled"]))
+
+
+async def _svc_set_voltage(hass: HomeAssistant, call: ServiceCall) -> None:
+    dev, _ = _resolve_dev(hass, call.data.get("entity_id", ""))
+    if not dev:
+        return
+    volts = int(call.data["volts"])
+    await dev.api.set_voltage_12v(True if volts == 12 else False)
+
+
+async def _svc_calibrate_min(hass: HomeAssistant, call: ServiceCall) -> None:
+    dev, owner_id = _resolve_dev(hass, call.data.get("entity_id", ""))
+    if not dev or not owner_id:
+        _LOGGER.error("openfan_micro.calibrate_min: could not resolve device from entity_id")
+        return
+    from_pct = int(call.data.get("from_pct", 10))
+    to_pct = int(call.data.get("to_pct", 40))
+    step = int(call.data.get("step", 5))
+    rpm_thr = int(call.data.get("rpm_threshold", 100))
+    margin = int(call.data.get("margin", 5))
+    channel = _entity_channel(hass, dev, call.data.get("entity_id", ""))
+    if channel is None:
+        return
+
+    found = None
+    for pct in range(from_pct, to_pct + 1, step):
+        await dev.api.set_pwm(pct, channel)
+        # allow RPM to settle
+        await asyncio.sleep(max(1, int(dev.api._poll_interval)))
+        await dev.coordinator.async_request_refresh()
+        st = dev.channel_status(channel)
+        rpm = st.rpm if st is not None else 0
+        if rpm >= rpm_thr:
+            found = pct
+            break
+
+    if found is not None:
+        new_min = max(0, min(100, found + margin))
+        _update_options(hass, owner_id, {"min_pwm": new_min, "min_pwm_calibrated": True})
+        _LOGGER.info("Calibrated min_pwm=%s for entry %s", new_min, owner_id)
+    else:
+        _LOGGER.warning("Calibration did not reach RPM threshold; leaving min_pwm unchanged.")
+
+
+# --------------- Temp control configuration (Options fallback) ---------------
+
+
+async def _svc_set_temp_control(hass: HomeAssistant, call: ServiceCall) -> None:
+    dev, owner_id = _resolve_dev(hass, call.data.get("entity_id", ""))
+    if not dev or not owner_id:
+        _LOGGER.error("openfan_micro.set_temp_control: could not resolve device from entity_id")
+        return
+
+    update = {}
+    if "temp_entity" in call.data:
+        update["temp_entity"] = str(call.data.get("temp_entity") or "").strip()
+    for k in (
+        "temp_curve",
+        "temp_profiles",
+        "temp_schedule",
+        "temp_integrate_seconds",
+        "temp_predict_seconds",
+        "temp_update_min_interval",
+        "temp_deadband_pct",
+        "temp_up_deadband_pct",
+        "temp_up_min_interval",
+        "temp_max_slew_pct_s",
+        "temp_write_budget_per_min",
+        "temp_rpm_curve",
+    ):
+        if k in call.data:
+            update[k] = call.data[k]
+
+    # (Re)subscription and immediate evaluation happen in the owner's update listener
+    _update_options(hass, owner_id, update)
+
+
+async def _svc_clear_temp_control(hass: HomeAssistant, call: ServiceCall) -> None:
+    dev, owner_id = _resolve_dev(hass, call.data.get("entity_id", ""))
+    if not dev or not owner_id:
+        return
+    _update_options(hass, owner_id, {"temp_entity": ""})
+
+
+# ------------------- Closed-loop RPM -------------------
+
+
+async def _svc_set_target_rpm(hass: HomeAssistant, call: ServiceCall) -> None:
+    entity_id = call.data.get("entity_id", "")
+    dev, _ = _resolve_dev(hass, entity_id)
+    rpm_control = getattr(dev, "rpm_control", None) if dev else None
+    if rpm_control is None:
+        _LOGGER.error("openfan_micro.set_target_rpm: could not resolve device from entity_id")
+        return
+    channel = _entity_channel(hass, dev, entity_id)
+    if channel is None:
+        return
+    rpm_control.set_target(channel, int(call.data["rpm"]))
+    await dev.coordinator.async_request_refresh()
+
+
+# ------------------- Fleet configuration -------------------
+
+
+def _config_key(ce: ConfigEntry) -> str:
+    """Document key of an entry: its unique id (device host / group), else the entry id."""
+    return ce.unique_id or ce.entry_id
+
+
+async def _svc_export_config(hass: HomeAssistant, call: ServiceCall) -> dict[str, Any]:
+    """Options of every entry (devices and groups) as one document."""
+    return {
+        "version": CONFIG_VERSION,
+        "entries": {
+            _config_key(ce): {
+                "title": ce.title,
+                "group": is_group_entry(ce),
+                "options": dict(ce.options or {}),
+            }
+            for ce in hass.config_entries.async_entries(DOMAIN)
+        },
+    }
+
+
+async def _svc_import_config(hass: HomeAssistant, call: ServiceCall) -> dict[str, Any]:
+    """Validate a document from `export_config` and apply it to the matching entries in one batch.
+
+    Nothing is applied unless every entry validates. Entries are matched by
+    key; options missing from the document are left as they are.
+    """
+    doc = call.data.get("config")
+    entries = doc.get("entries") if isinstance(doc, dict) else None
+    if not isinstance(entries, dict) or doc.get("version") != CONFIG_VERSION:
+        raise ServiceValidationError(
+            f"openfan_micro.import_config: expected an export_config document (version {CONFIG_VERSION})"
+        )
+    by_key = {_config_key(ce): ce for ce in hass.config_entries.async_entries(DOMAIN)}
+    updates: list[tuple[ConfigEntry, dict[str, Any]]] = []
+    unchanged: list[str] = []
+    unknown: list[str] = []
+    errors: list[str] = []
+    for key, item in entries.items():
+        ce = by_key.get(key)
+        if ce is None:
+            unknown.append(key)
+            continue
+        opts = item.get("options") if isinstance(item, dict) else None
+        if not isinstance(opts, dict):
+            errors.append(f"{key}: no options")
+            continue
+        try:
+            update = validate_options(ce, opts)
+        except vol.Invalid as err:
+            errors.append(f"{key}: {err}")
+            continue
+        current = dict(ce.options or {})
+        new_opts = {**current, **update}
+        if new_opts == current:
+            unchanged.append(key)
+        else:
+            updates.append((ce, new_opts))
+    if errors:
+        raise ServiceValidationError(f"openfan_micro.import_config: {'; '.join(errors)}")
+
+    # One pass without awaiting: the config entry store coalesces the updates
+    # into a single delayed write; each entry's update listener then applies
+    # its options in place (no reloads)
+    for ce, new_opts in updates:
+        hass.config_entries.async_update_entry(ce, options=new_opts)
+    if unknown:
+        _LOGGER.warning("openfan_micro.import_config: no entry for %s", ", ".join(unknown))
+    _LOGGER.info("openfan_micro.import_config: updated %d entries, %d unchanged", len(updates), len(unchanged))
+    return {
+        "updated": [_config_key(ce) for ce, _ in updates],
+        "unchanged": unchanged,
+        "unknown": unknown,
+    }
+
+
+_HANDLERS = {
+    "led_set": _svc_led_set,
+    "set_voltage": _svc_set_voltage,
+    "calibrate_min": _svc_calibrate_min,
+    "set_temp_control": _svc_set_temp_control,
+    "clear_temp_control": _svc_clear_temp_control,
+    "set_target_rpm": _svc_set_target_rpm,
+    "export_config": _svc_export_config,
+    "import_config": _svc_import_config,
+}
+
+
+def async_register_services(hass: HomeAssistant) -> None:
+    """Register the domain services (idempotent)."""
+    for name in SERVICES:
+        if hass.services.has_service(DOMAIN, name):
+            continue
+        handler = _HANDLERS[name]
+
+        async def _call(call: ServiceCall, _handler=handler) -> Optional[dict[str, Any]]:
+            return await _handler(hass, call)
+
+        hass.services.async_register(
+            DOMAIN, name, _call, supports_response=_RESPONSES.get(name, SupportsResponse.NONE)
+        )
+
+
+def async_unregister_services(hass: HomeAssistant, unloading: ConfigEntry) -> None:
+    """Remove the domain services unless another entry is still loaded."""
+    for ce in hass.config_entries.async_entries(DOMAIN):
+        if ce.entry_id != unloading.entry_id and ce.state is ConfigEntryState.LOADED:
+            return
+    for name in SERVICES:
+        hass.services.async_remove(DOMAIN, name)
@@ -0,0 +1,122 @@
+"""Immutable status snapshots: one `DeviceStatus` per successful poll.
+
+The coordinator builds the snapshot once; entities, controllers, groups
+and the metrics view read its typed fields directly (no dict copies, no
+`.get()` chains or conversions per state render). Snapshots are named
+tuples: slotted, immutable and cheap to build.
+
+`changed` is a bitmask of the fields that differ from the previous
+snapshot (`ALL` on the first one): per channel in `ChannelStatus.changed`,
+and the union of the channels plus the device fields in
+`DeviceStatus.changed`. A channel whose values did not change keeps the
+previous snapshot's (unchanged) object; a fully steady poll returns the
+previous snapshot itself.
+
+No Home Assistant imports.
+"""
+from __future__ import annotations
+
+from typing import Any, NamedTuple, Optional
+
+# changed-field bits
+RPM = 1 << 0
+PWM = 1 << 1
+STALLED = 1 << 2
+RPM_RAW = 1 << 3
+LED = 1 << 4
+IS_12V = 1 << 5
+CHANNELS = 1 << 6  # channel layout (count) changed
+ALL = RPM | PWM | STALLED | RPM_RAW | LED | IS_12V | CHANNELS
+
+
+class ChannelStatus(NamedTuple):
+    """One fan channel: filtered RPM, PWM %, stall flag, unfiltered RPM (None if no filter)."""
+
+    rpm: int
+    pwm: int
+    stalled: bool
+    rpm_raw: Optional[int] = None
+    changed: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {"rpm": self.rpm, "pwm": self.pwm, "stalled": self.stalled}
+        if self.rpm_raw is not None:
+            out["rpm_raw"] = self.rpm_raw
+        return out
+
+
+class DeviceStatus(NamedTuple):
+    """One poll of a host: channels indexed by channel number, LED and supply state."""
+
+    channels: tuple[Optional[ChannelStatus], ...]
+    led: bool
+    is_12v: bool
+    changed: int = ALL
+
+    def channel(self, channel: int) -> Optional[ChannelStatus]:
+        """Status of `channel`, None if the host did not report it."""
+        chans = self.channels
+        return chans[channel] if 0 <= channel < len(chans) else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Legacy dict layout (diagnostics): channel 0 at the top level plus `channels`."""
+        first = self.channel(0) or ChannelStatus(0, 0, False)
+        return {
+            "rpm": first.rpm,
+            "pwm": first.pwm,
+            "led": self.led,
+            "is_12v": self.is_12v,
+            "stalled": first.stalled,
+            "channels": {ch: st.as_dict() for ch, st in enumerate(self.channels) if st is not None},
+        }
+
+
+_new = tuple.__new__  # skips the generated NamedTuple __new__ (hot path, all fields given)
+
+
+def _channel(
+    prev: Optional[ChannelStatus], rpm: int, pwm: int, stalled: bool, rpm_raw: Optional[int]
+) -> ChannelStatus:
+    if prev is None:
+        return _new(ChannelStatus, (rpm, pwm, stalled, rpm_raw, RPM | PWM | STALLED | RPM_RAW))
+    p_rpm, p_pwm, p_stalled, p_raw, p_changed = prev
+    changed = 0
+    if rpm != p_rpm:
+        changed = RPM
+    if pwm != p_pwm:
+        changed |= PWM
+    if stalled != p_stalled:
+        changed |= STALLED
+    if rpm_raw != p_raw:
+        changed |= RPM_RAW
+    if not changed and not p_changed:
+        return prev
+    return _new(ChannelStatus, (rpm, pwm, stalled, rpm_raw, changed))
+
+
+def build_status(
+    prev: Optional[DeviceStatus],
+    channels: dict[int, tuple[int, int, bool, Optional[int]]],
+    led: bool,
+    is_12v: bool,
+) -> DeviceStatus:
+    """Next snapshot from {channel: (rpm, pwm, stalled, rpm_raw)}, diffed against `prev`."""
+    count = max(channels) + 1 if channels else 0
+    prev_chans = prev.channels if prev is not None else ()
+    out: list[Optional[ChannelStatus]] = [None] * count
+    changed = 0
+    for ch, (rpm, pwm, stalled, rpm_raw) in channels.items():
+        st = _channel(prev_chans[ch] if ch < len(prev_chans) else None, rpm, pwm, stalled, rpm_raw)
+        out[ch] = st
+        changed |= st.changed
+    if prev is None:
+        return _new(DeviceStatus, (tuple(out), led, is_12v, ALL))
+    if count != len(prev_chans):
+        changed |= CHANNELS
+    if led != prev.led:
+        changed |= LED
+    if is_12v != prev.is_12v:
+        changed |= IS_12V
+    if not changed and not prev.changed:
+        return prev  # steady poll: the same snapshot object
+    return _new(DeviceStatus, (tuple(out), led, is_12v, changed))
@@ -4,11 +4,13 @@ from typing import Any
 import logging
 
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .entity import OpenFanSnapshotEntity
+from .snapshot import IS_12V, LED
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -20,7 +22,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     async_add_entities([OpenFanLedSwitch(device), OpenFanVoltageSwitch(device)])
 
 
-class _BaseSwitch(CoordinatorEntity, SwitchEntity):
+class _BaseSwitch(OpenFanSnapshotEntity, SwitchEntity):
     def __init__(self, device) -> None:
         super().__init__(device.coordinator)
         self._device = device
@@ -43,6 +45,7 @@ class _BaseSwitch(CoordinatorEntity, SwitchEntity):
 class OpenFanLedSwitch(_BaseSwitch):
     """Activity LED on/off."""
     _attr_icon = "mdi:led-on"
+    _watch = LED
 
     def __init__(self, device) -> None:
         super().__init__(device)
@@ -51,8 +54,8 @@ class OpenFanLedSwitch(_BaseSwitch):
 
     @property
     def is_on(self) -> bool | None:
-        data = self.coordinator.data or {}
-        return bool(data.get("led"))
+        data = self.coordinator.data
+        return data.led if data is not None else False
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         await self._device.api.led_set(True)
@@ -66,6 +69,7 @@ class OpenFanLedSwitch(_BaseSwitch):
 class OpenFanVoltageSwitch(_BaseSwitch):
     """12V mode on/off (on=12V, off=5V)."""
     _attr_icon = "mdi:flash"
+    _watch = IS_12V
 
     def __init__(self, device) -> None:
         super().__init__(device)
@@ -74,8 +78,8 @@ class OpenFanVoltageSwitch(_BaseSwitch):
 
     @property
     def is_on(self) -> bool | None:
-        data = self.coordinator.data or {}
-        return bool(data.get("is_12v"))
+        data = self.coordinator.data
+        return data.is_12v if data is not None else False
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         await self._device.api.set_voltage_12v(True)
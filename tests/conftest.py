@@ -0,0 +1,70 @@
+"""Shared fixtures: simulated OpenFAN Micro devices, an HTTP session, set-up entries."""
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+import aiohttp
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.openfan_micro.const import DOMAIN
+from tools.simulator import SimulatedFan, SimulatorFleet
+
+
+@pytest.fixture
+async def simulator(
+    socket_enabled: None,
+) -> AsyncIterator[Callable[..., Awaitable[SimulatorFleet]]]:
+    """Factory starting simulated devices on the test loop: `await simulator(count, **fan_kwargs)`.
+
+    The servers listen on 127.0.0.1 (the only host the Home Assistant test
+    plugin lets tests connect to, once sockets are enabled).
+    """
+    fleets: list[SimulatorFleet] = []
+
+    async def _start(count: int = 1, **fan_kwargs: Any) -> SimulatorFleet:
+        fleet = SimulatorFleet.build(count, **fan_kwargs)
+        await fleet.start()
+        fleets.append(fleet)
+        return fleet
+
+    yield _start
+    for fleet in fleets:
+        await fleet.stop()
+
+
+@pytest.fixture
+async def session() -> AsyncIterator[aiohttp.ClientSession]:
+    async with aiohttp.ClientSession() as sess:
+        yield sess
+
+
+@pytest.fixture
+async def setup_device(
+    hass: HomeAssistant, enable_custom_integrations: None, simulator
+) -> Callable[..., Awaitable[tuple[MockConfigEntry, SimulatedFan]]]:
+    """Factory: one simulated device set up as a config entry.
+
+    `entry, fan = await setup_device(fan_kwargs, **options)`
+    """
+    hass.config.components.add("http")  # manifest dependency; no server needed
+
+    async def _setup(
+        fan_kwargs: Optional[dict[str, Any]] = None, **options: Any
+    ) -> tuple[MockConfigEntry, SimulatedFan]:
+        fleet = await simulator(**(fan_kwargs or {}))
+        host = fleet.hosts[0]
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=f"OpenFAN Micro {host}",
+            unique_id=host,
+            data={"host": host, "name": f"OpenFAN Micro {host}"},
+            options=options,
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        return entry, fleet.fans[0]
+
+    return _setup
@@ -0,0 +1,339 @@
+"""Tests for the HTTP API client against the simulator."""
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+import pytest
+from aiohttp import web
+
+from custom_components.openfan_micro.api import STATUS_PATHS, OpenFanApi
+
+VARIANTS = ["new", "legacy", "plain", "wrapped", "multi"]
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+async def test_set_and_read_pwm(simulator, session, variant: str) -> None:
+    fleet = await simulator(variant=variant)
+    api = OpenFanApi(fleet.hosts[0], session)
+
+    await api.set_pwm(40)
+    rpm, pwm = await api.get_status()
+
+    assert fleet.fans[0].pwm == 40
+    assert pwm == 40
+    assert rpm >= 0
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+async def test_led_and_voltage(simulator, session, variant: str) -> None:
+    fleet = await simulator(variant=variant)
+    fan = fleet.fans[0]
+    api = OpenFanApi(fleet.hosts[0], session)
+
+    await api.led_set(False)
+    await api.set_voltage_12v(True)
+
+    assert fan.led is False
+    assert fan.is_12v is True
+    if variant != "legacy":  # legacy firmware has no /openfan/status
+        assert await api.get_openfan_status() == (False, True)
+        assert api.uptime is not None
+
+
+@pytest.mark.parametrize("variant", ["new", "wrapped", "multi"])
+async def test_probe_is_one_request(simulator, session, variant: str) -> None:
+    fleet = await simulator(variant=variant)
+    fan = fleet.fans[0]
+    api = OpenFanApi(fleet.hosts[0], session)
+
+    info = await api.probe()
+
+    assert fan.requests == 1
+    assert info["mac"] == fan.mac
+    assert (info["led"], info["is_12v"]) == (True, False)
+    assert info["fingerprint"]["openfan_status"] is True
+    assert api.has_openfan_status is True
+
+
+async def test_probe_legacy_firmware(simulator, session) -> None:
+    fleet = await simulator(variant="legacy")
+    api = OpenFanApi(fleet.hosts[0], session)
+
+    info = await api.probe()
+
+    # no /openfan/status: one extra request on the legacy fan status
+    assert fleet.fans[0].requests == 2
+    assert info["mac"] is None
+    assert info["fingerprint"] == {
+        "openfan_status": False,
+        "wrapped": False,
+        "status_path": STATUS_PATHS[1],
+    }
+    # the endpoint that answered is tried first from now on
+    await api.get_status()
+    assert fleet.fans[0].requests == 3
+    assert api.stats.legacy_fallbacks == 0
+
+
+async def test_probe_rejects_other_hosts(socket_enabled, session) -> None:
+    async def _any(request: web.Request) -> web.Response:
+        return web.json_response({"hello": "world"})
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", _any)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        with pytest.raises(RuntimeError):
+            await OpenFanApi(f"127.0.0.1:{port}", session).probe()
+    finally:
+        await runner.cleanup()
+
+
+async def test_fingerprint_round_trip(simulator, session) -> None:
+    fleet = await simulator(variant="legacy")
+    learned = OpenFanApi(fleet.hosts[0], session)
+    await learned.set_pwm(30)  # falls back to the legacy set endpoint
+    await learned.get_status()  # falls back to the legacy status endpoint
+    fingerprint = learned.fingerprint
+
+    fresh = OpenFanApi(fleet.hosts[0], session)
+    fresh.apply_fingerprint(fingerprint)
+    before = fleet.fans[0].requests
+    await fresh.set_pwm(40)
+    await fresh.get_status()
+
+    # seeded with the learned endpoints: no failed first attempts
+    assert fleet.fans[0].requests - before == 2
+    assert fresh.stats.legacy_fallbacks == 0
+    assert fresh.fingerprint == fingerprint
+
+
+def test_parse_channels_layouts() -> None:
+    api = OpenFanApi("h", None)
+    assert api._parse_channels({"rpm": 900, "pwm_percent": 30}) == {0: (900, 30)}
+    assert api._parse_channels({"status": "ok", "data": {"rpm": "950.4", "pwm": 31}}) == {
+        0: (950, 31)
+    }
+    assert api._parse_channels({"fans": [{"rpm": 1, "pwm": 2}, {"rpm": 3, "pwm": 4}]}) == {
+        0: (1, 2),
+        1: (3, 4),
+    }
+    assert api._parse_channels({"data": {"0": {"rpm": 5, "pwm": 6}, "2": {"rpm": 7, "pwm": 8}}}) == {
+        0: (5, 6),
+        2: (7, 8),
+    }
+    assert api.pwm_readback is True
+
+
+def test_parse_channels_rpm_only_uses_commanded_pwm() -> None:
+    api = OpenFanApi("h", None)
+    api._commanded = {1: 45}
+    # nothing commanded on channel 0 (e.g. after a restart): PWM unknown
+    assert api._parse_channels({"status": "ok", "data": {"0": 1200, "1": "800"}}) == {
+        0: (1200, None),
+        1: (800, 45),
+    }
+    assert api.pwm_readback is False
+
+
+async def test_rpm_only_reply_reads_unknown_pwm(simulator, session) -> None:
+    fleet = await simulator(variant="multi", channels=3)
+    fan = fleet.fans[0]
+    fan.pwms[:] = [60, 0, 35]  # set before this client started
+    api = OpenFanApi(fleet.hosts[0], session)
+
+    status = await api.get_status_all()
+
+    assert {ch: pwm for ch, (_, pwm) in status.items()} == {0: 60, 1: 0, 2: 35}
+    assert fan.requests == 1 + 3  # batched RPMs, then each channel's PWM
+    await api.set_pwm_many({0: 60, 1: 0, 2: 35})
+    before = fan.requests
+    await api.get_status_all()
+    assert fan.requests - before == 1
+
+
+async def test_failed_channel_read_is_isolated(simulator, session) -> None:
+    fleet = await simulator(variant="new", channels=3)
+    api = OpenFanApi(fleet.hosts[0], session)
+    api.set_channels(3)
+    await api.set_pwm_many({0: 10, 1: 20, 2: 30})
+    get_json = api._get_json
+
+    async def _flaky(path: str, *args, **kwargs):
+        if path == "/api/v0/fan/1/status":
+            raise TimeoutError(path)
+        return await get_json(path, *args, **kwargs)
+
+    api._get_json = _flaky
+    status = await api.get_status_all()
+
+    assert {ch: pwm for ch, (_, pwm) in status.items()} == {0: 10, 2: 30}
+
+
+async def test_multi_channel_read_is_one_request(simulator, session) -> None:
+    fleet = await simulator(variant="multi", channels=4)
+    fan = fleet.fans[0]
+    api = OpenFanApi(fleet.hosts[0], session)
+    await api.set_pwm_many({ch: 40 for ch in range(4)})
+    before = fan.requests
+
+    status = await api.get_status_all()
+
+    assert sorted(status) == [0, 1, 2, 3]
+    assert api.channels == 4  # auto-detected
+    assert fan.requests - before == 1
+
+
+async def test_fixed_channel_count_reads_missing_channels(simulator, session) -> None:
+    fleet = await simulator(variant="new", channels=3)
+    api = OpenFanApi(fleet.hosts[0], session)
+    api.set_channels(3)
+    await api.set_pwm_many({0: 10, 1: 20, 2: 30})
+
+    status = await api.get_status_all()
+
+    assert {ch: pwm for ch, (_, pwm) in status.items()} == {0: 10, 1: 20, 2: 30}
+
+
+async def test_set_pwm_many_batches_equal_values(simulator, session) -> None:
+    fleet = await simulator(variant="multi", channels=3)
+    fan = fleet.fans[0]
+    api = OpenFanApi(fleet.hosts[0], session)
+    await api.get_status_all()
+
+    before = fan.requests
+    await api.set_pwm_many({0: 40, 1: 40, 2: 40})
+    assert fan.requests - before == 1  # one all/set
+    assert fan.pwms == [40, 40, 40]
+
+    before = fan.requests
+    await api.set_pwm_many({0: 50, 2: 60})
+    assert fan.requests - before == 2
+    assert fan.pwms == [50, 40, 60]
+
+
+async def test_set_pwm_many_without_all_set(simulator, session) -> None:
+    fleet = await simulator(variant="new", channels=2)
+    fan = fleet.fans[0]
+    api = OpenFanApi(fleet.hosts[0], session)
+    api.set_channels(2)
+
+    await api.set_pwm_many({0: 35, 1: 35})
+    await api.set_pwm_many({0: 45, 1: 45})
+
+    assert fan.pwms == [45, 45]
+    # all/set rejected once, then not tried again
+    assert api._has_all_set is False
+    assert fan.writes == 4
+
+
+class _Fetch:
+    """Controllable fetch for `_shared_read`: counts calls, blocks until released."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.error: Optional[Exception] = None
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        call = self.calls
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return call
+
+
+async def test_concurrent_reads_share_one_request() -> None:
+    api = OpenFanApi("h", None)
+    fetch = _Fetch()
+    readers = [asyncio.create_task(api._shared_read("status", fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    fetch.release.set()
+    assert await asyncio.gather(*readers) == [1] * 5
+    assert fetch.calls == 1
+    assert api.stats.shared_reads == 4
+    assert not api._inflight
+
+
+async def test_read_after_write_is_not_shared() -> None:
+    api = OpenFanApi("h", None)
+    fetch = _Fetch()
+    before = asyncio.create_task(api._shared_read("status", fetch))
+    await asyncio.sleep(0)
+    api._wrote()
+    after = asyncio.create_task(api._shared_read("status", fetch))
+    await asyncio.sleep(0)
+    fetch.release.set()
+    # the read issued after the write got its own (later) request
+    assert (await before, await after) == (1, 2)
+    assert api.stats.shared_reads == 0
+
+
+async def test_ttl_cache() -> None:
+    api = OpenFanApi("h", None)
+    api._read_ttl = 60
+    fetch = _Fetch()
+    fetch.release.set()
+    assert await api._shared_read("status", fetch) == 1
+    assert await api._shared_read("status", fetch) == 1
+    assert api.stats.cached_reads == 1
+    api._wrote()  # a write invalidates the cache
+    assert await api._shared_read("status", fetch) == 2
+
+    api._read_ttl = 0
+    assert await api._shared_read("status", fetch) == 3
+    assert await api._shared_read("status", fetch) == 4
+
+
+async def test_failures_are_shared_but_not_cached() -> None:
+    api = OpenFanApi("h", None)
+    api._read_ttl = 60
+    fetch = _Fetch()
+    fetch.error = RuntimeError("HTTP 500")
+    readers = [asyncio.create_task(api._shared_read("status", fetch)) for _ in range(3)]
+    await asyncio.sleep(0)
+    fetch.release.set()
+    results = await asyncio.gather(*readers, return_exceptions=True)
+    assert all(isinstance(res, RuntimeError) for res in results)
+    assert fetch.calls == 1
+
+    fetch.error = None
+    assert await api._shared_read("status", fetch) == 2
+
+
+async def test_cancelled_reader_does_not_cancel_the_others() -> None:
+    api = OpenFanApi("h", None)
+    fetch = _Fetch()
+    first = asyncio.create_task(api._shared_read("status", fetch))
+    second = asyncio.create_task(api._shared_read("status", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    fetch.release.set()
+    assert await second == 1
+    assert first.cancelled()
+
+
+async def test_concurrent_status_reads_against_device(simulator, session) -> None:
+    fleet = await simulator(latency=0.02)
+    api = OpenFanApi(fleet.hosts[0], session)
+    results = await asyncio.gather(*(api.get_status_all() for _ in range(8)))
+    assert fleet.fans[0].requests == 1
+    # every caller gets its own dict
+    assert len({id(res) for res in results}) == 8
+
+
+async def test_read_status_all_is_never_shared(simulator, session) -> None:
+    fleet = await simulator(latency=0.02)
+    api = OpenFanApi(fleet.hosts[0], session)
+    api._read_ttl = 60
+    await asyncio.gather(*(api.read_status_all() for _ in range(4)))
+    await api.read_status_all()
+    assert fleet.fans[0].requests == 5
+    assert api.stats.shared_reads == api.stats.cached_reads == 0
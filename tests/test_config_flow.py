@@ -0,0 +1,54 @@
+"""Tests for the config flow."""
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.openfan_micro.const import DOMAIN
+
+
+async def _manual(hass: HomeAssistant, user_input: dict) -> dict:
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    assert result["type"] is FlowResultType.MENU
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": "manual"}
+    )
+    with patch("custom_components.openfan_micro.async_setup_entry", return_value=True):
+        return await hass.config_entries.flow.async_configure(result["flow_id"], user_input)
+
+
+async def test_manual_entry_stores_probe_result(
+    hass: HomeAssistant, enable_custom_integrations, simulator
+) -> None:
+    hass.config.components.add("http")
+    fleet = await simulator(variant="wrapped")
+    host = fleet.hosts[0]
+
+    result = await _manual(hass, {"host": host, "name": "Rack"})
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["title"] == "Rack"
+    assert result["data"]["host"] == host
+    assert result["data"]["mac"] == fleet.fans[0].mac
+    assert result["data"]["fingerprint"]["openfan_status"] is True
+    # validation is the probe only, not a full poll
+    assert fleet.fans[0].requests == 1
+
+
+async def test_manual_entry_cannot_connect(
+    hass: HomeAssistant, enable_custom_integrations, simulator
+) -> None:
+    hass.config.components.add("http")
+    fleet = await simulator()
+    host = fleet.hosts[0]
+    await fleet.stop()
+
+    result = await _manual(hass, {"host": host})
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "cannot_connect"}
@@ -0,0 +1,84 @@
+"""Tests for the temperature controller's sample window."""
+from __future__ import annotations
+
+import random
+import statistics
+
+import pytest
+
+from custom_components.openfan_micro.controller import SampleWindow
+
+
+def _reference(samples: list[tuple[float, float]]) -> tuple[float, float]:
+    ts, vals = zip(*samples)
+    return statistics.fmean(vals), statistics.linear_regression(ts, vals).slope
+
+
+def test_empty_and_single_sample() -> None:
+    win = SampleWindow()
+    assert (win.mean(), win.slope(), win.project(10.0)) == (None, None, None)
+    win.append(5.0, 40.0)
+    assert (win.mean(), win.slope(), win.span()) == (40.0, None, 0.0)
+    assert win.project(100.0) == 40.0
+
+
+def test_mean_and_slope_match_least_squares() -> None:
+    rng = random.Random(1)
+    win = SampleWindow()
+    samples = [(t * 2.0, 40.0 + 0.05 * t * 2.0 + rng.uniform(-0.3, 0.3)) for t in range(60)]
+    for ts, val in samples:
+        win.append(ts, val)
+    mean, slope = _reference(samples)
+    assert win.mean() == pytest.approx(mean)
+    assert win.slope() == pytest.approx(slope)
+
+
+def test_maxlen_evicts_oldest_from_the_sums() -> None:
+    win = SampleWindow(maxlen=10)
+    samples = [(float(t), float(t % 7)) for t in range(25)]
+    for ts, val in samples:
+        win.append(ts, val)
+    assert len(win) == 10
+    mean, slope = _reference(samples[-10:])
+    assert win.mean() == pytest.approx(mean)
+    assert win.slope() == pytest.approx(slope)
+
+
+def test_prune_and_rebase_keep_slope_accurate() -> None:
+    # long uptime: monotonic timestamps far from zero, window slides for hours
+    win = SampleWindow()
+    start = 1_000_000.0
+    samples = []
+    for i in range(4000):
+        ts = start + i * 5.0
+        val = 30.0 + 0.01 * (i % 200) * 5.0
+        win.append(ts, val)
+        samples.append((ts, val))
+        win.prune(ts - 300.0)
+    kept = [s for s in samples if s[0] >= samples[-1][0] - 300.0]
+    assert len(win) == len(kept)
+    # rebased: times are relative to a recent origin
+    assert samples[-1][0] - win._t0 <= SampleWindow.REBASE_S + 300.0
+    mean, slope = _reference(kept)
+    assert win.mean() == pytest.approx(mean)
+    assert win.slope() == pytest.approx(slope, rel=1e-6)
+
+
+def test_prune_everything_resets() -> None:
+    win = SampleWindow()
+    win.append(1.0, 10.0)
+    win.append(2.0, 20.0)
+    win.prune(3.0)
+    assert len(win) == 0
+    assert win.mean() is None
+    win.append(4.0, 30.0)
+    assert win.mean() == 30.0
+
+
+def test_project() -> None:
+    win = SampleWindow()
+    for t in range(0, 31, 5):
+        win.append(float(t), 40.0 + 0.1 * t)  # exact line, mean at t=15
+    assert win.project(45.0) == pytest.approx(44.5)
+    # span shorter than required: the mean, no extrapolation
+    assert win.project(45.0, min_span=60.0) == pytest.approx(41.5)
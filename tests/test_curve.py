@@ -0,0 +1,42 @@
+"""Tests for curve parsing and evaluation."""
+from __future__ import annotations
+
+from custom_components.openfan_micro.curve import CompiledCurve, parse_curve
+
+
+def test_parse_curve() -> None:
+    assert parse_curve("65=55, 45=25 ,70=100") == [(45.0, 25), (65.0, 55), (70.0, 100)]
+    # bad parts are skipped, values clamped
+    assert parse_curve("40=x, junk, 50=-5, 60=150, =3, 30.5=20") == [
+        (30.5, 20),
+        (50.0, 0),
+        (60.0, 100),
+    ]
+    assert parse_curve("") == []
+    assert parse_curve(None) == []
+    assert parse_curve("40=600, 70=25000", hi=20000) == [(40.0, 600), (70.0, 20000)]
+
+
+def test_compiled_curve_evaluation() -> None:
+    curve = CompiledCurve("45=25, 65=55, 70=100")
+    assert bool(curve) and len(curve) == 3
+    assert curve(20) == 25  # below the first point: first value
+    assert curve(90) == 100  # above the last point: last value
+    assert curve(45) == 25
+    assert curve(55) == 40
+    assert curve(67.5) == 78  # 77.5 rounds half to even
+    assert curve(68) == 82
+
+
+def test_compiled_curve_step() -> None:
+    # a repeated temperature is a step: the higher value at the step itself
+    curve = CompiledCurve("40=20, 50=30, 50=80, 60=100")
+    assert curve(49.9) == 30
+    assert curve(50) == 80
+    assert curve(55) == 90
+
+
+def test_empty_curve_is_false() -> None:
+    curve = CompiledCurve("nonsense")
+    assert not curve
+    assert curve.text == "nonsense"
@@ -0,0 +1,112 @@
+"""Tests for the offline curve tuner: the vectorized replay must match the controller."""
+from __future__ import annotations
+
+from collections import deque
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from custom_components.openfan_micro.curve import CompiledCurve  # noqa: E402
+from custom_components.openfan_micro.output import OutputStage  # noqa: E402
+from tools import curve_tuner  # noqa: E402
+
+
+def _scenario(args, hours: float = 2.0, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    steps = int(hours * 3600 / args.step)
+    t = np.arange(steps) * args.step
+    temp = 45 + 8 * np.sin(t / 1500.0) + rng.normal(0, 0.6, steps)
+    temp[steps // 2 : steps // 2 + 12] += 12  # hot spike
+    pwm_rec = np.clip(temp - 15, 0, 100)
+    return curve_tuner.Scenario(temp, pwm_rec, curve_tuner.airflow_table(None, None, None), args)
+
+
+def _replay(sc, curve_txt: str, args) -> dict[str, float]:
+    """Scalar replay with the integration's own curve and output stage."""
+    curve = CompiledCurve(curve_txt)
+    stage = OutputStage(
+        up_deadband=args.up_deadband,
+        down_deadband=args.deadband,
+        up_interval=args.up_min_interval,
+        down_interval=args.min_interval,
+        slew_pct_s=args.slew,
+    )
+    win = max(1, int(round(max(5, args.integrate) / sc.step)))
+    alpha = min(1.0, sc.step / sc.tau)
+    window: deque[float] = deque(maxlen=win)
+    temp, pwm, writes, pwm_time = sc.temp0, 0, 0, 0.0
+    for j, load in enumerate(sc.load):
+        now = j * sc.step
+        window.append(temp)
+        target = curve(sum(window) / len(window))
+        target = 0 if target == 0 else max(args.min_pwm, target)
+        value, _ = stage.step(target, now, args.min_pwm)
+        if value is not None:
+            stage.commit(value, now)
+            pwm = value
+            writes += 1
+        temp += alpha * (sc.ambient + load / sc.flow[int(pwm)] - temp)
+        pwm_time += pwm
+    return {"writes": writes, "fan_pct_hours": pwm_time * sc.step / 3600.0}
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        [],
+        ["--up-deadband", "1", "--up-min-interval", "2"],
+        ["--slew", "0.5", "--min-pwm", "30"],
+        ["--slew", "0.2", "--deadband", "1", "--min-interval", "5"],
+    ],
+)
+def test_simulate_matches_controller(options: list[str]) -> None:
+    args = curve_tuner.build_parser().parse_args(["history.csv", *options])
+    sc = _scenario(args)
+    curves = ["40=0, 45=25, 55=60, 65=100", "35=20, 50=40, 60=40, 70=100", "45=0, 60=100"]
+    for txt in curves:
+        compiled = CompiledCurve(txt)
+        res = curve_tuner.simulate(
+            sc,
+            np.array(compiled.temps, dtype=float),
+            np.array([compiled.values], dtype=float),
+            args,
+        )
+        ref = _replay(sc, txt, args)
+        assert res["writes"][0] == ref["writes"], txt
+        assert res["fan_pct_hours"][0] == pytest.approx(ref["fan_pct_hours"]), txt
+
+
+def test_simulate_is_vectorized_over_candidates() -> None:
+    args = curve_tuner.build_parser().parse_args(["history.csv", "--slew", "1"])
+    sc = _scenario(args, hours=1.0)
+    bp = np.array([40.0, 50.0, 60.0, 70.0])
+    vals = np.array([[20, 30, 60, 100], [20, 20, 40, 80], [25, 50, 75, 100]], dtype=float)
+    batch = curve_tuner.simulate(sc, bp, vals, args)
+    for i in range(len(vals)):
+        single = curve_tuner.simulate(sc, bp, vals[i : i + 1], args)
+        for key in ("cost", "writes", "fan_pct_hours", "hours_above_limit"):
+            assert batch[key][i] == pytest.approx(single[key][0])
+
+
+def test_search_beats_or_matches_its_start() -> None:
+    args = curve_tuner.build_parser().parse_args(
+        ["history.csv", "--candidates", "200", "--rounds", "2", "--keep", "8"]
+    )
+    sc = _scenario(args, hours=1.0)
+    bp = np.linspace(40, args.limit, 4)
+    best_vals, stats = curve_tuner.search(sc, bp, args)
+    assert list(best_vals) == sorted(best_vals)  # non-decreasing
+    assert best_vals.min() >= args.min_pwm
+    assert stats["candidates_evaluated"] == 600
+    flat = curve_tuner.simulate(sc, bp, np.full((1, 4), 100.0), args)
+    assert stats["cost"] <= flat["cost"][0]
+
+
+def test_main_reads_wide_history(tmp_path, capsys) -> None:
+    rows = ["time,temperature"] + [f"{i * 15},{45 + (i % 40) * 0.5}" for i in range(400)]
+    path = tmp_path / "history.csv"
+    path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    assert curve_tuner.main([str(path), "--candidates", "50", "--rounds", "1", "--json"]) == 0
+    out = capsys.readouterr().out
+    assert '"recommended_curve"' in out
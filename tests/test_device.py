@@ -0,0 +1,78 @@
+"""Tests for the device wrapper's channel helpers and multi-channel entities."""
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.openfan_micro._device import OpenFanDevice
+from custom_components.openfan_micro.const import DOMAIN
+
+
+def _device(hass: HomeAssistant, host: str, channels: int) -> OpenFanDevice:
+    dev = OpenFanDevice(hass, host, session=object())
+    dev.api.set_channels(channels)
+    return dev
+
+
+async def test_fan_unique_ids(hass: HomeAssistant) -> None:
+    dev = _device(hass, "10.0.0.5", 3)
+    assert dev.fan_unique_id(0) == "openfan_micro_fan_10.0.0.5"
+    assert dev.fan_unique_id(2) == "openfan_micro_fan_10.0.0.5_ch2"
+    assert [dev.channel_of(dev.fan_unique_id(ch)) for ch in range(3)] == [0, 1, 2]
+
+
+async def test_channel_of_is_exact(hass: HomeAssistant) -> None:
+    # a host name that itself looks like a channel suffix
+    dev = _device(hass, "rack_ch3", 1)
+    assert dev.channel_of("openfan_micro_fan_rack_ch3") == 0
+    assert dev.channel_of("openfan_micro_fan_rack") is None
+    assert dev.channel_of("openfan_micro_fan_rack_ch3_ch1") is None  # channel out of range
+    assert dev.channel_of(None) is None
+
+    other = _device(hass, "rack", 4)
+    assert other.channel_of("openfan_micro_fan_rack_ch3") == 3
+    assert other.channel_of("openfan_micro_fan_rack_ch3_ch1") is None
+
+
+async def test_multi_channel_entities(hass: HomeAssistant, setup_device) -> None:
+    entry, _ = await setup_device({"variant": "multi", "channels": 3})
+    registry = er.async_get(hass)
+    fans = [
+        ent.unique_id
+        for ent in er.async_entries_for_config_entry(registry, entry.entry_id)
+        if ent.domain == "fan"
+    ]
+    dev = entry.runtime_data
+    assert sorted(fans) == sorted(dev.fan_unique_id(ch) for ch in range(3))
+    # PWM unknown at startup (RPM-only replies): read once per channel
+    assert [dev.channel_status(ch).pwm for ch in range(3)] == [0, 0, 0]
+    assert dev.api.stats.endpoint("/api/v0/fan/2/status").requests == 1
+    # once commanded: one batched status request per poll, no per-channel reads
+    await dev.api.set_pwm_many({0: 30, 1: 40, 2: 50})
+    before = dev.api.stats.requests
+    await dev.coordinator.async_refresh()
+    assert [dev.channel_status(ch).pwm for ch in range(3)] == [30, 40, 50]
+    assert dev.api.stats.requests - before == 2  # fan/status + openfan/status
+
+
+async def test_failed_channel_is_unavailable_alone(hass: HomeAssistant, setup_device) -> None:
+    entry, _ = await setup_device({"channels": 3}, channels=3)
+    dev = entry.runtime_data
+    await dev.api.set_pwm_many({0: 30, 1: 40, 2: 50})
+    registry = er.async_get(hass)
+    fans = [
+        registry.async_get_entity_id("fan", DOMAIN, dev.fan_unique_id(ch)) for ch in range(3)
+    ]
+    get_json = dev.api._get_json
+
+    async def _flaky(path: str, *args, **kwargs):
+        if path == "/api/v0/fan/1/status":
+            raise TimeoutError(path)
+        return await get_json(path, *args, **kwargs)
+
+    dev.api._get_json = _flaky
+    await dev.coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert dev.coordinator.last_update_success
+    assert [hass.states.get(fan).state for fan in fans] == ["on", "unavailable", "on"]
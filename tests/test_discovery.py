@@ -0,0 +1,57 @@
+"""Tests for the subnet scan."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.openfan_micro import discovery
+from custom_components.openfan_micro.discovery import (
+    InvalidSubnet,
+    SubnetTooLarge,
+    async_scan_subnet,
+    subnet_hosts,
+)
+
+
+def test_subnet_hosts() -> None:
+    assert subnet_hosts("192.168.1.0/30") == ["192.168.1.1", "192.168.1.2"]
+    assert subnet_hosts(" 10.0.0.7/32 ") == ["10.0.0.7"]
+    # host bits set: the network is taken, not rejected
+    assert len(subnet_hosts("10.1.2.3/24")) == 254
+    assert len(subnet_hosts("10.0.0.0/22")) == discovery.SCAN_MAX_HOSTS - 2
+
+
+@pytest.mark.parametrize("cidr", ["", "10.0.0.0/33", "fan.local", "fd00::/120"])
+def test_subnet_hosts_invalid(cidr: str) -> None:
+    with pytest.raises(InvalidSubnet):
+        subnet_hosts(cidr)
+
+
+def test_subnet_hosts_too_large() -> None:
+    with pytest.raises(SubnetTooLarge):
+        subnet_hosts("10.0.0.0/21")
+
+
+async def test_scan_is_bounded_and_skips_excluded(monkeypatch) -> None:
+    in_flight = peak = 0
+    probed: list[str] = []
+
+    async def _probe(session, host: str, timeout: float):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        probed.append(host)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return {"host": host, "mac": None} if host.endswith((".3", ".9")) else None
+
+    monkeypatch.setattr(discovery, "_probe_host", _probe)
+    found = await async_scan_subnet(
+        None, "10.0.0.0/28", exclude=["10.0.0.9", "10.0.0.1"], concurrency=4
+    )
+
+    assert found == [{"host": "10.0.0.3", "mac": None}]
+    assert len(probed) == 12
+    assert "10.0.0.9" not in probed
+    assert peak == 4
@@ -0,0 +1,148 @@
+"""Tests for fan groups."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.openfan_micro.const import DOMAIN
+from custom_components.openfan_micro.group import GroupMember
+
+
+def _member(min_pwm: int) -> GroupMember:
+    return GroupMember("fan.x", None, 0, SimpleNamespace(options={"min_pwm": min_pwm}))
+
+
+def test_member_target() -> None:
+    member = _member(25)
+    assert member.target(0) == 0
+    assert member.target(10) == 25  # below min PWM: raised, not stalled
+    assert member.target(60) == 60
+    assert member.target(150) == 100
+    assert member.target(None) == 25  # turn on without a speed
+    assert _member(0).target(None) == 1
+
+
+def _fan_entity(hass: HomeAssistant, entry) -> str:
+    registry = er.async_get(hass)
+    return next(
+        ent.entity_id
+        for ent in er.async_entries_for_config_entry(registry, entry.entry_id)
+        if ent.domain == "fan"
+    )
+
+
+async def _group(hass: HomeAssistant, members: list[str], **options) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Rack",
+        unique_id="group_rack",
+        data={"name": "Rack", "members": members},
+        options=options,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def test_group_writes_all_members(hass: HomeAssistant, setup_device) -> None:
+    first, fan_a = await setup_device(min_pwm=30)
+    second, fan_b = await setup_device()
+    members = [_fan_entity(hass, first), _fan_entity(hass, second), "fan.not_there"]
+    group = await _group(hass, members)
+
+    await hass.services.async_call(
+        "fan", "set_percentage", {"entity_id": "fan.rack", "percentage": 20}, blocking=True
+    )
+
+    # per-member min PWM; the unresolvable member is skipped
+    assert (fan_a.pwm, fan_b.pwm) == (30, 20)
+    agg = group.runtime_data.aggregate()
+    assert agg["available_members"] == 2
+    assert agg["pwm"] == 25
+    assert hass.states.get("fan.rack").state == "on"
+
+    await hass.services.async_call("fan", "turn_off", {"entity_id": "fan.rack"}, blocking=True)
+    assert (fan_a.pwm, fan_b.pwm) == (0, 0)
+
+
+async def test_group_skips_unloaded_members(hass: HomeAssistant, setup_device) -> None:
+    first, _ = await setup_device()
+    second, fan_b = await setup_device()
+    group = await _group(hass, [_fan_entity(hass, first), _fan_entity(hass, second)])
+
+    assert await hass.config_entries.async_unload(first.entry_id)
+    await group.runtime_data.async_set_percentage(50)
+
+    assert fan_b.pwm == 50
+    assert [m.entity_id for m in group.runtime_data.members()] == [_fan_entity(hass, second)]
+
+
+async def test_zone_drives_calibrated_members(hass: HomeAssistant, setup_device) -> None:
+    calibrated = {"min_pwm_calibrated": True}
+    first, fan_a = await setup_device(min_pwm=30, **calibrated)
+    second, fan_b = await setup_device(min_pwm=10, **calibrated)
+    third, fan_c = await setup_device(min_pwm=10)  # not calibrated: left alone
+    hass.states.async_set("sensor.zone", "45")
+
+    group = await _group(
+        hass,
+        [_fan_entity(hass, first), _fan_entity(hass, second), _fan_entity(hass, third)],
+        temp_entity="sensor.zone",
+        temp_curve="40=10, 60=50",
+    )
+    await hass.async_block_till_done()
+
+    # 45 °C -> 20 %, clamped per member
+    assert (fan_a.pwm, fan_b.pwm, fan_c.pwm) == (30, 20, 0)
+    state = group.runtime_data.ctrl_state
+    assert state["members_driven"] == 2
+    assert state["last_applied_pwm"] == 20
+    # one controller for the zone, none on the members
+    assert group.runtime_data.controller is not None
+    assert not first.runtime_data.controller.temp_entity
+
+    # removing the temperature entity ends zone control
+    hass.config_entries.async_update_entry(group, options={})
+    await hass.async_block_till_done()
+    assert group.runtime_data.controller is None
+
+
+async def test_zone_members_arm_no_ticks(hass: HomeAssistant, setup_device) -> None:
+    def _armed() -> list[bool]:
+        return [e.runtime_data.controller._unsub_tick is not None for e in entries]
+
+    own = {"temp_entity": "sensor.rack", "temp_curve": "40=20, 60=80"}
+    entries = [(await setup_device(**own))[0] for _ in range(4)]
+    idle, _ = await setup_device()  # no temperature entity: nothing to evaluate
+    assert _armed() == [True] * 4
+    assert idle.runtime_data.controller._unsub_tick is None
+
+    group = await _group(
+        hass,
+        [_fan_entity(hass, entry) for entry in entries],
+        temp_entity="sensor.zone",
+        temp_curve="40=10, 60=50",
+    )
+    # one timer for the zone, none on its members
+    assert _armed() == [False] * 4
+    assert group.runtime_data.controller._unsub_tick is not None
+
+    # a member reloaded while the zone runs stays quiet
+    assert await hass.config_entries.async_reload(entries[0].entry_id)
+    await hass.async_block_till_done()
+    assert _armed() == [False] * 4
+
+    # a member leaving the zone ticks on its own again
+    members = [_fan_entity(hass, entry) for entry in entries[1:]]
+    hass.config_entries.async_update_entry(
+        group, options={"members": members, "temp_entity": "sensor.zone"}
+    )
+    await hass.async_block_till_done()
+    assert _armed() == [True, False, False, False]
+
+    assert await hass.config_entries.async_unload(group.entry_id)
+    assert _armed() == [True] * 4
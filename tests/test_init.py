@@ -0,0 +1,105 @@
+"""Tests for entry setup, in-place option changes and unload."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+
+from custom_components.openfan_micro.const import DOMAIN
+
+TEMP_OPTIONS = {
+    "min_pwm": 20,
+    "min_pwm_calibrated": True,
+    "temp_entity": "sensor.cpu",
+    "temp_curve": "40=20, 60=80",
+}
+
+
+async def test_options_apply_in_place(hass: HomeAssistant, setup_device) -> None:
+    entry, fan = await setup_device()
+    dev = entry.runtime_data
+    controller = dev.controller
+    hass.states.async_set("sensor.cpu", "50")
+
+    hass.config_entries.async_update_entry(entry, options={"poll_interval": 20, **TEMP_OPTIONS})
+    await hass.async_block_till_done()
+
+    # no reload: same runtime objects, new settings
+    assert entry.state is ConfigEntryState.LOADED
+    assert entry.runtime_data is dev
+    assert dev.controller is controller
+    assert dev.coordinator.update_interval == timedelta(seconds=20)
+    assert dev.api._min_pwm == 20
+    assert controller.temp_entity == "sensor.cpu"
+    # the controller re-evaluated with the new curve: 50 °C -> 50 %
+    assert fan.pwm == 50
+    assert dev.ctrl_state["last_applied_pwm"] == 50
+
+
+async def test_poll_interval_change(hass: HomeAssistant, setup_device) -> None:
+    entry, fan = await setup_device(poll_interval=30)
+    coord = entry.runtime_data.coordinator
+
+    before = fan.requests
+    coord.set_poll_interval(60)
+    await hass.async_block_till_done()
+    assert coord.update_interval == timedelta(seconds=60)
+    assert fan.requests == before  # longer: takes effect with the next refresh
+
+    coord.set_poll_interval(2)
+    await hass.async_block_till_done()
+    assert coord.update_interval == timedelta(seconds=2)
+    assert fan.requests > before  # shorter: polled right away
+
+
+async def test_temp_entity_change_rebinds_listener(hass: HomeAssistant, setup_device) -> None:
+    entry, fan = await setup_device(**TEMP_OPTIONS)
+    controller = entry.runtime_data.controller
+    hass.states.async_set("sensor.cpu", "50")
+    await hass.async_block_till_done()
+    assert [val for _, val in controller.temp_buf] == [50]
+
+    hass.config_entries.async_update_entry(
+        entry, options={**TEMP_OPTIONS, "temp_entity": "sensor.gpu"}
+    )
+    await hass.async_block_till_done()
+    # samples of the old sensor are dropped; its changes are no longer seen
+    hass.states.async_set("sensor.cpu", "70")
+    await hass.async_block_till_done()
+    assert controller.temp_entity == "sensor.gpu"
+    assert 70 not in [val for _, val in controller.temp_buf]
+
+
+async def test_services_removed_with_last_entry(hass: HomeAssistant, setup_device) -> None:
+    first, _ = await setup_device()
+    second, _ = await setup_device()
+    assert hass.services.has_service(DOMAIN, "set_temp_control")
+
+    assert await hass.config_entries.async_unload(first.entry_id)
+    # still needed by the other entry
+    assert hass.services.has_service(DOMAIN, "set_temp_control")
+
+    dev = second.runtime_data
+    assert await hass.config_entries.async_unload(second.entry_id)
+    assert not hass.services.async_services().get(DOMAIN)
+    assert dev.controller is None
+    assert dev.rpm_control is None
+    assert not dev.coordinator._listeners
+
+
+async def test_reload_does_not_leak_listeners(hass: HomeAssistant, setup_device) -> None:
+    entry, _ = await setup_device(**TEMP_OPTIONS)
+    hass.states.async_set("sensor.cpu", "50")
+    await hass.async_block_till_done()
+
+    def _counts() -> tuple[int, int]:
+        listeners = hass.bus.async_listeners()
+        return sum(listeners.values()), len(hass.services.async_services().get(DOMAIN, {}))
+
+    before = _counts()
+    for cycle in range(5):
+        assert await hass.config_entries.async_reload(entry.entry_id)
+        hass.states.async_set("sensor.cpu", str(51 + cycle))
+        await hass.async_block_till_done()
+    assert _counts() == before
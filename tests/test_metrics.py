@@ -0,0 +1,103 @@
+"""Tests for the fixed-size performance counters."""
+from __future__ import annotations
+
+from custom_components.openfan_micro.metrics import (
+    _BUCKET_BOUNDS,
+    OUTCOME_APPLIED,
+    OUTCOME_DEADBAND,
+    ApiStats,
+    DecisionTrace,
+    LatencyHistogram,
+)
+
+
+def test_histogram_empty() -> None:
+    hist = LatencyHistogram()
+    assert hist.percentile(0.5) is None
+    assert hist.as_dict() == {
+        "count": 0,
+        "mean_ms": None,
+        "p50_ms": None,
+        "p95_ms": None,
+        "p99_ms": None,
+        "max_ms": None,
+    }
+
+
+def test_histogram_percentiles_are_bucket_bounds() -> None:
+    hist = LatencyHistogram()
+    for _ in range(90):
+        hist.record(0.010)
+    for _ in range(10):
+        hist.record(0.500)
+    p50 = hist.percentile(0.5)
+    p99 = hist.percentile(0.99)
+    # upper bound of the covering bucket: within one bucket (factor 1.25) of the sample
+    assert 0.010 <= p50 < 0.010 * 1.25
+    assert p99 == 0.5  # capped at the observed max
+    assert hist.count == 100
+    assert round(hist.total, 6) == 5.9
+    assert hist.as_dict()["max_ms"] == 500.0
+
+
+def test_histogram_overflow_bucket_reports_max() -> None:
+    hist = LatencyHistogram()
+    hist.record(_BUCKET_BOUNDS[-1] * 3)
+    assert hist.percentile(0.5) == _BUCKET_BOUNDS[-1] * 3
+
+
+def test_histogram_size_is_fixed() -> None:
+    hist = LatencyHistogram()
+    for i in range(10_000):
+        hist.record(i / 1000.0)
+    assert len(hist._counts) == len(_BUCKET_BOUNDS) + 1
+    assert hist.count == 10_000
+
+
+def test_histogram_merge() -> None:
+    a, b = LatencyHistogram(), LatencyHistogram()
+    a.record(0.001)
+    b.record(0.002)
+    b.record(0.300)
+    a.merge(b)
+    assert a.count == 3
+    assert a.max == 0.300
+    assert sum(a._counts) == 3
+
+
+def test_api_stats_per_endpoint() -> None:
+    stats = ApiStats()
+    stats.endpoint("/api/v0/fan/status").requests += 2
+    stats.endpoint("/api/v0/fan/0/set?value=50").requests += 1
+    stats.endpoint("/api/v0/fan/0/set?value=60").requests += 1
+    stats.endpoint("/api/v0/fan/status").timeouts += 1
+    stats.endpoint("/api/v0/fan/status").latency.record(0.02)
+    stats.endpoint("/api/v0/fan/0/set").latency.record(0.04)
+
+    # query strings are not part of the endpoint key
+    assert sorted(stats.endpoints) == ["/api/v0/fan/0/set", "/api/v0/fan/status"]
+    assert stats.requests == 4
+    assert stats.timeouts == 1
+    assert stats.latency().count == 2
+    d = stats.as_dict()
+    assert d["endpoints"]["/api/v0/fan/0/set"]["requests"] == 2
+    assert d["endpoints"]["/api/v0/fan/status"]["latency"]["count"] == 1
+
+
+def test_decision_trace_is_bounded() -> None:
+    trace = DecisionTrace(maxlen=3)
+    for i in range(5):
+        trace.record(float(i), "temp", 40.0 + i, 30 + i, OUTCOME_DEADBAND)
+    assert len(trace) == 3
+    # oldest dropped first
+    assert [rec["ts"] for rec in trace.as_list()] == [2.0, 3.0, 4.0]
+
+
+def test_decision_record_as_dict() -> None:
+    trace = DecisionTrace()
+    trace.record(12.5, "interval", 41.23456, 55, OUTCOME_APPLIED)
+    trace.record(13.0, "gate", None, None, "gated")
+    assert trace.as_list() == [
+        {"ts": 12.5, "trigger": "interval", "temp": 41.23, "target": 55, "outcome": "applied"},
+        {"ts": 13.0, "trigger": "gate", "temp": None, "target": None, "outcome": "gated"},
+    ]
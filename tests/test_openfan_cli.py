@@ -0,0 +1,60 @@
+"""Tests for the standalone command-line tool."""
+from __future__ import annotations
+
+import argparse
+
+from tools import openfan_cli
+
+
+def test_read_hosts_merges_file_and_args(tmp_path) -> None:
+    hosts_file = tmp_path / "rack1.txt"
+    hosts_file.write_text("# rack 1\n10.0.0.21\n\n10.0.0.22  # top\n10.0.0.21\n", encoding="utf-8")
+    args = argparse.Namespace(hosts=["10.0.0.20", "10.0.0.22"], file=str(hosts_file))
+    # comments and blanks dropped, duplicates removed, first occurrence wins
+    assert openfan_cli._read_hosts(args) == ["10.0.0.20", "10.0.0.22", "10.0.0.21"]
+
+
+def test_parser_set_options() -> None:
+    args = openfan_cli.build_parser().parse_args(["set", "h1", "--led", "off", "--voltage", "12"])
+    assert (args.command, args.hosts, args.led, args.voltage, args.pwm) == (
+        "set",
+        ["h1"],
+        False,
+        12,
+        None,
+    )
+
+
+async def test_bulk_set_and_status(simulator) -> None:
+    fleet = await simulator(3)
+    rows = await openfan_cli._run_bounded(
+        fleet.hosts, 2, openfan_cli._bulk_set(pwm=35, led=False, volts=12)
+    )
+    assert [row["ok"] for row in rows] == [True, True, True]
+    assert all((fan.pwm, fan.led, fan.is_12v) == (35, False, True) for fan in fleet.fans)
+
+    rows = await openfan_cli._run_bounded(fleet.hosts, 8, openfan_cli._status)
+    assert [row["host"] for row in rows] == fleet.hosts
+    assert all((row["pwm"], row["led"], row["is_12v"]) == (35, False, True) for row in rows)
+
+
+async def test_unreachable_host_is_a_failed_row(simulator) -> None:
+    fleet = await simulator(1)
+    port = fleet.hosts[0].rsplit(":", 1)[1]
+    await fleet.stop()
+    rows = await openfan_cli._run_bounded([f"127.0.0.1:{port}"], 1, openfan_cli._status)
+    assert rows[0]["ok"] is False
+    assert rows[0]["error"]
+
+
+async def test_bench_counts_requests(simulator) -> None:
+    fleet = await simulator(1, latency=0.005)
+    rows = await openfan_cli._run_bounded(fleet.hosts, 1, openfan_cli._bench(20, 4))
+    row = rows[0]
+    assert row["ok"] is True
+    assert row["requests"] == 20
+    assert row["errors"] == 0
+    assert row["p50_ms"] is not None
+    # parallel reads are not merged by the client's read sharing
+    assert row["http_requests"] == 20
+    assert fleet.fans[0].requests == 20
@@ -0,0 +1,112 @@
+"""Tests for the PWM output stage."""
+from __future__ import annotations
+
+from custom_components.openfan_micro.metrics import (
+    OUTCOME_APPLIED,
+    OUTCOME_BUDGET,
+    OUTCOME_DEADBAND,
+    OUTCOME_MIN_INTERVAL,
+)
+from custom_components.openfan_micro.output import OutputStage
+
+
+def _written(stage: OutputStage, target: int, now: float, floor: int = 0):
+    value, outcome = stage.step(target, now, floor)
+    if value is not None:
+        stage.commit(value, now)
+    return value, outcome
+
+
+def test_first_step_writes_target() -> None:
+    stage = OutputStage()
+    assert stage.step(40, 0.0) == (40, OUTCOME_APPLIED)
+    # not recorded until committed
+    assert stage.last is None
+
+
+def test_deadband_and_min_interval() -> None:
+    stage = OutputStage(down_deadband=3, down_interval=10)
+    _written(stage, 40, 0.0)
+    assert stage.step(42, 100.0) == (None, OUTCOME_DEADBAND)
+    assert stage.step(40, 100.0) == (None, OUTCOME_DEADBAND)
+    assert stage.step(50, 5.0) == (None, OUTCOME_MIN_INTERVAL)
+    assert stage.step(50, 10.0) == (50, OUTCOME_APPLIED)
+
+
+def test_up_defaults_to_the_down_settings() -> None:
+    stage = OutputStage(down_deadband=5, down_interval=30)
+    assert (stage.up_deadband, stage.up_interval) == (5, 30)
+
+    stage.configure({"temp_deadband_pct": 4, "temp_update_min_interval": 20})
+    assert (stage.up_deadband, stage.up_interval) == (4, 20)
+    stage.configure(
+        {
+            "temp_deadband_pct": 4,
+            "temp_update_min_interval": 20,
+            "temp_up_deadband_pct": None,
+            "temp_up_min_interval": None,
+        }
+    )
+    assert (stage.up_deadband, stage.up_interval) == (4, 20)
+
+
+def test_asymmetric_hysteresis() -> None:
+    stage = OutputStage.from_options(
+        {
+            "temp_deadband_pct": 5,
+            "temp_update_min_interval": 30,
+            "temp_up_deadband_pct": 1,
+            "temp_up_min_interval": 2,
+        }
+    )
+    _written(stage, 40, 0.0)
+    # rising: small step, short interval
+    assert _written(stage, 42, 2.0) == (42, OUTCOME_APPLIED)
+    # falling: needs the larger deadband and the longer interval
+    assert stage.step(39, 40.0) == (None, OUTCOME_DEADBAND)
+    assert stage.step(30, 10.0) == (None, OUTCOME_MIN_INTERVAL)
+    assert stage.step(30, 32.0) == (30, OUTCOME_APPLIED)
+
+
+def test_slew_limits_each_write() -> None:
+    stage = OutputStage(down_deadband=1, down_interval=1, slew_pct_s=2)
+    _written(stage, 30, 0.0)
+    assert _written(stage, 80, 5.0) == (40, OUTCOME_APPLIED)
+    assert _written(stage, 80, 10.0) == (50, OUTCOME_APPLIED)
+    assert _written(stage, 20, 15.0) == (40, OUTCOME_APPLIED)
+
+
+def test_slew_never_writes_into_the_stall_band() -> None:
+    stage = OutputStage(down_deadband=1, down_interval=1, slew_pct_s=1)
+    # from off: starts at min PWM, not at 5 %
+    _written(stage, 0, 0.0, floor=25)
+    assert _written(stage, 60, 5.0, floor=25) == (25, OUTCOME_APPLIED)
+    assert _written(stage, 60, 10.0, floor=25) == (30, OUTCOME_APPLIED)
+    # towards off: switches off instead of ramping below min PWM
+    assert _written(stage, 0, 12.0, floor=25) == (28, OUTCOME_APPLIED)
+    assert _written(stage, 0, 17.0, floor=25) == (0, OUTCOME_APPLIED)
+
+
+def test_slew_from_below_floor_starts_at_floor() -> None:
+    stage = OutputStage(down_deadband=1, down_interval=1, slew_pct_s=1)
+    _written(stage, 10, 0.0)  # written before min PWM was known
+    assert _written(stage, 60, 3.0, floor=20) == (20, OUTCOME_APPLIED)
+
+
+def test_write_budget() -> None:
+    stage = OutputStage(down_deadband=1, down_interval=1, writes_per_min=2)
+    assert _written(stage, 10, 0.0)[1] == OUTCOME_APPLIED
+    assert _written(stage, 20, 1.0)[1] == OUTCOME_APPLIED
+    assert _written(stage, 30, 2.0) == (None, OUTCOME_BUDGET)
+    # one token back after 30 s
+    assert _written(stage, 30, 32.0) == (30, OUTCOME_APPLIED)
+
+
+def test_configure_keeps_budget_state_unless_changed() -> None:
+    stage = OutputStage(writes_per_min=2)
+    stage.commit(10, 0.0)
+    stage.configure({"temp_write_budget_per_min": 2})
+    assert stage._tokens == 1.0
+    stage.configure({"temp_write_budget_per_min": 6})
+    assert stage._tokens == 6.0
+    assert stage.last == 10
@@ -0,0 +1,79 @@
+"""Tests for the OpenMetrics renderer."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from custom_components.openfan_micro.metrics import ApiStats
+from custom_components.openfan_micro.prometheus import render_openmetrics
+from custom_components.openfan_micro.snapshot import build_status
+
+
+def _device(host: str, channels: dict, temp=None, up: bool = True) -> SimpleNamespace:
+    stats = ApiStats()
+    ep = stats.endpoint("/api/v0/fan/status")
+    ep.requests = 7
+    ep.timeouts = 1
+    ep.latency.record(0.02)
+    return SimpleNamespace(
+        host=host,
+        name=f'Fan "{host}"',
+        coordinator=SimpleNamespace(
+            last_update_success=up,
+            data=build_status(None, channels, False, True) if channels else None,
+        ),
+        api=SimpleNamespace(stats=stats),
+        ctrl_state={"temp_avg": temp},
+    )
+
+
+def _families(text: str) -> list[str]:
+    return [line.split()[2] for line in text.splitlines() if line.startswith("# TYPE")]
+
+
+def test_render_single_channel_device() -> None:
+    text = render_openmetrics([_device("10.0.0.5", {0: (1200, 40, False, None)}, temp=41.5)])
+    lbl = 'host="10.0.0.5",name="Fan \\"10.0.0.5\\""'
+    lines = text.splitlines()
+    assert f"openfan_up{{{lbl}}} 1" in lines
+    assert f"openfan_rpm{{{lbl}}} 1200" in lines
+    assert f"openfan_pwm_percent{{{lbl}}} 40" in lines
+    assert f"openfan_supply_12v{{{lbl}}} 1" in lines
+    assert f"openfan_controller_temperature_celsius{{{lbl}}} 41.5" in lines
+    assert f"openfan_requests_total{{{lbl}}} 7" in lines
+    assert f"openfan_request_timeouts_total{{{lbl}}} 1" in lines
+    assert f"openfan_request_latency_seconds_count{{{lbl}}} 1" in lines
+    assert lines[-1] == "# EOF"
+    assert text.endswith("# EOF\n")
+
+
+def test_render_groups_samples_per_family() -> None:
+    devices = [
+        _device("a", {0: (100, 10, False, None), 1: (200, 20, True, None)}),
+        _device("b", {}, up=False),
+    ]
+    text = render_openmetrics(devices)
+    # every family appears exactly once, in a fixed order
+    assert _families(text) == [
+        "openfan_up",
+        "openfan_rpm",
+        "openfan_pwm_percent",
+        "openfan_supply_12v",
+        "openfan_stalled",
+        "openfan_controller_temperature_celsius",
+        "openfan_requests",
+        "openfan_request_timeouts",
+        "openfan_legacy_fallbacks",
+        "openfan_request_latency_seconds",
+    ]
+    lines = text.splitlines()
+    # multi-channel hosts label the fan series per channel
+    assert 'openfan_rpm{host="a",name="Fan \\"a\\"",channel="1"} 200' in lines
+    assert 'openfan_stalled{host="a",name="Fan \\"a\\"",channel="1"} 1' in lines
+    assert 'openfan_up{host="b",name="Fan \\"b\\""} 0' in lines
+    # a host without data has no fan series
+    assert not any(line.startswith('openfan_rpm{host="b"') for line in lines)
+
+
+def test_render_skips_devices_without_runtime_objects() -> None:
+    text = render_openmetrics([SimpleNamespace(host="x", name="x", coordinator=None, api=None)])
+    assert "host=" not in text
@@ -0,0 +1,98 @@
+"""Tests for drift reconciliation after device resets."""
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.openfan_micro.reconcile import DriftReconciler
+
+PWM0 = ("pwm", 0)
+
+
+def test_steady_state_writes_nothing() -> None:
+    rec = DriftReconciler()
+    commanded = {PWM0: 40, "led": False}
+    assert rec.plan(commanded, {PWM0: 40, "led": False}, 100) == {}
+    assert rec.plan(commanded, {PWM0: 41, "led": False}, 110) == {}  # readback rounding
+    assert rec.counts["checks"] == 2
+    assert rec.counts["reapplied"] == 0
+    assert rec.last is None
+
+
+def test_drift_reapplied_once_then_given_up() -> None:
+    rec = DriftReconciler()
+    commanded = {PWM0: 40, "led": False}
+    assert rec.plan(commanded, {PWM0: 0, "led": False}) == {PWM0: 40}
+    assert rec.last["reason"] == "drift"
+    assert rec.last["values"] == {"pwm_0": 40}
+    # still different after the write: left alone, counted once
+    assert rec.plan(commanded, {PWM0: 0, "led": False}) == {}
+    assert rec.plan(commanded, {PWM0: 0, "led": False}) == {}
+    assert (rec.counts["pwm_drift"], rec.counts["given_up"]) == (1, 1)
+    # a new commanded value is tried again
+    assert rec.plan({PWM0: 50, "led": False}, {PWM0: 0, "led": False}) == {PWM0: 50}
+
+
+def test_divergence_resets_after_a_match() -> None:
+    rec = DriftReconciler()
+    commanded = {"led": True}
+    assert rec.plan(commanded, {"led": False}) == {"led": True}
+    assert rec.plan(commanded, {"led": True}) == {}
+    assert rec.plan(commanded, {"led": False}) == {"led": True}
+    assert rec.counts["led_drift"] == 2
+    assert rec.counts["given_up"] == 0
+
+
+def test_unreported_values_need_a_reboot() -> None:
+    rec = DriftReconciler()
+    commanded = {PWM0: 40, "is_12v": True}
+    # RPM-only firmware, no openfan/status: nothing to compare
+    assert rec.plan(commanded, {}, None) == {}
+    assert rec.plan(commanded, {}, 500) == {}
+    # uptime went backwards: everything commanded is re-applied
+    assert rec.plan(commanded, {}, 3) == {PWM0: 40, "is_12v": True}
+    assert rec.last["reason"] == "reboot"
+    assert rec.counts["reboots"] == 1
+    assert rec.counts["pwm_drift"] == 0  # no reading differed
+
+
+def test_reboot_clears_given_up() -> None:
+    rec = DriftReconciler()
+    commanded = {PWM0: 40}
+    rec.plan(commanded, {PWM0: 0}, 100)
+    rec.plan(commanded, {PWM0: 0}, 110)
+    assert rec.counts["given_up"] == 1
+    assert rec.plan(commanded, {PWM0: 0}, 5) == {PWM0: 40}
+    assert rec.as_dict()["uptime"] == 5
+
+
+async def test_device_state_restored_after_reboot(hass: HomeAssistant, setup_device) -> None:
+    entry, fan = await setup_device()
+    dev = entry.runtime_data
+    await dev.api.set_pwm(40)
+    await dev.api.led_set(False)
+    await dev.coordinator.async_refresh()
+
+    fan.booted -= 100  # some uptime, then a brown-out
+    await dev.coordinator.async_refresh()
+    fan.reboot()
+    assert (fan.pwm, fan.led) == (0, True)
+    await dev.coordinator.async_refresh()
+
+    assert (fan.pwm, fan.led) == (40, False)
+    assert dev.coordinator.drift.counts["reapplied"] == 2
+    # steady afterwards
+    writes = fan.writes
+    await dev.coordinator.async_refresh()
+    await dev.coordinator.async_refresh()
+    assert fan.writes == writes
+
+
+async def test_reconcile_can_be_disabled(hass: HomeAssistant, setup_device) -> None:
+    entry, fan = await setup_device(reconcile_drift=False)
+    dev = entry.runtime_data
+    await dev.api.set_pwm(40)
+    await dev.coordinator.async_refresh()
+    fan.pwm = 0  # changed behind the integration's back
+    await dev.coordinator.async_refresh()
+    assert fan.pwm == 0
+    assert dev.coordinator.drift.counts["reapplied"] == 0
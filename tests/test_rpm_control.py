@@ -0,0 +1,153 @@
+"""Tests for closed-loop target-RPM control."""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.openfan_micro.rpm_control import (
+    MIN_TOLERANCE_RPM,
+    SETTLED_SAMPLES,
+    RpmController,
+    RpmPid,
+)
+from custom_components.openfan_micro.snapshot import ChannelStatus
+
+
+def test_settled_inside_tolerance() -> None:
+    pid = RpmPid(1000, 40, 0.0)
+    assert pid.tolerance == 30  # 3 %
+    assert pid.update(1020, 1.0) is None
+    assert pid.settled
+    assert RpmPid(300, 10, 0.0).tolerance == MIN_TOLERANCE_RPM
+
+
+def test_bumpless_start_and_rate_limit() -> None:
+    pid = RpmPid(2000, 40, 0.0, max_step=5)
+    # large error: the output moves from the current PWM by at most max_step
+    assert pid.update(1000, 1.0) == 45
+    assert pid.update(1000, 2.0) == 50
+    assert pid.update(2500, 3.0) == 45
+
+
+def test_anti_windup() -> None:
+    pid = RpmPid(3000, 90, 0.0, max_step=10)
+    # target out of reach: output saturates, the integral does not run away
+    for t in range(1, 121):
+        pid.update(2000, float(t))
+    assert pid.output == 100
+    assert pid.integral <= 100
+    # once the target is exceeded the output comes down immediately
+    out = pid.update(3400, 121.0)
+    assert out is not None and out < 100
+
+
+def test_ramp_from_off_starts_at_floor() -> None:
+    pid = RpmPid(800, 0, 0.0, max_step=5)
+    assert pid.update(0, 1.0, floor=25) == 25
+    # clamped at the floor, never below it
+    assert pid.update(1500, 2.0, floor=25) == 25
+
+
+def test_hold_does_not_integrate() -> None:
+    held = RpmPid(1000, 40, 0.0)
+    held.hold(600, 100.0)
+    fresh = RpmPid(1000, 40, 99.0)
+    fresh.last_rpm = 600
+    # the 100 s during which the write was pending are not integrated
+    assert held.update(600, 101.0) == fresh.update(600, 101.0)
+    assert held.integral == fresh.integral
+
+
+class _FakeDevice:
+    """Device runtime stub: one or more channels, recorded writes and poll intervals."""
+
+    def __init__(self, channels: dict[int, tuple[int, int]]) -> None:
+        self.status = {ch: ChannelStatus(rpm, pwm, False) for ch, (rpm, pwm) in channels.items()}
+        self.writes: list[dict[int, int]] = []
+        self.intervals: list[int] = []
+        self.listeners: list = []
+        self.release = asyncio.Event()
+        self.release.set()
+        self.coordinator = SimpleNamespace(
+            last_update_success=True,
+            async_add_listener=self._add_listener,
+            set_poll_interval=self.intervals.append,
+        )
+        self.api = SimpleNamespace(_poll_interval=10, _min_pwm=20, set_pwm_many=self._set)
+
+    def _add_listener(self, cb):
+        self.listeners.append(cb)
+        return lambda: self.listeners.remove(cb)
+
+    async def _set(self, values: dict[int, int]) -> None:
+        await self.release.wait()
+        self.writes.append(values)
+
+    def channel_status(self, channel: int):
+        return self.status.get(channel)
+
+    def report(self, channel: int, rpm: int) -> None:
+        pwm = self.writes[-1].get(channel) if self.writes else self.status[channel].pwm
+        self.status[channel] = ChannelStatus(rpm, pwm, False)
+
+
+async def test_loop_polls_fast_until_settled(hass: HomeAssistant) -> None:
+    dev = _FakeDevice({0: (900, 40)})
+    rc = RpmController(hass, dev)
+    rc.apply_options({"rpm_settle_poll": 1})
+
+    rc.set_target(0, 1000)
+    assert dev.intervals == [1]
+    assert len(dev.listeners) == 1
+    for _ in range(SETTLED_SAMPLES):
+        dev.report(0, 1000)
+        rc._on_update()
+        await hass.async_block_till_done()
+    assert dev.intervals == [1, 10]
+    assert rc.loops  # still holding the target, at the normal interval
+
+
+async def test_no_step_while_a_write_is_in_flight(hass: HomeAssistant) -> None:
+    dev = _FakeDevice({0: (500, 30)})
+    rc = RpmController(hass, dev)
+    rc.set_target(0, 1500)
+
+    dev.release.clear()  # the device does not answer yet
+    rc._on_update()
+    await asyncio.sleep(0)
+    pid = rc.loops[0][0]
+    integral, output = pid.integral, pid.output
+    for _ in range(5):
+        dev.report(0, 500)
+        rc._on_update()
+    # held, not stepped: no extra writes queued, loop state unchanged
+    assert (rc.updates, rc.writes) == (1, 1)
+    assert (pid.integral, pid.output) == (integral, output)
+
+    dev.release.set()
+    await hass.async_block_till_done()
+    assert len(dev.writes) == 1
+    rc._on_update()
+    await hass.async_block_till_done()
+    assert rc.updates == 2
+
+
+async def test_zero_target_and_stop(hass: HomeAssistant) -> None:
+    dev = _FakeDevice({0: (900, 40), 1: (900, 40)})
+    rc = RpmController(hass, dev)
+    rc.set_target(0, 1200)
+    rc.set_target(1, 1200, source="curve")
+
+    rc.set_target(0, 0)  # switches the fan off and ends its loop
+    await hass.async_block_till_done()
+    assert dev.writes == [{0: 0}]
+    assert list(rc.loops) == [1]
+
+    intervals = list(dev.intervals)
+    rc.stop()
+    assert not rc.loops
+    assert not dev.listeners
+    assert dev.intervals == intervals  # shut-down coordinator is not rescheduled
+    assert rc.as_dict()["fast_polling"] is False
@@ -0,0 +1,61 @@
+"""Tests for the rolling-median RPM filter."""
+from __future__ import annotations
+
+import math
+import random
+import statistics
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.openfan_micro.rpm_filter import RollingMedian
+
+
+def test_matches_statistics_median() -> None:
+    rng = random.Random(7)
+    for window in (1, 3, 5, 15):
+        filt = RollingMedian(window)
+        seen: list[int] = []
+        for _ in range(300):
+            value = rng.choice([0, rng.randint(0, 3000)])
+            seen.append(value)
+            expected = math.floor(statistics.median(seen[-window:]))
+            assert filt.push(value) == expected
+        assert len(filt) == window
+
+
+def test_isolated_glitch_is_ignored() -> None:
+    filt = RollingMedian(3)
+    out = [filt.push(v) for v in (1200, 1210, 0, 1190, 1205)]
+    assert out == [1200, 1205, 1200, 1190, 1190]
+    # a real stop shows up after window // 2 + 1 samples
+    assert [filt.push(0), filt.push(0)] == [1190, 0]
+
+
+def test_clear() -> None:
+    filt = RollingMedian(5)
+    for v in (1, 2, 3):
+        filt.push(v)
+    filt.clear()
+    assert len(filt) == 0
+    assert filt.push(9) == 9
+
+
+async def test_coordinator_filters_before_stall_detection(
+    hass: HomeAssistant, setup_device
+) -> None:
+    entry, _ = await setup_device(rpm_filter_window=3, stall_consecutive=1, min_pwm=10)
+    dev = entry.runtime_data
+    readings = iter([1000, 1000, 0, 1000, 0, 0])
+
+    async def _scripted():
+        return {0: (next(readings), 50)}
+
+    dev.api.get_status_all = _scripted
+    seen = []
+    for _ in range(6):
+        await dev.coordinator.async_refresh()
+        st = dev.channel_status(0)
+        seen.append((st.rpm, st.rpm_raw, st.stalled))
+
+    assert seen[2] == (1000, 0, False)  # single 0: filtered out, no stall
+    assert seen[5] == (0, 0, True)  # a real stop still counts
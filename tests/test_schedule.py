@@ -0,0 +1,104 @@
+"""Tests for time-of-day curve profiles."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.openfan_micro.schedule import (
+    DAY_MINUTES,
+    ProfileSchedule,
+    parse_profiles,
+    parse_schedule,
+)
+
+
+def _naive(ranges: list[tuple[int, int, str]], minute: int):
+    """Last range covering `minute` wins (reference for the compiled segments)."""
+    name = None
+    for start, end, profile in ranges:
+        if start == end or (
+            start <= minute < end if start < end else (minute >= start or minute < end)
+        ):
+            name = profile
+    return name
+
+
+def test_parse_profiles() -> None:
+    profiles = parse_profiles("quiet: 45=20, 60=45 | batch:40=50,55=80 | broken | :40=1 | x: junk")
+    assert sorted(profiles) == ["batch", "quiet"]
+    assert profiles["quiet"](60) == 45
+
+
+def test_parse_schedule() -> None:
+    assert parse_schedule("22:00-07:00=quiet, 13-15=batch, 07:30-24:00 = day") == [
+        (22 * 60, 7 * 60, "quiet"),
+        (13 * 60, 15 * 60, "batch"),
+        (7 * 60 + 30, 0, "day"),
+    ]
+    assert parse_schedule("25:00-01:00=a, 10:00=b, 10:00-11:00=, 10:61-11:00=c") == []
+
+
+def test_wrap_and_overlap() -> None:
+    sched = ProfileSchedule("22:00-07:00=quiet, 06:00-08:00=morning", {"quiet", "morning"})
+    assert sched.at(23 * 60) == "quiet"
+    assert sched.at(3 * 60) == "quiet"
+    assert sched.at(6 * 60 + 30) == "morning"  # later range wins
+    assert sched.at(12 * 60) is None
+    assert sched.next_change(12 * 60) == 22 * 60
+    assert sched.next_change(23 * 60) == 6 * 60  # tomorrow
+    # midnight is inside "quiet": not a change
+    assert 0 not in sched.changes
+
+
+def test_matches_naive_model_every_minute() -> None:
+    text = "22:00-07:00=quiet, 06:00-08:00=morning, 13:00-15:00=batch, 14:00-14:30=quiet"
+    sched = ProfileSchedule(text, {"quiet", "morning", "batch"})
+    ranges = parse_schedule(text)
+    names = [_naive(ranges, m) for m in range(DAY_MINUTES)]
+    for minute in range(DAY_MINUTES):
+        assert sched.at(minute) == names[minute]
+        nxt = sched.next_change(minute)
+        # the next change is the first later minute with another profile
+        later = next(
+            (m % DAY_MINUTES)
+            for m in range(minute + 1, minute + DAY_MINUTES + 1)
+            if names[m % DAY_MINUTES] != names[(m - 1) % DAY_MINUTES]
+        )
+        assert nxt == later
+
+
+def test_unknown_profiles_and_whole_day() -> None:
+    assert not ProfileSchedule("22:00-07:00=missing", {"quiet"})
+    always = ProfileSchedule("00:00-00:00=quiet", {"quiet"})
+    assert always.at(0) == always.at(DAY_MINUTES - 1) == "quiet"
+    assert always.next_change(0) is None
+    assert ProfileSchedule("").next_change(0) is None
+
+
+async def test_controller_switches_profile_on_schedule(
+    hass: HomeAssistant, setup_device, freezer
+) -> None:
+    start = dt_util.start_of_local_day() + timedelta(hours=21, minutes=59)
+    freezer.move_to(start)
+    entry, _ = await setup_device(
+        temp_curve="40=30, 60=60",
+        temp_profiles="quiet: 40=20, 60=40",
+        temp_schedule="22:00-07:00=quiet",
+    )
+    state = entry.runtime_data.ctrl_state
+    assert state["temp_profile"] is None
+    assert state["temp_curve"] == "40=30, 60=60"
+
+    freezer.move_to(start + timedelta(minutes=1, seconds=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert state["temp_profile"] == "quiet"
+    assert state["temp_curve"] == "40=20, 60=40"
+
+    freezer.move_to(start + timedelta(hours=9, minutes=1, seconds=1))  # 07:00 next day
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert state["temp_profile"] is None
@@ -0,0 +1,111 @@
+"""Tests for option validation and the fleet export / import services."""
+from __future__ import annotations
+
+import pytest
+import voluptuous as vol
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers.storage import Store
+from pytest_homeassistant_custom_component.common import MockConfigEntry, flush_store
+
+from custom_components.openfan_micro.const import DOMAIN
+from custom_components.openfan_micro.options_flow import validate_options
+
+
+def test_validate_options() -> None:
+    entry = MockConfigEntry(domain=DOMAIN, data={"host": "h"}, options={"min_pwm": 20})
+    assert validate_options(entry, {"rpm_kp": 0.1, "min_pwm_calibrated": True}) == {
+        "rpm_kp": 0.1,
+        "min_pwm_calibrated": True,
+    }
+    assert validate_options(entry, {"rpm_filter_window": "5"}) == {"rpm_filter_window": 5}
+    with pytest.raises(vol.Invalid, match="unknown option"):
+        validate_options(entry, {"min_pwm": 25, "turbo": True})
+    with pytest.raises(vol.Invalid):
+        validate_options(entry, {"min_pwm": 75})
+
+
+def test_validate_group_options() -> None:
+    entry = MockConfigEntry(domain=DOMAIN, data={"name": "Rack", "members": ["fan.a"]})
+    assert validate_options(entry, {"temp_entity": "sensor.zone"}) == {"temp_entity": "sensor.zone"}
+    # device-only options are not group options
+    with pytest.raises(vol.Invalid, match="unknown option"):
+        validate_options(entry, {"poll_interval": 10})
+
+
+async def _call(hass: HomeAssistant, service: str, data: dict | None = None) -> dict:
+    return await hass.services.async_call(
+        DOMAIN, service, data or {}, blocking=True, return_response=True
+    )
+
+
+async def test_export_import_round_trip(hass: HomeAssistant, setup_device) -> None:
+    first, _ = await setup_device(min_pwm=20)
+    second, _ = await setup_device()
+    dev = first.runtime_data
+
+    doc = await _call(hass, "export_config")
+    assert doc["version"] == 1
+    assert doc["entries"][first.unique_id] == {
+        "title": first.title,
+        "group": False,
+        "options": {"min_pwm": 20},
+    }
+
+    doc["entries"][first.unique_id]["options"] = {"min_pwm": 25, "poll_interval": 15}
+    doc["entries"]["10.9.9.9"] = {"options": {"min_pwm": 30}}
+    result = await _call(hass, "import_config", {"config": doc})
+    await hass.async_block_till_done()
+
+    assert result == {
+        "updated": [first.unique_id],
+        "unchanged": [second.unique_id],
+        "unknown": ["10.9.9.9"],
+    }
+    assert first.options == {"min_pwm": 25, "poll_interval": 15}
+    # applied in place by the update listener, no reload
+    assert first.runtime_data is dev
+    assert dev.api._min_pwm == 25
+
+
+async def test_import_is_all_or_nothing(hass: HomeAssistant, setup_device) -> None:
+    first, _ = await setup_device(min_pwm=20)
+    second, _ = await setup_device()
+    doc = {
+        "version": 1,
+        "entries": {
+            first.unique_id: {"options": {"min_pwm": 30}},
+            second.unique_id: {"options": {"poll_interval": 0}},
+        },
+    }
+    with pytest.raises(ServiceValidationError, match=second.unique_id):
+        await _call(hass, "import_config", {"config": doc})
+    assert first.options == {"min_pwm": 20}
+    assert second.options == {}
+
+
+@pytest.mark.parametrize(
+    "doc", [{}, {"version": 2, "entries": {}}, {"version": 1, "entries": []}]
+)
+async def test_import_rejects_other_documents(hass: HomeAssistant, setup_device, doc) -> None:
+    await setup_device()
+    with pytest.raises(ServiceValidationError):
+        await _call(hass, "import_config", {"config": doc})
+
+
+async def test_import_is_one_storage_write(hass: HomeAssistant, setup_device) -> None:
+    entries = [(await setup_device())[0] for _ in range(3)]
+    store = hass.config_entries._store
+    await flush_store(store)
+    writes = Store._async_write_data.call_count  # mocked by the test harness
+
+    doc = {
+        "version": 1,
+        "entries": {ce.unique_id: {"options": {"min_pwm": 10 + i}} for i, ce in enumerate(entries)},
+    }
+    await _call(hass, "import_config", {"config": doc})
+    await hass.async_block_till_done()
+    await flush_store(store)
+
+    assert Store._async_write_data.call_count - writes == 1
+    assert [ce.options["min_pwm"] for ce in entries] == [10, 11, 12]
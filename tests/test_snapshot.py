@@ -0,0 +1,94 @@
+"""Tests for immutable status snapshots and change-driven state writes."""
+from __future__ import annotations
+
+from collections import Counter
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.openfan_micro.entity import OpenFanSnapshotEntity
+from custom_components.openfan_micro.snapshot import (
+    ALL,
+    CHANNELS,
+    IS_12V,
+    LED,
+    PWM,
+    RPM,
+    RPM_RAW,
+    STALLED,
+    ChannelStatus,
+    build_status,
+)
+
+
+def test_first_snapshot_is_all_changed() -> None:
+    snap = build_status(None, {0: (1000, 40, False, None)}, True, False)
+    assert snap.changed == ALL
+    assert snap.channel(0) == ChannelStatus(1000, 40, False, None, RPM | PWM | STALLED | RPM_RAW)
+    assert snap.channel(1) is None
+    assert snap.channel(-1) is None
+
+
+def test_change_bits_and_reuse() -> None:
+    first = build_status(None, {0: (1000, 40, False, None), 1: (800, 30, False, None)}, True, False)
+    second = build_status(first, {0: (1010, 40, False, None), 1: (800, 30, False, None)}, True, False)
+    assert second.changed == RPM
+    assert second.channel(0).changed == RPM
+    assert second.channel(1).changed == 0
+
+    third = build_status(second, {0: (1010, 40, False, None), 1: (800, 30, False, None)}, True, False)
+    assert third.changed == 0
+    assert third.channel(0).changed == 0
+    # a steady poll after that is the very same snapshot
+    fourth = build_status(third, {0: (1010, 40, False, None), 1: (800, 30, False, None)}, True, False)
+    assert fourth is third
+
+    fifth = build_status(fourth, {0: (1010, 40, True, None), 1: (800, 30, False, None)}, False, False)
+    assert fifth.changed == STALLED | LED
+    # the unchanged channel keeps its object
+    assert fifth.channel(1) is fourth.channel(1)
+
+
+def test_device_fields_and_layout() -> None:
+    first = build_status(None, {0: (1, 2, False, None)}, True, False)
+    assert build_status(first, {0: (1, 2, False, None)}, True, True).changed == IS_12V
+    grown = build_status(first, {0: (1, 2, False, None), 1: (3, 4, False, None)}, True, False)
+    assert grown.changed & CHANNELS
+
+
+def test_as_dict() -> None:
+    snap = build_status(None, {0: (1000, 40, False, 990), 2: (5, 6, True, None)}, True, False)
+    assert snap.as_dict() == {
+        "rpm": 1000,
+        "pwm": 40,
+        "led": True,
+        "is_12v": False,
+        "stalled": False,
+        "channels": {
+            0: {"rpm": 1000, "pwm": 40, "stalled": False, "rpm_raw": 990},
+            2: {"rpm": 5, "pwm": 6, "stalled": True},
+        },
+    }
+
+
+async def test_steady_polls_write_no_state(hass: HomeAssistant, setup_device, monkeypatch) -> None:
+    entry, fan = await setup_device()
+    dev = entry.runtime_data
+    writes: Counter[str] = Counter()
+    original = OpenFanSnapshotEntity.async_write_ha_state
+
+    def _counting(self) -> None:
+        writes[self.entity_id] += 1
+        original(self)
+
+    monkeypatch.setattr(OpenFanSnapshotEntity, "async_write_ha_state", _counting)
+    await dev.coordinator.async_refresh()  # first update after the entities were added
+    writes.clear()
+
+    for _ in range(3):
+        await dev.coordinator.async_refresh()
+    assert not writes  # fan idle: RPM, stall, LED and 12V unchanged
+
+    fan.led = False
+    await dev.coordinator.async_refresh()
+    assert len(writes) == 1
+    assert next(iter(writes)).endswith("_led")
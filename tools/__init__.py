@@ -0,0 +1 @@
+"""Standalone tooling for OpenFAN Micro (runs without Home Assistant)."""
@@ -0,0 +1,28 @@
+"""Import integration modules without executing the HA package `__init__`.
+
+`custom_components/openfan_micro/__init__.py` imports Home Assistant, but
+`api.py` and `metrics.py` only need aiohttp. We register a bare package
+object pointing at the integration directory so relative imports inside
+those modules keep working.
+"""
+from __future__ import annotations
+
+import importlib
+import importlib.machinery
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+
+PKG_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "openfan_micro"
+_PKG_NAME = "_openfan_micro_standalone"
+
+
+def load_integration_module(name: str) -> ModuleType:
+    """Return integration submodule `name` (e.g. "api") loaded standalone."""
+    if _PKG_NAME not in sys.modules:
+        spec = importlib.machinery.ModuleSpec(_PKG_NAME, None, is_package=True)
+        pkg = importlib.util.module_from_spec(spec)
+        pkg.__path__ = [str(PKG_DIR)]
+        sys.modules[_PKG_NAME] = pkg
+    return importlib.import_module(f"{_PKG_NAME}.{name}")
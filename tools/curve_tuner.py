@@ -0,0 +1,429 @@
+"""Offline temperature-curve tuner: search `temp_curve` candidates against recorded history.
+
+Only NumPy is needed (no Home Assistant). The history is replayed through a
+first-order thermal model and the controller logic, for thousands of
+candidate curves at once (NumPy arrays over the candidate axis, one pass
+over time), and the curve with the lowest cost is printed:
+
+    cost = fan %·hours  +  penalty × hours above --limit  +  write cost × writes
+
+(the write cost keeps the search away from steep curves that flap)
+
+    python -m tools.curve_tuner history.csv --limit 70 --min-pwm 20
+    python -m tools.curve_tuner export.csv --temp-entity sensor.cpu_temp \\
+        --rpm-entity sensor.rack_fan_rpm --table characterization.csv --json
+
+History formats (CSV, detected from the header):
+- wide: `time,temperature[,pwm][,rpm]` (time as epoch seconds or ISO 8601)
+- Home Assistant history export: `entity_id,state,last_changed`, with the
+  entities picked by `--temp-entity`, `--pwm-entity`, `--rpm-entity`
+
+Both are resampled onto a regular `--step` grid (last value holds).
+
+Model: the fan's relative airflow `a(pwm)` comes from `--table` (`pwm,rpm`
+rows), else from the recorded PWM/RPM pairs, else is assumed linear. The
+temperature relaxes towards `ambient + load / a(pwm)` with time constant
+`--tau`; the heat load is recovered from the recording itself
+(`load = a(pwm_rec) · (T + tau·dT/dt − ambient)`), so each candidate sees
+the same workload under its own fan speeds. Without recorded PWM the
+current `--curve` is assumed to have produced it.
+
+Controller logic per step (as in `TempController`): moving average over
+`--integrate` seconds (or its trend line `--predict` seconds ahead), curve,
+min-PWM clamp (0 stays off), output stage with fast-up/slow-down deadband
+and interval and the optional slew limit. The write budget is not modelled.
+
+Search: breakpoints are fixed (`--points` between the history's 5th
+percentile and `--limit`); PWM values are searched as non-decreasing
+integer vectors: one random round of `--candidates`, then `--rounds`
+rounds of shrinking perturbations around the best ones.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import datetime
+from typing import Any, Optional
+
+import numpy as np
+
+from tools._loader import load_integration_module
+
+curve_mod = load_integration_module("curve")
+
+PASSIVE_AIRFLOW = 0.05  # relative airflow with the fan off (convection)
+
+
+# -------------------- history --------------------
+
+
+def _parse_time(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.strip().replace("Z", "+00:00")).timestamp()
+
+
+def _num(value: str) -> Optional[float]:
+    try:
+        out = float(value)
+    except (TypeError, ValueError):
+        return None  # unknown / unavailable
+    return out if np.isfinite(out) else None
+
+
+def read_history(
+    path: str,
+    temp_entity: Optional[str] = None,
+    pwm_entity: Optional[str] = None,
+    rpm_entity: Optional[str] = None,
+) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Return {"temperature"|"pwm"|"rpm": (times, values)} sorted by time."""
+    series: dict[str, list[tuple[float, float]]] = {}
+    with open(path, newline="", encoding="utf-8") as fh:
+        reader = csv.DictReader(fh)
+        fields = [f.strip() for f in reader.fieldnames or []]
+        if {"entity_id", "state", "last_changed"} <= set(fields):
+            names = {temp_entity: "temperature", pwm_entity: "pwm", rpm_entity: "rpm"}
+            names.pop(None, None)
+            if "temperature" not in names.values():
+                raise SystemExit("history export: --temp-entity is required")
+            for row in reader:
+                key = names.get(row["entity_id"])
+                val = _num(row["state"]) if key else None
+                if val is not None:
+                    series.setdefault(key, []).append((_parse_time(row["last_changed"]), val))
+        else:
+            time_col = next((f for f in ("time", "ts", "timestamp", "last_changed") if f in fields), None)
+            if time_col is None or "temperature" not in fields:
+                raise SystemExit("history: need a time column and a temperature column")
+            for row in reader:
+                ts = _parse_time(row[time_col])
+                for key in ("temperature", "pwm", "rpm"):
+                    val = _num(row.get(key, ""))
+                    if val is not None:
+                        series.setdefault(key, []).append((ts, val))
+    if len(series.get("temperature", ())) < 2:
+        raise SystemExit("history: fewer than two temperature samples")
+    out = {}
+    for key, rows in series.items():
+        arr = np.array(sorted(rows), dtype=float)
+        out[key] = (arr[:, 0], arr[:, 1])
+    return out
+
+
+def resample(times: np.ndarray, values: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """Value in effect at each grid time (sample-and-hold; before the first sample: first value)."""
+    idx = np.searchsorted(times, grid, side="right") - 1
+    return values[np.clip(idx, 0, len(values) - 1)]
+
+
+def read_table(path: str) -> tuple[np.ndarray, np.ndarray]:
+    """Characterization table: rows of `pwm,rpm` (header optional)."""
+    rows = []
+    with open(path, newline="", encoding="utf-8") as fh:
+        for row in csv.reader(fh):
+            if len(row) >= 2 and _num(row[0]) is not None and _num(row[1]) is not None:
+                rows.append((float(row[0]), float(row[1])))
+    if len(rows) < 2:
+        raise SystemExit("table: need at least two pwm,rpm rows")
+    arr = np.array(sorted(rows))
+    return arr[:, 0], arr[:, 1]
+
+
+def airflow_table(
+    table: Optional[tuple[np.ndarray, np.ndarray]],
+    pwm: Optional[np.ndarray],
+    rpm: Optional[np.ndarray],
+) -> np.ndarray:
+    """Relative airflow for PWM 0..100 (101 entries, 1.0 at full speed)."""
+    grid = np.arange(101, dtype=float)
+    if table is None and pwm is not None and rpm is not None:
+        # median RPM per recorded PWM level
+        levels = np.round(pwm).astype(int)
+        seen = np.unique(levels[rpm > 0])
+        if len(seen) >= 2:
+            table = (seen.astype(float), np.array([np.median(rpm[levels == lv]) for lv in seen]))
+    if table is None:
+        flow = grid / 100.0
+    else:
+        pwms, rpms = table
+        flow = np.interp(grid, pwms, rpms) / max(float(np.max(rpms)), 1.0)
+        # beyond the measured range: proportional to PWM
+        flow = np.where(grid > pwms[-1], flow[int(pwms[-1])] * grid / max(pwms[-1], 1.0), flow)
+        flow = np.maximum.accumulate(np.clip(flow, 0.0, None)) / max(flow.max(), 1e-9)
+    return np.maximum(flow, PASSIVE_AIRFLOW)
+
+
+# -------------------- simulation --------------------
+
+
+class Scenario:
+    """Resampled history plus the derived heat load, shared by all candidates."""
+
+    def __init__(self, temp: np.ndarray, pwm_rec: np.ndarray, flow: np.ndarray, args: argparse.Namespace) -> None:
+        self.step = float(args.step)
+        self.tau = float(args.tau)
+        self.ambient = float(args.ambient)
+        self.flow = flow
+        self.temp0 = float(temp[0])
+        # dT/dt from the recording, smoothed over the integration window
+        win = max(1, int(round(args.integrate / self.step)))
+        smooth = np.convolve(temp, np.ones(win) / win, mode="same") if len(temp) > win else temp
+        dtdt = np.gradient(smooth, self.step)
+        rec_flow = flow[np.clip(np.round(pwm_rec), 0, 100).astype(int)]
+        self.load = np.clip(rec_flow * (temp + self.tau * dtdt - self.ambient), 0.0, None)
+
+
+def simulate(
+    sc: Scenario,
+    bp: np.ndarray,
+    vals: np.ndarray,
+    args: argparse.Namespace,
+) -> dict[str, np.ndarray]:
+    """Run every candidate (rows of `vals` over breakpoints `bp`) through the history at once."""
+    if len(bp) == 1:
+        bp, vals = np.repeat(bp, 2), np.repeat(vals, 2, axis=1)
+    n_cand = len(vals)
+    step = sc.step
+    alpha = min(1.0, step / sc.tau)
+    win = max(1, int(round(max(5, args.integrate) / step)))
+    pred_steps = args.predict / step
+    min_pwm = int(args.min_pwm)
+    # unset up_* options fall back to the symmetric deadband / interval (as OutputStage)
+    up_db = args.deadband if args.up_deadband is None else args.up_deadband
+    up_iv = args.min_interval if args.up_min_interval is None else args.up_min_interval
+    up_db, down_db = max(0, up_db), max(0, args.deadband)
+    up_iv, down_iv = max(1, up_iv), max(1, args.min_interval)
+    slew = float(args.slew)
+    limit = float(args.limit)
+    flow = sc.flow
+    # the curve as a sum of clipped ramps: v0 + Σ slope_k · clip(T − bp_k, 0, seg_k)
+    # (same values as CompiledCurve, no per-candidate gathers; a repeated
+    # breakpoint becomes a step of width 1e-9)
+    # (segments × candidates layout: contiguous rows, scalar-per-row bounds)
+    vals = vals.astype(float)
+    seg = np.maximum(np.diff(bp), 1e-9)[:, None]
+    slopes = np.ascontiguousarray((np.diff(vals, axis=1) / seg.T).T)
+    base = vals[:, 0].copy()
+    knots = bp[:-1, None]
+    ramp = np.empty_like(slopes)
+
+    temp = np.full(n_cand, sc.temp0)
+    ring = np.empty((win, n_cand))
+    s1 = np.zeros(n_cand)  # Σ v over the window
+    s2 = np.zeros(n_cand)  # Σ j·v (j = absolute step index)
+    pwm = np.zeros(n_cand)
+    last_ts = np.full(n_cand, -1e12)
+    pwm_time = np.zeros(n_cand)
+    above = np.zeros(n_cand)
+    writes = np.zeros(n_cand)
+
+    predict = pred_steps > 0
+    for j, load in enumerate(sc.load):
+        now = j * step
+        slot = j % win
+        if j >= win:
+            old = ring[slot]
+            s1 -= old
+            if predict:
+                s2 -= (j - win) * old
+        ring[slot] = temp
+        s1 += temp
+        if predict:
+            s2 += j * temp
+        n = min(j + 1, win)
+        avg = s1 / n
+        if predict and n >= max(2, win // 2):
+            # least-squares slope over the window (per step), trend line ahead
+            sj = n * (2 * j - n + 1) / 2.0
+            sjj = sum_sq(j + 1) - sum_sq(j + 1 - n)
+            slope = (n * s2 - sj * s1) / (n * sjj - sj * sj)
+            avg = avg + slope * ((n - 1) / 2.0 + pred_steps)
+
+        # curve, min-PWM clamp (0 stays off)
+        np.subtract(avg, knots, out=ramp)
+        np.maximum(ramp, 0.0, out=ramp)
+        np.minimum(ramp, seg, out=ramp)
+        target = np.rint(base + np.einsum("kc,kc->c", ramp, slopes))
+        target = np.where(target == 0, 0.0, np.maximum(min_pwm, target))
+
+        # output stage
+        delta = target - pwm
+        rising = delta > 0
+        elapsed = now - last_ts
+        go = (
+            (delta != 0)
+            & (np.abs(delta) >= down_db + (up_db - down_db) * rising)
+            & (elapsed >= down_iv + (up_iv - down_iv) * rising)
+        ) | (j == 0)
+        value = target
+        if slew > 0 and j > 0:
+            max_step = np.maximum(1.0, np.floor(slew * elapsed))
+            value = pwm + np.clip(delta, -max_step, max_step)
+            # never between 0 and min PWM: off when ramping to 0, else start at min PWM
+            below = (value > 0) & (value < min_pwm)
+            value = np.where(below, np.where(target == 0, 0.0, min_pwm), value)
+        pwm = np.where(go, value, pwm)
+        last_ts = np.where(go, now, last_ts)
+        writes += go
+
+        # thermal model
+        temp += alpha * (sc.ambient + load / flow.take(pwm.astype(np.intp)) - temp)
+        pwm_time += pwm
+        above += temp > limit
+
+    hours = step / 3600.0
+    fan_pct_h = pwm_time * hours
+    above_h = above * hours
+    return {
+        "cost": fan_pct_h + args.penalty * above_h + args.write_cost * writes,
+        "fan_pct_hours": fan_pct_h,
+        "hours_above_limit": above_h,
+        "writes": writes,
+    }
+
+
+def sum_sq(k: int) -> float:
+    """Σ i² for i in 0..k-1."""
+    return (k - 1) * k * (2 * k - 1) / 6.0 if k > 0 else 0.0
+
+
+# -------------------- search --------------------
+
+
+def _monotone(vals: np.ndarray, lo: int) -> np.ndarray:
+    return np.sort(np.clip(np.round(vals), lo, 100), axis=1)
+
+
+def search(sc: Scenario, bp: np.ndarray, args: argparse.Namespace) -> tuple[np.ndarray, dict[str, Any]]:
+    rng = np.random.default_rng(args.seed)
+    lo = int(args.min_pwm)
+    cands = _monotone(rng.uniform(lo, 100, (args.candidates, len(bp))), lo)
+    best_vals = np.empty((0, len(bp)))
+    best_cost = np.empty(0)
+    sigma = 15.0
+    evaluated = 0
+    for rnd in range(args.rounds + 1):
+        if rnd:
+            parents = best_vals[rng.integers(0, len(best_vals), args.candidates)]
+            cands = _monotone(parents + rng.normal(0.0, sigma, parents.shape), lo)
+            sigma = max(1.0, sigma * 0.5)
+        res = simulate(sc, bp, cands, args)
+        evaluated += len(cands)
+        pool = np.concatenate([best_vals, cands])
+        cost = np.concatenate([best_cost, res["cost"]])
+        keep = np.argsort(cost)[: max(1, args.keep)]
+        best_vals, best_cost = pool[keep], cost[keep]
+    best = best_vals[:1]
+    stats = {k: float(v[0]) for k, v in simulate(sc, bp, best, args).items()}
+    stats["candidates_evaluated"] = evaluated
+    return best[0], stats
+
+
+def format_curve(bp: np.ndarray, vals: np.ndarray) -> str:
+    return ", ".join(f"{t:g}={int(v)}" for t, v in zip(np.round(bp, 1), vals))
+
+
+# -------------------- CLI --------------------
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m tools.curve_tuner", description=__doc__.splitlines()[0])
+    parser.add_argument("history", help="history CSV (wide or Home Assistant export)")
+    parser.add_argument("--temp-entity", help="temperature entity (HA export)")
+    parser.add_argument("--pwm-entity", help="entity with the fan PWM %% (HA export)")
+    parser.add_argument("--rpm-entity", help="RPM sensor entity (HA export)")
+    parser.add_argument("--table", help="characterization table CSV (pwm,rpm)")
+    parser.add_argument("--curve", default="45=25, 65=55, 70=100", help="current curve (baseline)")
+    parser.add_argument("--limit", type=float, default=70.0, help="temperature limit °C")
+    parser.add_argument("--penalty", type=float, default=1000.0, help="cost per hour above the limit")
+    parser.add_argument("--write-cost", type=float, default=0.5, help="cost per device write")
+    parser.add_argument("--points", type=int, default=4, help="curve breakpoints to search")
+    parser.add_argument("--candidates", type=int, default=4000, help="curves per round")
+    parser.add_argument("--rounds", type=int, default=4, help="refinement rounds after the random one")
+    parser.add_argument("--keep", type=int, default=32, help="best curves kept between rounds")
+    parser.add_argument("--seed", type=int, default=1)
+    model = parser.add_argument_group("model")
+    model.add_argument("--step", type=float, default=15.0, help="simulation step (s)")
+    model.add_argument("--tau", type=float, default=120.0, help="thermal time constant (s)")
+    model.add_argument("--ambient", type=float, default=25.0, help="ambient (intake air) °C")
+    ctrl = parser.add_argument_group("controller options")
+    ctrl.add_argument("--min-pwm", type=int, default=20)
+    ctrl.add_argument("--integrate", type=float, default=30.0, help="temp_integrate_seconds")
+    ctrl.add_argument("--predict", type=float, default=0.0, help="temp_predict_seconds")
+    ctrl.add_argument("--deadband", type=int, default=3, help="temp_deadband_pct")
+    ctrl.add_argument("--min-interval", type=float, default=10.0, help="temp_update_min_interval")
+    ctrl.add_argument(
+        "--up-deadband", type=int, default=None, help="temp_up_deadband_pct (default: --deadband)"
+    )
+    ctrl.add_argument(
+        "--up-min-interval",
+        type=float,
+        default=None,
+        help="temp_up_min_interval (default: --min-interval)",
+    )
+    ctrl.add_argument("--slew", type=float, default=0.0, help="temp_max_slew_pct_s")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of text")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    hist = read_history(args.history, args.temp_entity, args.pwm_entity, args.rpm_entity)
+    t_times, t_vals = hist["temperature"]
+    grid = np.arange(t_times[0], t_times[-1], args.step)
+    temp = resample(t_times, t_vals, grid)
+
+    baseline = curve_mod.CompiledCurve(args.curve)
+    if not baseline:
+        raise SystemExit(f"--curve: no valid points in {args.curve!r}")
+    if "pwm" in hist:
+        pwm_rec = resample(*hist["pwm"], grid)
+    else:
+        pwm_rec = np.array([baseline(t) for t in temp], dtype=float)
+        pwm_rec = np.where(pwm_rec == 0, 0.0, np.maximum(args.min_pwm, pwm_rec))
+    rpm_rec = resample(*hist["rpm"], grid) if "rpm" in hist else None
+    table = read_table(args.table) if args.table else None
+    sc = Scenario(temp, pwm_rec, airflow_table(table, pwm_rec, rpm_rec), args)
+
+    started = time.perf_counter()
+    base_res = simulate(
+        sc, np.array(baseline.temps, dtype=float), np.array([baseline.values], dtype=float), args
+    )
+    bp = np.linspace(np.percentile(temp, 5), args.limit, max(2, args.points))
+    best_vals, best = search(sc, bp, args)
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "recommended_curve": format_curve(bp, best_vals),
+        "history_hours": round(len(grid) * args.step / 3600.0, 1),
+        "steps": len(grid),
+        "candidates_evaluated": best.pop("candidates_evaluated"),
+        "search_seconds": round(elapsed, 2),
+        "baseline": {"curve": args.curve, **{k: round(float(v[0]), 2) for k, v in base_res.items()}},
+        "recommended": {k: round(v, 2) for k, v in best.items()},
+    }
+    if args.json:
+        json.dump(result, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0
+    print(f"history: {result['history_hours']} h ({result['steps']} steps)")
+    print(
+        f"searched {result['candidates_evaluated']} curves in {result['search_seconds']} s"
+    )
+    for name in ("baseline", "recommended"):
+        r = result[name]
+        print(
+            f"{name:12} cost={r['cost']:<10} fan %·h={r['fan_pct_hours']:<10} "
+            f"h above {args.limit:g}°C={r['hours_above_limit']:<6} writes={int(r['writes'])}"
+        )
+    print(f"temp_curve: {result['recommended_curve']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""Command-line tool for OpenFAN Micro devices (no Home Assistant needed).
+
+Built on the integration's `OpenFanApi`; only aiohttp is required.
+
+    python -m tools.openfan_cli status 10.0.0.21 10.0.0.22
+    python -m tools.openfan_cli status -f rack1.txt --format csv
+    python -m tools.openfan_cli bench 10.0.0.21 --requests 200 --parallel 4
+    python -m tools.openfan_cli set -f rack1.txt --pwm 40 --led off --voltage 12
+
+Hosts come from positional arguments and/or `-f FILE` (one per line, `#`
+comments allowed, `-` for stdin). Work across hosts runs concurrently,
+bounded by `--concurrency`. Output is JSON (default) or CSV, one row per host.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import sys
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+import aiohttp
+
+from tools._loader import load_integration_module
+
+api_mod = load_integration_module("api")
+metrics_mod = load_integration_module("metrics")
+
+
+def _read_hosts(args: argparse.Namespace) -> list[str]:
+    hosts = list(args.hosts)
+    if args.file:
+        stream = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+        with stream:
+            for line in stream:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    hosts.append(line)
+    seen: set[str] = set()
+    return [h for h in hosts if not (h in seen or seen.add(h))]
+
+
+async def _run_bounded(
+    hosts: list[str],
+    concurrency: int,
+    work: Callable[[Any], Awaitable[dict[str, Any]]],
+) -> list[dict[str, Any]]:
+    """Run `work(api)` for every host with at most `concurrency` in flight."""
+    sem = asyncio.Semaphore(max(1, concurrency))
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+
+        async def _one(host: str) -> dict[str, Any]:
+            async with sem:
+                api = api_mod.OpenFanApi(host, session)
+                started = time.monotonic()
+                try:
+                    row = {"host": host, "ok": True, **(await work(api))}
+                except Exception as exc:
+                    row = {"host": host, "ok": False, "error": str(exc) or repr(exc)}
+                row["elapsed_ms"] = round((time.monotonic() - started) * 1000.0, 1)
+                return row
+
+        return await asyncio.gather(*(_one(h) for h in hosts))
+
+
+# -------------------- commands --------------------
+
+
+async def _status(api: Any) -> dict[str, Any]:
+    rpm, pwm = await api.get_status()
+    row: dict[str, Any] = {"rpm": rpm, "pwm": pwm, "led": None, "is_12v": None}
+    try:
+        row["led"], row["is_12v"] = await api.get_openfan_status()
+    except Exception:
+        pass  # older firmware without /openfan/status
+    return row
+
+
+def _bench(requests: int, parallel: int) -> Callable[[Any], Awaitable[dict[str, Any]]]:
+    async def _work(api: Any) -> dict[str, Any]:
+        hist = metrics_mod.LatencyHistogram()
+        errors = 0
+        remaining = requests
+
+        async def _worker() -> None:
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                t0 = time.perf_counter()
+                try:
+                    # get_status_all() would merge concurrent reads into one request
+                    await api.read_status_all()
+                except Exception:
+                    errors += 1
+                hist.record(time.perf_counter() - t0)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(_worker() for _ in range(max(1, parallel))))
+        elapsed = time.perf_counter() - started
+        lat = hist.as_dict()
+        return {
+            "requests": hist.count,
+            "http_requests": api.stats.requests,
+            "errors": errors,
+            "req_per_s": round(hist.count / elapsed, 1) if elapsed > 0 else None,
+            "p50_ms": lat["p50_ms"],
+            "p95_ms": lat["p95_ms"],
+            "p99_ms": lat["p99_ms"],
+            "max_ms": lat["max_ms"],
+            "legacy_fallbacks": api.stats.legacy_fallbacks,
+        }
+
+    return _work
+
+
+def _bulk_set(
+    pwm: Optional[int], led: Optional[bool], volts: Optional[int]
+) -> Callable[[Any], Awaitable[dict[str, Any]]]:
+    async def _work(api: Any) -> dict[str, Any]:
+        row: dict[str, Any] = {}
+        # voltage first so a PWM chosen for the new supply is not applied on the old one
+        if volts is not None:
+            await api.set_voltage_12v(volts == 12)
+            row["voltage"] = volts
+        if pwm is not None:
+            await api.set_pwm(pwm)
+            row["pwm"] = pwm
+        if led is not None:
+            await api.led_set(led)
+            row["led"] = led
+        return row
+
+    return _work
+
+
+# -------------------- output --------------------
+
+
+def _emit(rows: list[dict[str, Any]], fmt: str) -> None:
+    if fmt == "json":
+        json.dump(rows, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+    fields: list[str] = []
+    for row in rows:
+        for key in row:
+            if key not in fields:
+                fields.append(key)
+    writer = csv.DictWriter(sys.stdout, fieldnames=fields, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def _on_off(value: str) -> bool:
+    val = value.strip().lower()
+    if val in ("on", "true", "1", "yes"):
+        return True
+    if val in ("off", "false", "0", "no"):
+        return False
+    raise argparse.ArgumentTypeError("expected on/off")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("hosts", nargs="*", help="device host/IP[:port]")
+    common.add_argument("-f", "--file", help="file with one host per line ('-' = stdin)")
+    common.add_argument("-c", "--concurrency", type=int, default=32, help="hosts in flight")
+    common.add_argument("--format", choices=("json", "csv"), default="json")
+    common.add_argument("-v", "--verbose", action="store_true", help="show client log output")
+
+    parser = argparse.ArgumentParser(prog="python -m tools.openfan_cli", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", parents=[common], help="read RPM/PWM/LED/12V from every host")
+
+    bench = sub.add_parser("bench", parents=[common], help="status-read latency/throughput")
+    bench.add_argument("--requests", type=int, default=100, help="requests per host")
+    bench.add_argument("--parallel", type=int, default=1, help="concurrent requests per host")
+
+    bulk = sub.add_parser("set", parents=[common], help="push settings to every host")
+    bulk.add_argument("--pwm", type=int, choices=range(0, 101), metavar="0-100")
+    bulk.add_argument("--led", type=_on_off, metavar="on|off")
+    bulk.add_argument("--voltage", type=int, choices=(5, 12))
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.CRITICAL)
+
+    hosts = _read_hosts(args)
+    if not hosts:
+        parser.error("no hosts given")
+
+    if args.command == "status":
+        work = _status
+    elif args.command == "bench":
+        work = _bench(args.requests, args.parallel)
+    else:
+        if args.pwm is None and args.led is None and args.voltage is None:
+            parser.error("set: give at least one of --pwm, --led, --voltage")
+        work = _bulk_set(args.pwm, args.led, args.voltage)
+
+    rows = asyncio.run(_run_bounded(hosts, args.concurrency, work))
+    _emit(rows, args.format)
+    return 0 if all(row.get("ok") for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+"""Local simulator of the OpenFAN Micro HTTP API.
+
+Serves the endpoints used by `OpenFanApi`:
+- `/api/v0/fan/status`, `/api/v0/fan/<n>/status`
+- `/api/v0/fan/<n>/set?value=N`, legacy `/api/v0/fan/set?value=N`,
+  `/api/v0/fan/all/set?value=N` (`multi` only)
+- `/api/v0/openfan/status` (with `uptime` in seconds; `reboot()` resets it)
+- `/api/v0/led/(enable|disable)`, `/api/v0/fan/voltage/(high|low)?confirm=true`
+
+Firmware variants:
+- `new`: top-level status JSON, `/fan/0/set`, JSON `{"status":"ok"}` replies
+- `legacy`: only `/fan/0/status` + `/fan/set`, no `/openfan/status`
+- `plain`: like `new` but write endpoints reply plain-text `OK`
+- `wrapped`: every JSON payload wrapped as `{"status":"ok","data":{...}}`
+- `multi`: multi-channel controller; `/fan/status` returns the RPM of every
+  channel in one reply (`{"status":"ok","data":{"0":rpm,...}}`), `all/set`
+
+Every variant serves `--channels` fans on `/fan/<n>/...`; only `multi` has
+the batched status reply, the others answer `/fan/status` for channel 0.
+
+Faults are injectable per device (fixed + jittered latency, error rate,
+hang rate for timeouts). RPM follows a first-order lag towards
+`pwm * max_rpm / 100` and drops to 0 below `spin_min_pwm`.
+
+Run standalone: `python -m tools.simulator --devices 3 --variant wrapped`
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Optional
+
+from aiohttp import web
+
+VARIANTS = ("new", "legacy", "plain", "wrapped", "multi")
+
+
+class SimulatedFan:
+    """State and behaviour of one simulated OpenFAN Micro."""
+
+    _serial = 0  # per-process counter for unique locally-administered MACs
+
+    def __init__(
+        self,
+        *,
+        variant: str = "new",
+        channels: int = 1,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        hang_rate: float = 0.0,
+        hang_seconds: float = 7.0,
+        max_rpm: int = 2000,
+        spin_min_pwm: int = 10,
+        tau: float = 1.5,
+        seed: Optional[int] = None,
+    ) -> None:
+        if variant not in VARIANTS:
+            raise ValueError(f"unknown firmware variant {variant!r}")
+        self.variant = variant
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.max_rpm = max_rpm
+        self.spin_min_pwm = spin_min_pwm
+        self.tau = tau
+        self.channels = max(1, int(channels))
+        self.pwms = [0] * self.channels
+        self.led = True
+        self.is_12v = False
+        self.booted = time.monotonic()
+        self.requests = 0
+        self.writes = 0
+        self._rpms = [0.0] * self.channels
+        self._rpm_ts = [time.monotonic()] * self.channels
+        self._rng = random.Random(seed)
+        SimulatedFan._serial += 1
+        self.mac = "02:0f:a1:%02x:%02x:%02x" % (
+            (SimulatedFan._serial >> 16) & 0xFF,
+            (SimulatedFan._serial >> 8) & 0xFF,
+            SimulatedFan._serial & 0xFF,
+        )
+
+    # ---- physics ----
+
+    @property
+    def pwm(self) -> int:
+        return self.pwms[0]
+
+    @pwm.setter
+    def pwm(self, value: int) -> None:
+        self.pwms[0] = value
+
+    def rpm(self, channel: int = 0) -> int:
+        """Advance the first-order RPM model of a channel to now and return the value."""
+        now = time.monotonic()
+        pwm = self.pwms[channel]
+        target = 0.0 if pwm < self.spin_min_pwm else pwm * self.max_rpm / 100.0
+        if not self.is_12v:
+            target *= 0.45  # 5V supply: same duty, much lower speed
+        dt = max(0.0, now - self._rpm_ts[channel])
+        alpha = 1.0 if self.tau <= 0 else min(1.0, dt / self.tau)
+        self._rpms[channel] += (target - self._rpms[channel]) * alpha
+        self._rpm_ts[channel] = now
+        return int(round(self._rpms[channel]))
+
+    def reboot(self) -> None:
+        """Simulate a brown-out: firmware comes back with defaults."""
+        self.pwms = [0] * self.channels
+        self.led = True
+        self.booted = time.monotonic()
+
+    # ---- fault injection ----
+
+    async def _faults(self) -> Optional[web.Response]:
+        self.requests += 1
+        delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+        if self.hang_rate and self._rng.random() < self.hang_rate:
+            delay += self.hang_seconds
+        if delay:
+            await asyncio.sleep(delay)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            return web.Response(status=500, text="internal error")
+        return None
+
+    # ---- payload helpers ----
+
+    def _json(self, payload: dict[str, Any]) -> web.Response:
+        if self.variant == "wrapped":
+            payload = {"status": "ok", "data": payload}
+        return web.json_response(payload)
+
+    def _ok(self) -> web.Response:
+        if self.variant == "plain":
+            return web.Response(text="OK")
+        return web.json_response({"status": "ok"})
+
+    def _fan_payload(self, channel: int = 0) -> dict[str, Any]:
+        key = "pwm" if self.variant == "legacy" else "pwm_percent"
+        return {"rpm": self.rpm(channel), key: self.pwms[channel]}
+
+    def _channel(self, request: web.Request) -> Optional[int]:
+        channel = int(request.match_info["channel"])
+        return channel if channel < self.channels else None
+
+    # ---- handlers ----
+
+    async def fan_status(self, request: web.Request) -> web.Response:
+        if (resp := await self._faults()) is not None:
+            return resp
+        if self.variant == "legacy":
+            return web.Response(status=404, text="not found")
+        if self.variant == "multi":
+            rpms = {str(ch): self.rpm(ch) for ch in range(self.channels)}
+            return web.json_response({"status": "ok", "message": "", "data": rpms})
+        return self._json(self._fan_payload())
+
+    async def channel_status(self, request: web.Request) -> web.Response:
+        if (resp := await self._faults()) is not None:
+            return resp
+        if (channel := self._channel(request)) is None:
+            return web.Response(status=404, text="no such fan")
+        return self._json(self._fan_payload(channel))
+
+    async def channel_set(self, request: web.Request) -> web.Response:
+        if (resp := await self._faults()) is not None:
+            return resp
+        if self.variant == "legacy":
+            return web.Response(status=404, text="not found")
+        if (channel := self._channel(request)) is None:
+            return web.Response(status=404, text="no such fan")
+        return self._set(request, (channel,))
+
+    async def all_set(self, request: web.Request) -> web.Response:
+        if (resp := await self._faults()) is not None:
+            return resp
+        if self.variant != "multi":
+            return web.Response(status=404, text="not found")
+        return self._set(request, range(self.channels))
+
+    async def fan_set_legacy(self, request: web.Request) -> web.Response:
+        if (resp := await self._faults()) is not None:
+            return resp
+        return self._set(request, (0,))
+
+    def _set(self, request: web.Request, channels: Any) -> web.Response:
+        try:
+            value = int(float(request.query.get("value", "")))
+        except ValueError:
+            return web.Response(status=400, text="bad value")
+        for channel in channels:
+            self.rpm(channel)  # settle model at old PWM before changing it
+            self.pwms[channel] = max(0, min(100, value))
+        self.writes += 1
+        return self._ok()
+
+    async def openfan_status(self, request: web.Request) -> web.Response:
+        if (resp := await self._faults()) is not None:
+            return resp
+        if self.variant == "legacy":
+            return web.Response(status=404, text="not found")
+        return web.json_response(
+            {
+                "status": "ok",
+                "data": {
+                    "act_led_enabled": "true" if self.led else "false",
+                    "fan_is_12v": "true" if self.is_12v else "false",
+                    "mac": self.mac,
+                    "uptime": int(time.monotonic() - self.booted),
+                },
+            }
+        )
+
+    async def led_switch(self, request: web.Request) -> web.Response:
+        if (resp := await self._faults()) is not None:
+            return resp
+        self.led = request.match_info["action"] == "enable"
+        self.writes += 1
+        return self._ok()
+
+    async def voltage_switch(self, request: web.Request) -> web.Response:
+        if (resp := await self._faults()) is not None:
+            return resp
+        if request.query.get("confirm") != "true":
+            return web.Response(status=400, text="confirm=true required")
+        self.is_12v = request.match_info["level"] == "high"
+        self.writes += 1
+        return self._ok()
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/api/v0/fan/status", self.fan_status)
+        app.router.add_get(r"/api/v0/fan/{channel:\d+}/status", self.channel_status)
+        app.router.add_get(r"/api/v0/fan/{channel:\d+}/set", self.channel_set)
+        app.router.add_get("/api/v0/fan/all/set", self.all_set)
+        app.router.add_get("/api/v0/fan/set", self.fan_set_legacy)
+        app.router.add_get("/api/v0/openfan/status", self.openfan_status)
+        app.router.add_get("/api/v0/led/{action:enable|disable}", self.led_switch)
+        app.router.add_get("/api/v0/fan/voltage/{level:high|low}", self.voltage_switch)
+        return app
+
+
+class SimulatorFleet:
+    """N simulated devices, one port each on 127.0.0.1.
+
+    `start_in_thread()` runs the servers on a private event loop so that
+    benchmarks measuring the client loop are not skewed by server work.
+    """
+
+    def __init__(self, fans: list[SimulatedFan], host: str = "127.0.0.1") -> None:
+        self.fans = fans
+        self.host = host
+        self.hosts: list[str] = []
+        self._runners: list[web.AppRunner] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def build(cls, count: int, **fan_kwargs: Any) -> "SimulatorFleet":
+        return cls([SimulatedFan(**fan_kwargs) for _ in range(count)])
+
+    async def start(self) -> list[str]:
+        for fan in self.fans:
+            runner = web.AppRunner(fan.make_app(), access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, self.host, 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+            self._runners.append(runner)
+            self.hosts.append(f"{self.host}:{port}")
+        return self.hosts
+
+    async def stop(self) -> None:
+        for runner in self._runners:
+            await runner.cleanup()
+        self._runners.clear()
+        self.hosts.clear()
+
+    def start_in_thread(self) -> list[str]:
+        ready = threading.Event()
+        failure: list[BaseException] = []
+
+        def _run() -> None:
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self.start())
+            except BaseException as exc:  # surface to the caller thread
+                failure.append(exc)
+                ready.set()
+                self._loop.close()
+                return
+            ready.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.stop())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=_run, name="openfan-sim", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if failure:
+            self._thread.join()
+            self._loop = self._thread = None
+            raise failure[0]
+        return list(self.hosts)
+
+    def stop_thread(self) -> None:
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+            self._thread = None
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    fleet = SimulatorFleet.build(
+        args.devices,
+        variant=args.variant,
+        channels=args.channels,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        hang_rate=args.hang_rate,
+    )
+    hosts = await fleet.start()
+    for host in hosts:
+        print(host)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fleet.stop()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="OpenFAN Micro HTTP API simulator")
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--variant", choices=VARIANTS, default="new")
+    parser.add_argument("--channels", type=int, default=1, help="fans per device")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="fraction of requests that hang")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()